@@ -0,0 +1,4 @@
+'''
+Benchmarks of the SurvivalBox engine. Every module runs on its own, e.g. python benchmarks/vec_env_scaling.py,
+the configuration matrix with json results and the baseline comparison runs as python -m benchmarks (see suite).
+'''
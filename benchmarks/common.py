@@ -0,0 +1,32 @@
+'''
+Settings shared by the benchmark scripts. Importing this module selects the dummy SDL video driver (unless another
+one is set, see headless), so import it before pygame and the benchmarks run without a window.
+
+The scripts (python benchmarks/<script>.py) import it as common, the suite (python -m benchmarks) as benchmarks.common.
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+
+def headless():
+    '''
+    Selects the dummy SDL video driver, unless another one is set. Call it before pygame opens a display.
+    '''
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# run without a window
+headless()
+
+REWARDS = {"positive": 1.0, "negative": -1.0, "tick": 0.0, "loss": -5.0, "win": 5.0,
+           "grass": 1.0, "sheep": 1.0, "fire": 1.0, "wolf": 1.0}
+
+VIEW_PORT = {"grid_points_left": 9, "grid_points_right": 10, "grid_points_front": 9, "grid_points_back": 10}
+
+def headless_env():
+    '''
+    Returns the environment for benchmark subprocesses: no window and no pygame greeting.
+    '''
+    env = dict(os.environ)
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    return env
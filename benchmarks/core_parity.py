@@ -0,0 +1,142 @@
+'''
+Plays the same seeds with a SandBoxWorld (pygame) and a standalone core.CoreWorld (plain arrays). The SandBoxWorld steps
+a CoreWorld of its own and its sprites mirror it, so both have to produce the same trajectory: positions, energies,
+scores, rewards, game events and terrain after every step, including the resets after an episode (tests/test_core_parity.py
+checks this too). Then compares the steps per second of both, the difference is the cost of the sprites and the rendering.
+
+python benchmarks/core_parity.py --seeds 0 1 2 --steps 2000 --sheep 6 --wolf 3
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import time
+import argparse
+
+# run without a window
+import common
+common.headless()
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox import core
+from survivalbox.vec_env import VecSurvivalBox
+
+
+def create(args, seed):
+    envs = VecSurvivalBox(num_envs=1, grid_width=args.size, grid_height=args.size, tile_size=1, num_agents=args.agents,
+                          agent_life=args.life, num_sheep=args.sheep, num_wolf=args.wolf, num_fire=args.fire,
+                          turn_actions=True, seeds=[seed])
+    world = core.CoreWorld.generate(args.size, args.size, 0.5, envs.rewards, args.agents, args.life, args.sheep, args.wolf, args.fire,
+                                    rng=np.random.RandomState(seed))
+    return envs, world
+
+def compare(envs, world):
+    '''
+    Returns the names of the values that differ between the pygame world and the core world.
+    '''
+    sandbox = envs.Worlds[0]
+    objects = sandbox.get_game_objects()
+    errors  = []
+
+    if not np.array_equal(np.array([game_object.Pos for game_object in objects]), world.Pos): errors.append("positions")
+
+    agents = objects[:world.NumAgents]
+    for name, values in (("Energy", world.Energy), ("Score", world.Score), ("StepsAlive", world.StepsAlive)):
+        if [getattr(agent, name) for agent in agents] != values[:world.NumAgents].tolist(): errors.append(name)
+
+    for kind, names in ((core.SHEEP, ("MOVE_EVERY_N_STEPS", "WorldSteps", "SHEPHERD")), (core.WOLF, ("MOVE_EVERY_N_STEPS", "WorldSteps", "StepsAlive")), (core.FIREPLACE, ("ON", "FIRE_GUARD"))):
+        slots = np.flatnonzero(world.Kind == kind)
+        for name, values in zip(names, (world.MoveEvery, world.WorldSteps, world.Owner) if kind == core.SHEEP else
+                                       (world.MoveEvery, world.WorldSteps, world.StepsAlive) if kind == core.WOLF else (world.On, world.Owner)):
+            if [getattr(objects[i], name) for i in slots] != values[slots].tolist(): errors.append(name)
+
+    alive = [agent.ID for agent in sandbox.survivor_group.sprites()]
+    if alive != world.ID[world.Survivors].tolist(): errors.append("living agents")
+
+    terrain = np.array([[tile.TileType for tile in column] for column in sandbox.TileMap])
+    if not np.array_equal(terrain, world.Terrain): errors.append("terrain")
+
+    return errors
+
+def check(args, seed):
+    envs, world = create(args, seed)
+    # VecSurvivalBox.reset() resets the initialised world once more
+    envs.reset()
+    world.reset()
+    errors = compare(envs, world)
+
+    rng = np.random.RandomState(seed)
+    for step in range(args.steps):
+        if errors: break
+
+        actions = rng.randint(0, envs.NUM_ACTIONS, (1, args.agents))
+        _, rewards, dones, _ = envs.step(actions)
+        world.step(actions[0])
+
+        # the vectorized env resets a finished world right away, the events are the ones of the last step
+        vec_events, core_events = envs.get_events(), world.get_events()
+        if len(vec_events) != len(core_events) or any((vec_events[name] != core_events[name]).any() for name in core_events.dtype.names):
+            errors.append("events")
+        if not np.array_equal(rewards[0], world.get_rewards()): errors.append("rewards")
+        if dones[0] != world.game_over(): errors.append("game over")
+        if world.game_over():
+            world.reset()
+
+        errors += compare(envs, world)
+
+    envs.close()
+    return step, errors
+
+def speed(args, seed):
+    envs, world = create(args, seed)
+    envs.reset()
+    world.reset()
+    actions = np.random.RandomState(seed).randint(0, envs.NUM_ACTIONS, (args.steps, 1, args.agents))
+
+    start = time.perf_counter()
+    for step in range(args.steps):
+        envs.step(actions[step])
+    sandbox_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for step in range(args.steps):
+        world.step(actions[step, 0])
+        if world.game_over(): world.reset()
+    core_time = time.perf_counter() - start
+
+    envs.close()
+    return args.steps / sandbox_time, args.steps / core_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Trajectory parity and speed of core.CoreWorld vs SandBoxWorld")
+    parser.add_argument("--seeds",  type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--steps",  type=int, default=2000)
+    parser.add_argument("--size",   type=int, default=40)
+    parser.add_argument("--agents", type=int, default=3)
+    parser.add_argument("--life",   type=int, default=150)
+    parser.add_argument("--sheep",  type=int, default=6)
+    parser.add_argument("--wolf",   type=int, default=3)
+    parser.add_argument("--fire",   type=int, default=1)
+    args = parser.parse_args()
+
+    print("map {0}x{0}, {1} agents, {2} sheep, {3} wolves, {4} fires, {5} steps".format(args.size, args.agents, args.sheep, args.wolf, args.fire, args.steps))
+
+    failed = False
+    for seed in args.seeds:
+        step, errors = check(args, seed)
+        if errors:
+            failed = True
+            print("seed {:3d} : differs at step {}: {}".format(seed, step, ", ".join(sorted(set(errors)))))
+        else:
+            print("seed {:3d} : identical".format(seed))
+
+    sandbox_speed, core_speed = speed(args, args.seeds[0])
+    print("SandBoxWorld : {:10.1f} steps/sec".format(sandbox_speed))
+    print("CoreWorld    : {:10.1f} steps/sec ({:.1f}x)".format(core_speed, core_speed / sandbox_speed))
+
+    if failed: raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+Records golden trajectories (seeded random actions and the state hashes after every step, see survivalbox.replay)
+and replays them headless to check that an engine change did not alter the game. verify exits with 1 and reports
+the first step, env and state component that differs.
+
+python benchmarks/golden_trajectories.py record golden.sbtraj --steps 5000 --envs 4 --sheep 6 --wolf 3
+python benchmarks/golden_trajectories.py verify golden.sbtraj
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import time
+import argparse
+
+# run without a window
+import common
+common.headless()
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox import replay
+
+
+def record(args):
+    config = {"num_envs": args.envs, "grid_width": args.size, "grid_height": args.size, "tile_size": args.tile_size,
+              "num_agents": args.agents, "agent_life": args.life, "num_sheep": args.sheep, "num_wolf": args.wolf, "num_fire": args.fire,
+              "turn_actions": True, "always_new_map": args.new_maps, "seeds": [args.seed + k for k in range(args.envs)]}
+
+    writer = replay.TrajectoryWriter(args.path, config)
+    envs = writer.create_envs()
+    actions = np.random.RandomState(args.seed).randint(0, envs.NUM_ACTIONS, (args.steps, args.envs, args.agents))
+
+    start = time.perf_counter()
+    for step in range(args.steps):
+        envs.step(actions[step])
+        writer.write(actions[step], envs)
+    seconds = time.perf_counter() - start
+
+    writer.close()
+    envs.close()
+    print("recorded {} steps of {} envs to {} ({:.1f} KB, {:.1f} steps/sec)".format(
+          args.steps, args.envs, args.path, os.path.getsize(args.path) / 1024, args.steps / seconds))
+
+def verify(args):
+    divergence, steps, speed = replay.replay(args.path)
+    if divergence is not None:
+        print("{}: differs at {}".format(args.path, divergence))
+        raise SystemExit(1)
+    print("{}: {} steps identical ({:.1f} steps/sec)".format(args.path, steps, speed))
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and verify golden trajectories")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record seeded random actions and the state hashes")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--steps",     type=int, default=5000)
+    record_parser.add_argument("--envs",      type=int, default=4)
+    record_parser.add_argument("--size",      type=int, default=40)
+    record_parser.add_argument("--tile-size", type=int, default=1)
+    record_parser.add_argument("--agents",    type=int, default=3)
+    record_parser.add_argument("--life",      type=int, default=150)
+    record_parser.add_argument("--sheep",     type=int, default=6)
+    record_parser.add_argument("--wolf",      type=int, default=3)
+    record_parser.add_argument("--fire",      type=int, default=1)
+    record_parser.add_argument("--new-maps",  action="store_true", help="a new map for every episode")
+    record_parser.add_argument("--seed",      type=int, default=0)
+
+    verify_parser = commands.add_parser("verify", help="replay a trajectory and compare the state hashes")
+    verify_parser.add_argument("path")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    else:
+        verify(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+'''
+Measures how the creation of a SandBoxWorld scales with the map size: the value noise (ValueNoise2D.calculate),
+parse_height_map, convert_raw_map (one Tile sprite per grid point), sorting the tiles into the sprite groups,
+the surfaces and observation buffer and spawning the game objects and the first reset in SandBoxWorld.init.
+Reports the time and the peak python memory (tracemalloc, a second run) of every stage per size, how every stage
+scales with the map area and how the value noise scales with the number of octaves.
+
+Sizes whose predicted time (the last size scaled by the area) exceeds the budget are skipped.
+
+python benchmarks/map_generation.py --sizes 20 50 100 200 500 1000 2000 --budget 120
+python benchmarks/map_generation.py --sizes 50 100 --octaves 1 2 4 8 --no-memory --json
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import json
+import time
+import argparse
+import tracemalloc
+
+# run without a window
+from common import REWARDS, VIEW_PORT
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox import core
+from survivalbox import profiling
+from survivalbox.environment import SandBoxWorld
+
+# The stages in the order they run, groups is new_map without the map generation
+STAGES = ("surfaces", "noise", "parse", "convert", "groups", "spawn", "reset")
+
+
+class MemoryTimer(profiling.PhaseTimer):
+    '''
+    A PhaseTimer that also records how far the traced memory peaked above its level at the start of every phase
+    (the last clock or lap).
+    '''
+    def reset(self):
+        super().reset()
+        self.Peaks = {}
+        self.Base  = 0
+
+    def clock(self):
+        self.Base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return super().clock()
+
+    def lap(self, phase, start):
+        current, peak = tracemalloc.get_traced_memory()
+        self.Peaks[phase] = max(self.Peaks.get(phase, 0), peak - self.Base)
+        self.Base = current
+        tracemalloc.reset_peak()
+        return super().lap(phase, start)
+
+def create_world(size, args, timer):
+    world = SandBoxWorld(size, size, 0.5, args.tile_size, REWARDS, False, False)
+    world.Timer = timer
+    world.init(np.random.RandomState(args.seed), args.agents, 999999, VIEW_PORT, args.sheep, args.wolf, args.fire)
+    return world
+
+def measure(size, args):
+    '''
+    Returns the seconds of every stage and, unless disabled, the peak memory of every stage in MB
+    (with the memory the world keeps after init as total).
+    '''
+    timer = profiling.PhaseTimer()
+    create_world(size, args, timer)
+
+    totals = {phase: values["total_ms"] / 1000 for phase, values in timer.get_summary().items()}
+    times  = {stage: totals.get(stage, 0.0) for stage in STAGES}
+    times["groups"] = totals["new_map"] - totals["noise"] - totals["parse"] - totals["convert"]
+
+    if args.no_memory:
+        return times, None
+
+    timer = MemoryTimer()
+    tracemalloc.start()
+    world = create_world(size, args, timer)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    peaks = {stage: timer.Peaks.get(stage, 0) / 2**20 for stage in STAGES}
+    # the peak since the convert lap is the grouping and the copies of the start map
+    peaks["groups"] = timer.Peaks["new_map"] / 2**20
+    peaks["total"]  = retained / 2**20
+    del world
+    return times, peaks
+
+def measure_octaves(size, args):
+    '''
+    Returns the seconds of ValueNoise2D.calculate for every number of octaves.
+    '''
+    times = {}
+    for octaves in args.octaves:
+        noise = core.ValueNoise2D(size, size, octaves, rng=np.random.RandomState(args.seed))
+        start = time.perf_counter()
+        noise.calculate()
+        times[octaves] = time.perf_counter() - start
+    return times
+
+def scaling(results, stage):
+    '''
+    Returns the exponent of time ~ area^k of a stage, fitted over the measured sizes, None with less than two sizes.
+    '''
+    areas = [size * size for size in results]
+    times = [results[size]["time"][stage] for size in results]
+    if len(areas) < 2 or min(times) <= 0:
+        return None
+    return float(np.polyfit(np.log(areas), np.log(times), 1)[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage times and peak memory of the map generation by map size")
+    parser.add_argument("--sizes",     type=int, nargs="+", default=[20, 50, 100, 200, 500, 1000, 2000])
+    parser.add_argument("--octaves",   type=int, nargs="*", default=[1, 2, 4, 8], help="value noise octaves to sweep, none to skip")
+    parser.add_argument("--budget",    type=float, default=120, help="skip sizes predicted to take longer (seconds)")
+    parser.add_argument("--tile-size", type=int, default=1)
+    parser.add_argument("--agents",    type=int, default=3)
+    parser.add_argument("--sheep",     type=int, default=1)
+    parser.add_argument("--wolf",      type=int, default=1)
+    parser.add_argument("--fire",      type=int, default=1)
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="only time the stages, without the tracemalloc run")
+    parser.add_argument("--json",      action="store_true", help="print the results as json")
+    args = parser.parse_args()
+
+    if not args.json:
+        print("TileSize {}, {} agents, {} sheep, {} wolves, {} fires, budget {:.0f}s per size".format(
+              args.tile_size, args.agents, args.sheep, args.wolf, args.fire, args.budget))
+        print("{:>11s} ".format("size") + " ".join("{:>10s}".format(stage) for stage in STAGES) + " {:>10s}".format("total"))
+
+    results = {}
+    skipped = []
+    last = None
+    for size in sorted(args.sizes):
+        # every stage grows (at least) with the area of the map
+        if last is not None and last[1] * (size / last[0]) ** 2 > args.budget:
+            skipped.append(size)
+            continue
+
+        start = time.perf_counter()
+        times, peaks = measure(size, args)
+        octaves = measure_octaves(size, args)
+        last = (size, time.perf_counter() - start)
+
+        results[size] = {"time": times, "peak_mb": peaks, "noise_by_octaves": octaves}
+        if not args.json:
+            print("{:>11s} ".format("{0}x{0} ms".format(size)) + " ".join("{:10.1f}".format(1000 * times[stage]) for stage in STAGES)
+                  + " {:10.1f}".format(1000 * sum(times.values())))
+            if peaks is not None:
+                print("{:>11s} ".format("peak MB") + " ".join("{:10.2f}".format(peaks[stage]) for stage in STAGES + ("total",)))
+
+    exponents = {stage: scaling(results, stage) for stage in STAGES}
+
+    if args.json:
+        print(json.dumps({"results": {str(size): result for size, result in results.items()},
+                          "area_exponent": exponents, "skipped": skipped}, indent=2))
+        return
+
+    print("{:>11s} ".format("area^k") + " ".join("{:10.2f}".format(k) if k is not None else "{:>10s}".format("-") for k in exponents.values()))
+    if args.octaves:
+        print("value noise by octaves (ms):")
+        for size, result in results.items():
+            print("{:>11s} ".format("{0}x{0}".format(size)) + " ".join("{:>4d}: {:10.1f}".format(octaves, 1000 * seconds)
+                                                                    for octaves, seconds in result["noise_by_octaves"].items()))
+    if skipped:
+        print("skipped (over budget): " + ", ".join("{0}x{0}".format(size) for size in skipped))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+'''
+Measures how much memory an environment needs at several map sizes: every size runs in a fresh process that creates
+a VecSurvivalBox with a number of worlds and reports the resident set size (RSS) before and after, the peak RSS and
+the estimate of SandBoxWorld.memory_usage() by component. The RSS per env is what decides how many envs fit on a node.
+Linux only (/proc/self/statm).
+
+python benchmarks/memory_usage.py --sizes 30 50 100 200 --envs 4
+python benchmarks/memory_usage.py --sizes 100 --tile-size 8 --full-map-observation --json
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import sys
+import json
+import argparse
+import subprocess
+
+# third party imports
+
+# local imports
+from common import VIEW_PORT, headless_env
+
+# Prints the measurements in bytes as json in its last line
+SNIPPET = '''
+import os, json, resource
+import numpy as np
+from survivalbox import VecSurvivalBox
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+before = rss()
+envs = VecSurvivalBox(num_envs={envs}, grid_width={size}, grid_height={size}, tile_size={tile_size}, num_agents={agents},
+                      view_port_dimensions={view_port}, num_sheep={sheep}, num_wolf={wolf}, num_fire={fire},
+                      full_map_observation={full_map}, seeds=list(range({envs})))
+envs.reset()
+after = rss()
+peak  = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(json.dumps({{"before": before, "after": after, "peak": peak, "usage": envs.Worlds[0].memory_usage()}}))
+'''
+
+def measure(size, args):
+    snippet = SNIPPET.format(envs=args.envs, size=size, tile_size=args.tile_size, agents=args.agents, view_port=VIEW_PORT,
+                             sheep=args.sheep, wolf=args.wolf, fire=args.fire, full_map=args.full_map_observation)
+    # run without a window
+    env = headless_env()
+    output = subprocess.run([sys.executable, "-c", snippet], env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    # the baseline (interpreter, numpy, pygame) is shared by all envs of a process
+    result["rss_per_env"]  = (result["after"] - result["before"]) / args.envs
+    result["peak_per_env"] = (result["peak"]  - result["before"]) / args.envs
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS per environment and the memory breakdown of a SandBoxWorld by map size")
+    parser.add_argument("--sizes",     type=int, nargs="+", default=[30, 50, 100, 200])
+    parser.add_argument("--envs",      type=int, default=4, help="worlds per process, the RSS is divided by it")
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=3)
+    parser.add_argument("--sheep",     type=int, default=1)
+    parser.add_argument("--wolf",      type=int, default=1)
+    parser.add_argument("--fire",      type=int, default=1)
+    parser.add_argument("--full-map-observation", action="store_true")
+    parser.add_argument("--json",      action="store_true", help="print the results as json")
+    args = parser.parse_args()
+
+    results = {size: measure(size, args) for size in args.sizes}
+
+    if args.json:
+        print(json.dumps({str(size): result for size, result in results.items()}, indent=2))
+        return
+
+    MB = 2**20
+    print("TileSize {}, {} agents, {} envs per process, full map observation {}".format(args.tile_size, args.agents, args.envs, args.full_map_observation))
+    print("{:>9s} {:>12s} {:>12s} {:>12s} {:>12s}".format("size", "base MB", "RSS/env MB", "peak/env MB", "estimate MB"))
+    for size, result in results.items():
+        print("{:>9s} {:12.1f} {:12.1f} {:12.1f} {:12.1f}".format("{0}x{0}".format(size), result["before"] / MB,
+              result["rss_per_env"] / MB, result["peak_per_env"] / MB, result["usage"]["total"] / MB))
+
+    components = [name for name in results[args.sizes[0]]["usage"] if name != "total"]
+    print("memory_usage() of one world (MB):")
+    print("{:>9s} ".format("size") + " ".join("{:>13s}".format(name) for name in components))
+    for size, result in results.items():
+        print("{:>9s} ".format("{0}x{0}".format(size)) + " ".join("{:13.2f}".format(result["usage"][name] / MB) for name in components))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+'''
+Measures how much of a SandBoxWorld step is spent on the 'human friendly' presentation
+(huge map scaling, normal map, view areas, markers and cards) compared to the game dynamics
+and the agent observations.
+
+python benchmarks/presentation_cost.py --tile-size 4 --steps 500
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import time
+import argparse
+
+# run without a window
+from common import REWARDS, VIEW_PORT
+
+# third party imports
+import numpy as np
+import pygame
+
+# local imports
+from survivalbox.environment import SandBoxWorld
+from survivalbox.game_objects import Survivor
+
+
+def create_world(args, render_human_view):
+
+    np.random.seed(args.seed)
+    world = SandBoxWorld(args.size, args.size, 0.5, args.tile_size, REWARDS, args.full_map_observation, render_human_view)
+    world.init(np.random.RandomState(args.seed), args.agents, 999999, VIEW_PORT, args.sheep, args.wolf, args.fire)
+    screen = pygame.Surface(world.get_screen_dimensions())
+    return world, screen
+
+def run(args, render_human_view):
+    '''
+    Steps a world and returns the total step time and the time of the render() part in seconds.
+    '''
+    world, screen = create_world(args, render_human_view)
+    actions = Survivor.ACTION_KEYS
+    rng = np.random.RandomState(args.seed)
+
+    # With the human view enabled we time the render part on its own
+    world.RENDER_HUMAN_VIEW = False
+
+    step_time   = 0.0
+    render_time = 0.0
+    for step in range(args.steps):
+        action_list = [actions[i] for i in rng.randint(0, len(actions), args.agents)]
+
+        start = time.perf_counter()
+        world.update(screen, action_list)
+        world.get_agent_views()
+        updated = time.perf_counter()
+
+        if render_human_view:
+            world.render(screen)
+        done = time.perf_counter()
+
+        step_time   += done - start
+        render_time += done - updated
+
+        if world.game_over():
+            world.reset()
+
+    return step_time, render_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Presentation cost of a SandBoxWorld step")
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=3)
+    parser.add_argument("--sheep",     type=int, default=1)
+    parser.add_argument("--wolf",      type=int, default=1)
+    parser.add_argument("--fire",      type=int, default=1)
+    parser.add_argument("--steps",     type=int, default=500)
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument("--full-map-observation", action="store_true")
+    args = parser.parse_args()
+
+    human_total, human_render = run(args, render_human_view=True)
+    train_total, _            = run(args, render_human_view=False)
+
+    print("Map {0}x{0}, TileSize {1}, {2} agents, {3} steps".format(args.size, args.tile_size, args.agents, args.steps))
+    print("human view : {:8.3f} ms/step ({:.1f} steps/sec)".format(1000 * human_total / args.steps, args.steps / human_total))
+    print("  render   : {:8.3f} ms/step ({:.1f}% of the step)".format(1000 * human_render / args.steps, 100 * human_render / human_total))
+    print("training   : {:8.3f} ms/step ({:.1f} steps/sec)".format(1000 * train_total / args.steps, args.steps / train_total))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+'''
+Measures the throughput and the step latency of the environment server with a growing number of client processes.
+Every client claims --envs-per-client worlds and steps them with random actions.
+
+python benchmarks/server_throughput.py --clients 1 2 4 8 --envs-per-client 2 --steps 300
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import time
+import tempfile
+import argparse
+import multiprocessing
+
+# run without a window
+from common import VIEW_PORT
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox.server import serve, EnvClient
+
+
+def client_loop(address, num_envs, steps, seed, results):
+    '''
+    Runs in a client process, reports (env steps, seconds, step latencies in ms) to the results queue.
+    '''
+    client = EnvClient(address, num_envs)
+    rng = np.random.RandomState(seed)
+    client.reset()
+
+    latencies = np.zeros(steps)
+    start = time.perf_counter()
+    for step in range(steps):
+        actions = rng.randint(0, client.NUM_ACTIONS, (num_envs, client.NUM_AGENTS))
+        before = time.perf_counter()
+        client.step(actions)
+        latencies[step] = (time.perf_counter() - before) * 1000
+    elapsed = time.perf_counter() - start
+
+    client.close()
+    results.put((num_envs * steps, elapsed, latencies))
+
+def run(context, address, clients, args):
+    results = context.Queue()
+    processes = [context.Process(target=client_loop, args=(address, args.envs_per_client, args.steps, args.seed + c, results))
+                 for c in range(clients)]
+    for process in processes:
+        process.start()
+
+    reports = [results.get() for process in processes]
+    for process in processes:
+        process.join()
+
+    steps   = sum(report[0] for report in reports)
+    elapsed = max(report[1] for report in reports)
+    latencies = np.concatenate([report[2] for report in reports])
+    return steps / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description="Environment server throughput and latency vs number of clients")
+    parser.add_argument("--clients",         type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--envs-per-client", type=int, default=2)
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=2)
+    parser.add_argument("--steps",     type=int, default=300)
+    parser.add_argument("--max-wait",  type=float, default=2.0, help="ms the server waits to coalesce a batch")
+    parser.add_argument("--tcp",       action="store_true", help="use localhost TCP instead of a Unix socket")
+    parser.add_argument("--seed",      type=int, default=0)
+    args = parser.parse_args()
+
+    if args.tcp:
+        address = ("127.0.0.1", 5555)
+    else:
+        address = os.path.join(tempfile.mkdtemp(), "survivalbox.sock")
+
+    num_envs = max(args.clients) * args.envs_per_client
+    env_kwargs = dict(grid_width=args.size, grid_height=args.size, tile_size=args.tile_size, num_agents=args.agents,
+                      agent_life=999999, view_port_dimensions=VIEW_PORT, full_map_observation=False,
+                      seeds=list(range(args.seed, args.seed + num_envs)))
+
+    print("{} envs per client, map {}x{}, TileSize {}, {} agents, {} steps, {} cpus".format(
+          args.envs_per_client, args.size, args.size, args.tile_size, args.agents, args.steps, os.cpu_count()))
+
+    context = multiprocessing.get_context("spawn")
+    server = context.Process(target=serve, args=(address, num_envs, args.max_wait / 1000), kwargs=env_kwargs, daemon=True)
+    server.start()
+    try:
+        for clients in args.clients:
+            speed, p50, p99 = run(context, address, clients, args)
+            print("clients {:2d} : {:10.1f} steps/sec, latency p50 {:6.2f} ms, p99 {:6.2f} ms".format(clients, speed, p50, p99))
+    finally:
+        server.terminate()
+        server.join()
+
+if __name__ == "__main__":
+    main()
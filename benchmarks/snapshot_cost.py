@@ -0,0 +1,74 @@
+'''
+Measures the cost of SandBoxWorld.snapshot() and restore() compared to a world step, for a growing number of
+steps between the snapshot and the restore (more steps, more changed tiles and moved objects to put back).
+
+python benchmarks/snapshot_cost.py --size 50 --tile-size 4 --branch 1 10 100
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import time
+import argparse
+
+# run without a window
+from common import VIEW_PORT
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox.vec_env import VecSurvivalBox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot and restore cost of a SandBoxWorld")
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=2)
+    parser.add_argument("--warmup",    type=int, default=100, help="steps before the snapshot")
+    parser.add_argument("--branch",    type=int, nargs="+", default=[1, 10, 100], help="steps between snapshot and restore")
+    parser.add_argument("--repeat",    type=int, default=50)
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument("--full-map-observation", action="store_true")
+    args = parser.parse_args()
+
+    # a single world without the human view, stepped like in training
+    envs = VecSurvivalBox(num_envs=1, grid_width=args.size, grid_height=args.size, tile_size=args.tile_size, num_agents=args.agents,
+                          agent_life=999999, view_port_dimensions=VIEW_PORT, full_map_observation=args.full_map_observation, seeds=[args.seed])
+    world = envs.Worlds[0]
+    rng = np.random.RandomState(args.seed)
+    envs.reset()
+
+    def step(steps):
+        for i in range(steps):
+            envs.step(rng.randint(0, envs.NUM_ACTIONS, (1, args.agents)))
+
+    step(args.warmup)
+
+    start = time.perf_counter()
+    step(args.repeat)
+    step_time = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        snapshot = world.snapshot()
+    snapshot_time = (time.perf_counter() - start) / args.repeat
+
+    print("map {}x{}, TileSize {}, {} agents, {} changed tiles at the snapshot".format(
+          args.size, args.size, args.tile_size, args.agents, len(snapshot.Terrain)))
+    print("step     : {:8.1f} us".format(step_time * 1e6))
+    print("snapshot : {:8.1f} us".format(snapshot_time * 1e6))
+
+    for branch in args.branch:
+        restore_time = 0
+        for i in range(args.repeat):
+            step(branch)
+            start = time.perf_counter()
+            world.restore(snapshot)
+            restore_time += time.perf_counter() - start
+        print("restore after {:4d} steps : {:8.1f} us".format(branch, restore_time / args.repeat * 1e6))
+
+    envs.close()
+
+if __name__ == "__main__":
+    main()
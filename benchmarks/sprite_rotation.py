@@ -0,0 +1,97 @@
+'''
+Measures the per-step sprite cost of many animals: the rotation of the sprite images alone
+(a fresh pygame.transform.rotate per object and step vs. the shared pre-rotated images)
+and a full SandBoxWorld step with 100+ sheep and wolves.
+
+python benchmarks/sprite_rotation.py --sheep 80 --wolf 40 --steps 300
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import time
+import argparse
+
+# run without a window
+from common import REWARDS, VIEW_PORT
+
+# third party imports
+import numpy as np
+import pygame
+
+# local imports
+from survivalbox.environment import SandBoxWorld
+from survivalbox.game_objects import Survivor
+
+
+def create_world(args):
+
+    np.random.seed(args.seed)
+    world = SandBoxWorld(args.size, args.size, 0.5, args.tile_size, REWARDS, False, False)
+    world.init(np.random.RandomState(args.seed), args.agents, 999999, VIEW_PORT, args.sheep, args.wolf, 0)
+    screen = pygame.Surface(world.get_screen_dimensions())
+    return world, screen
+
+def time_rotation(animals, steps, rng):
+    '''
+    Returns the time in seconds to rotate all animal sprites on every step, first with a fresh
+    pygame.transform.rotate (the old behaviour) and then with the pre-rotated lookup.
+    '''
+    orientations = rng.randint(0, 4, (steps, len(animals)))
+
+    start = time.perf_counter()
+    for step in range(steps):
+        for animal, orientation in zip(animals, orientations[step]):
+            animal.image = pygame.transform.rotate(animal.IMAGE, orientation * -90)
+            animal.rect  = animal.image.get_rect()
+    rotate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for step in range(steps):
+        for animal, orientation in zip(animals, orientations[step]):
+            animal.image = animal.IMAGES[orientation]
+            animal.rect  = animal.image.get_rect()
+    lookup_time = time.perf_counter() - start
+
+    return rotate_time, lookup_time
+
+def time_world(world, screen, args, rng):
+    '''
+    Returns the time in seconds of stepping the world with random agent actions.
+    '''
+    actions = Survivor.ACTION_KEYS
+
+    start = time.perf_counter()
+    for step in range(args.steps):
+        action_list = [actions[i] for i in rng.randint(0, len(actions), args.agents)]
+        world.update(screen, action_list)
+        if world.game_over():
+            world.reset()
+
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-step sprite cost with many animals")
+    parser.add_argument("--size",      type=int, default=100)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=3)
+    parser.add_argument("--sheep",     type=int, default=80)
+    parser.add_argument("--wolf",      type=int, default=40)
+    parser.add_argument("--steps",     type=int, default=300)
+    parser.add_argument("--seed",      type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+    world, screen = create_world(args)
+    animals = world.npc_group.sprites()
+
+    rotate_time, lookup_time = time_rotation(animals, args.steps, rng)
+    world_time = time_world(world, screen, args, rng)
+
+    per_step = 1000.0 / args.steps
+    print("Map {0}x{0}, TileSize {1}, {2} animals, {3} steps".format(args.size, args.tile_size, len(animals), args.steps))
+    print("rotate per step : {:8.3f} ms".format(rotate_time * per_step))
+    print("lookup per step : {:8.3f} ms ({:.1f}x)".format(lookup_time * per_step, rotate_time / lookup_time))
+    print("world step      : {:8.3f} ms ({:.1f} steps/sec)".format(world_time * per_step, args.steps / world_time))
+
+if __name__ == "__main__":
+    main()
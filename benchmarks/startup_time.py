@@ -0,0 +1,83 @@
+'''
+Measures how long it takes until survivalbox is ready to work: the bare package import, the import of the
+vectorized environment (pygame, numpy), the first world of a VecSurvivalBox and the start of a
+SubprocVecSurvivalBox with its worker processes. Every measurement runs in a fresh interpreter.
+
+python benchmarks/startup_time.py --repeat 5 --workers 2
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import sys
+import json
+import argparse
+import subprocess
+
+# third party imports
+import numpy as np
+
+# local imports
+from common import headless_env
+
+# Every snippet prints the seconds it took as its last line
+SNIPPETS = {
+"import survivalbox": '''
+import time; start = time.perf_counter()
+import survivalbox
+print(time.perf_counter() - start)
+''',
+"import survivalbox.vec_env": '''
+import time; start = time.perf_counter()
+import survivalbox.vec_env
+print(time.perf_counter() - start)
+''',
+"VecSurvivalBox(1) + reset": '''
+import time; start = time.perf_counter()
+from survivalbox import VecSurvivalBox
+envs = VecSurvivalBox(num_envs=1, grid_width={size}, grid_height={size}, tile_size={tile_size}, seeds=[0])
+envs.reset()
+print(time.perf_counter() - start)
+''',
+"SubprocVecSurvivalBox + reset": '''
+import time
+if __name__ == "__main__":
+    start = time.perf_counter()
+    from survivalbox import SubprocVecSurvivalBox
+    envs = SubprocVecSurvivalBox(num_envs={workers}, num_workers={workers}, grid_width={size}, grid_height={size}, tile_size={tile_size}, seeds=list(range({workers})))
+    envs.reset()
+    print(time.perf_counter() - start)
+    envs.close()
+''',
+}
+
+def run(snippet):
+    # run without a window
+    env = headless_env()
+    output = subprocess.run([sys.executable, "-c", snippet], env=env, check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and start up time of survivalbox in fresh processes")
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=8)
+    parser.add_argument("--workers",   type=int, default=2)
+    parser.add_argument("--repeat",    type=int, default=5)
+    parser.add_argument("--json",      action="store_true", help="print the medians as json")
+    args = parser.parse_args()
+
+    results = {}
+    for name, snippet in SNIPPETS.items():
+        snippet = snippet.format(size=args.size, tile_size=args.tile_size, workers=args.workers)
+        times = [run(snippet) for r in range(args.repeat)]
+        results[name] = 1000 * float(np.median(times))
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print("map {0}x{0}, TileSize {1}, {2} workers, median of {3} fresh processes".format(args.size, args.tile_size, args.workers, args.repeat))
+    for name, milliseconds in results.items():
+        print("{:32s}: {:8.1f} ms".format(name, milliseconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+'''
+Runs seeded headless rollouts over a matrix of configurations (map size, agents, NPCs, full map observation,
+tile size and observation mode) and reports steps/sec, the p50/p99 step latency and the reset latency as json.
+The compare command flags the configurations that got slower than a saved baseline.
+
+python -m benchmarks run --out baseline.json
+python -m benchmarks run --sizes 50 100 --agents 1 3 --npcs none few --out current.json
+python -m benchmarks compare baseline.json current.json --threshold 0.1
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+
+# run without a window
+from benchmarks.common import VIEW_PORT
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox.vec_env import VecSurvivalBox
+
+# NPC counts (sheep, wolves, fireplaces) by name
+NPCS = {"none": (0, 0, 0), "few": (1, 1, 1), "many": (8, 4, 2)}
+
+# Observation modes by name -> VecSurvivalBox arguments
+OBSERVATIONS = {"rgb": {}, "gray": {"grayscale": True}, "down2": {"downsample": 2}}
+
+# The dimensions of the matrix and their default values
+MATRIX = {
+    "size"      : [30, 50],
+    "agents"    : [1, 3],
+    "npcs"      : ["none", "few"],
+    "full_map"  : [True, False],
+    "tile_size" : [4],
+    "obs"       : ["rgb"]
+}
+
+
+def config_key(config):
+    return ",".join("{}={}".format(name, config[name]) for name in MATRIX)
+
+def configurations(args):
+    '''
+    Returns the cartesian product of the matrix dimensions given on the command line as a list of dicts.
+    '''
+    values = [getattr(args, name) for name in MATRIX]
+    return [dict(zip(MATRIX, combination)) for combination in itertools.product(*values)]
+
+def run_config(config, args):
+    '''
+    Runs one configuration and returns its measurements.
+    '''
+    num_sheep, num_wolf, num_fire = NPCS[config["npcs"]]
+
+    envs = VecSurvivalBox(num_envs=1, grid_width=config["size"], grid_height=config["size"], tile_size=config["tile_size"],
+                          num_agents=config["agents"], agent_life=999999, view_port_dimensions=VIEW_PORT,
+                          num_sheep=num_sheep, num_wolf=num_wolf, num_fire=num_fire, full_map_observation=config["full_map"],
+                          seeds=[args.seed], **OBSERVATIONS[config["obs"]])
+
+    rng = np.random.RandomState(args.seed)
+    actions = rng.randint(0, envs.NUM_ACTIONS, (args.warmup + args.steps, 1, config["agents"]))
+
+    resets = np.zeros(args.resets)
+    for r in range(args.resets):
+        start = time.perf_counter()
+        envs.reset()
+        resets[r] = time.perf_counter() - start
+
+    for step in range(args.warmup):
+        envs.step(actions[step])
+
+    latencies = np.zeros(args.steps)
+    for step in range(args.steps):
+        start = time.perf_counter()
+        envs.step(actions[args.warmup + step])
+        latencies[step] = time.perf_counter() - start
+
+    envs.close()
+
+    return {"key"          : config_key(config),
+            "config"       : config,
+            "steps_per_sec": float(args.steps / latencies.sum()),
+            "step_p50_ms"  : float(np.percentile(latencies, 50) * 1000),
+            "step_p99_ms"  : float(np.percentile(latencies, 99) * 1000),
+            "reset_p50_ms" : float(np.percentile(resets, 50) * 1000)}
+
+def run(args):
+    import pygame
+
+    results = {"meta": {"time"     : time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "python"   : platform.python_version(),
+                        "numpy"    : np.__version__,
+                        "pygame"   : pygame.version.ver,
+                        "platform" : platform.platform(),
+                        "cpus"     : os.cpu_count(),
+                        "steps"    : args.steps,
+                        "repeat"   : args.repeat,
+                        "seed"     : args.seed},
+               "results": []}
+
+    configs = configurations(args)
+    for c, config in enumerate(configs):
+        # the fastest of the repeated runs is the least disturbed by the rest of the machine
+        result = max((run_config(config, args) for r in range(args.repeat)), key=lambda result: result["steps_per_sec"])
+        results["results"].append(result)
+        print("[{:3d}/{:3d}] {:60s} {:9.1f} steps/sec  p50 {:7.3f} ms  p99 {:7.3f} ms  reset {:8.2f} ms".format(
+              c + 1, len(configs), result["key"], result["steps_per_sec"], result["step_p50_ms"], result["step_p99_ms"], result["reset_p50_ms"]),
+              file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+def compare(args):
+    '''
+    Flags every configuration of the current results that is more than threshold slower than the baseline:
+    fewer steps/sec or a higher p99 step latency or reset latency. Exits with 1 if there are regressions.
+    '''
+    with open(args.baseline) as f:
+        baseline = {result["key"]: result for result in json.load(f)["results"]}
+    with open(args.current) as f:
+        current  = {result["key"]: result for result in json.load(f)["results"]}
+
+    regressions = 0
+    for key in current:
+        if key not in baseline:
+            print("{:60s} new".format(key))
+            continue
+
+        old, new = baseline[key], current[key]
+        changes = {"steps/sec"  : old["steps_per_sec"] / new["steps_per_sec"] - 1,
+                   "step p99"   : new["step_p99_ms"]   / old["step_p99_ms"]   - 1,
+                   "reset"      : new["reset_p50_ms"]  / old["reset_p50_ms"]  - 1}
+        slower = [name for name, change in changes.items() if change > args.threshold]
+        regressions += bool(slower)
+
+        print("{:60s} {:9.1f} -> {:9.1f} steps/sec ({:+6.1%})  {}".format(
+              key, old["steps_per_sec"], new["steps_per_sec"], new["steps_per_sec"] / old["steps_per_sec"] - 1,
+              "REGRESSION: " + ", ".join(slower) if slower else "ok"))
+
+    for key in baseline:
+        if key not in current:
+            print("{:60s} missing".format(key))
+
+    print("{} of {} configurations regressed by more than {:.0%}".format(regressions, len(current), args.threshold))
+    if regressions: raise SystemExit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine throughput over a matrix of configurations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the matrix and write the results as json")
+    run_parser.add_argument("--sizes",      dest="size",      type=int, nargs="+", default=MATRIX["size"])
+    run_parser.add_argument("--agents",     dest="agents",    type=int, nargs="+", default=MATRIX["agents"])
+    run_parser.add_argument("--npcs",       dest="npcs",      nargs="+", default=MATRIX["npcs"], choices=list(NPCS))
+    run_parser.add_argument("--full-map",   dest="full_map",  nargs="+", default=["on", "off"], choices=["on", "off"])
+    run_parser.add_argument("--tile-sizes", dest="tile_size", type=int, nargs="+", default=MATRIX["tile_size"])
+    run_parser.add_argument("--obs",        dest="obs",       nargs="+", default=MATRIX["obs"], choices=list(OBSERVATIONS))
+    run_parser.add_argument("--steps",  type=int, default=300)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--resets", type=int, default=5)
+    run_parser.add_argument("--repeat", type=int, default=3, help="runs per configuration, the fastest is reported")
+    run_parser.add_argument("--seed",   type=int, default=0)
+    run_parser.add_argument("--out",    help="json file, stdout if not given")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed slow down, 0.1 is 10%%")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        args.full_map = [value == "on" for value in args.full_map]
+        run(args)
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    main()
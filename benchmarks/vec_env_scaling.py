@@ -0,0 +1,75 @@
+'''
+Measures the steps/sec of a batch of worlds in one process (VecSurvivalBox) and spread over
+a growing number of worker processes (SubprocVecSurvivalBox).
+
+python benchmarks/vec_env_scaling.py --envs 16 --workers 1 2 4 8 --steps 300
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import time
+import argparse
+
+# run without a window
+from common import VIEW_PORT
+
+# third party imports
+import numpy as np
+
+# local imports
+from survivalbox.vec_env import VecSurvivalBox, SubprocVecSurvivalBox
+
+
+def env_kwargs(args):
+    return dict(grid_width=args.size, grid_height=args.size, tile_size=args.tile_size, num_agents=args.agents,
+                agent_life=999999, view_port_dimensions=VIEW_PORT, full_map_observation=args.full_map_observation)
+
+def run(envs, args):
+    '''
+    Returns the env steps per second of the given vector env.
+    '''
+    rng = np.random.RandomState(args.seed)
+    envs.reset()
+
+    start = time.perf_counter()
+    for step in range(args.steps):
+        envs.step(rng.randint(0, envs.NUM_ACTIONS, (args.envs, args.agents)))
+    elapsed = time.perf_counter() - start
+
+    return args.envs * args.steps / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector env throughput vs worker count")
+    parser.add_argument("--envs",      type=int, default=16)
+    parser.add_argument("--workers",   type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=2)
+    parser.add_argument("--steps",     type=int, default=300)
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument("--full-map-observation", action="store_true")
+    args = parser.parse_args()
+
+    seeds = list(range(args.seed, args.seed + args.envs))
+
+    print("{} envs, map {}x{}, TileSize {}, {} agents, {} steps, {} cpus".format(
+          args.envs, args.size, args.size, args.tile_size, args.agents, args.steps, os.cpu_count()))
+
+    envs = VecSurvivalBox(num_envs=args.envs, seeds=seeds, **env_kwargs(args))
+    base = run(envs, args)
+    envs.close()
+    print("in process : {:10.1f} steps/sec".format(base))
+
+    for workers in args.workers:
+        if workers > args.envs: continue
+
+        envs = SubprocVecSurvivalBox(num_envs=args.envs, num_workers=workers, seeds=seeds, **env_kwargs(args))
+        try:
+            speed = run(envs, args)
+        finally:
+            envs.close()
+        print("workers {:2d} : {:10.1f} steps/sec ({:.2f}x)".format(workers, speed, speed / base))
+
+if __name__ == "__main__":
+    main()
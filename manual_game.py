@@ -68,24 +68,19 @@ rewards = {
 game.adjustRewards(rewards)
 
 
-# set initial score to 0 
-previous_score = 0
-
 # game loop
 while True:
     # if the game is over, reset
     if game.game_over():
         game.reset()
-        previous_score = 0
 
     # control frames per second in manual mode
     dt = game.tick(20)
     # step the game forward one time step
     game.step(dt)
 
-    # receive the reward like a RL agent
-    reward = game.getScore() - previous_score
-    previous_score = game.getScore()
+    # receive the reward of the active agent like a RL agent
+    reward = game.getRewards()[game.ActivePlayer]
     #print(reward)
 
     # receive the observation
@@ -25,7 +25,7 @@ setup(
 	author_email='first lower case letter of first name plus first lower case letter of last name plus 031 at hdm-stuttgart.de',
 	keywords='',
 	license="MIT",
-	packages=find_packages(),
+	packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
         include_package_data=False,
         zip_safe=False,
         install_requires=install_requires
@@ -1 +1,20 @@
-from .survivalbox import SurvivalBox
\ No newline at end of file
+# The classes are imported on first access, "import survivalbox" itself loads neither pygame nor the assets
+_EXPORTS = {"SurvivalBox":           ".survivalbox",
+            "VecSurvivalBox":        ".vec_env",
+            "SubprocVecSurvivalBox": ".vec_env",
+            "EnvServer":             ".server",
+            "EnvClient":             ".server",
+            "CoreWorld":             ".core"}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS: raise AttributeError("module 'survivalbox' has no attribute '{}'".format(name))
+
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,37 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+
+# third party imports
+import pygame
+
+# local imports
+
+_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# Loaded and converted images: (file name, display format) -> Surface
+IMAGES = {}
+
+def get_image(file_name):
+    '''
+    Returns an image of the assets folder, loaded on first use and converted to a fast blitting format without alpha:
+    the format of the display if there is one, a plain 32 bit surface otherwise. No display mode is needed.
+    '''
+    has_display = pygame.display.get_init() and pygame.display.get_surface() is not None
+    key = (file_name, has_display)
+
+    image = IMAGES.get(key)
+    if image is None:
+        raw_image = pygame.image.load(os.path.join(_DIR, file_name))
+
+        if has_display:
+            image = raw_image.convert()
+        else:
+            # convert() needs a display, copying the RGB values drops the alpha channel the same way
+            image = pygame.Surface(raw_image.get_size(), 0, 32)
+            pygame.surfarray.blit_array(image, pygame.surfarray.array3d(raw_image))
+
+        IMAGES[key] = image
+
+    return image
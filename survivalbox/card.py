@@ -23,6 +23,17 @@ class Card(pygame.Surface):
 
     FIX_TILE_SIZE = 8 # a fixed size for the card. Every observation we be rescaled to a representation with TileSize of 8 pixels.
 
+    TEXT_CACHE_SIZE = 512 # max number of rendered text lines we keep per card
+    FONTS = {}            # SysFont lookups are slow, so all cards share their fonts
+
+    @staticmethod
+    def get_font(size):
+        if size not in Card.FONTS:
+            # the font module is only needed for the cards, init it on first use
+            if not pygame.font.get_init(): pygame.font.init()
+            Card.FONTS[size] = pygame.font.SysFont("monaco", size, False, False)
+        return Card.FONTS[size]
+
     def __init__(self, width, height, Title):
 
         # the size of the map in grid points
@@ -53,8 +64,14 @@ class Card(pygame.Surface):
         self.CardColor        = Card.dark2
 
         # Standard font
-        self.TitleFont = pygame.font.SysFont("monaco", 18, False, False)
-        self.StatsFont = pygame.font.SysFont("monaco", 15, False, False)
+        self.TitleFont = Card.get_font(18)
+        self.StatsFont = Card.get_font(15)
+
+        # Rendered text lines by (text, color, bg_color) and what is currently drawn at a statistic position
+        self.TextCache = {}
+        self.Rows      = {}
+        # Areas of the card that changed since it was last blitted to the screen
+        self.DirtyRects = []
 
         # self.update_static(self.Active)
 
@@ -73,6 +90,8 @@ class Card(pygame.Surface):
 
         # Clear the Card
         self.fill((0,0,0))
+        self.Rows = {}
+        self.DirtyRects = [self.get_rect()]
         
         # Draw the Card background
         background = (self.margin_out, 0, self.get_width() - 2 * self.margin_out, self.get_height())
@@ -94,7 +113,7 @@ class Card(pygame.Surface):
         x = self.margin_in + self.margin_out + position[0]
         y = position[1]
 
-        self.blit(raw_image, (x,y))
+        self.DirtyRects.append(self.blit(raw_image, (x,y)))
 
         ending_at_x = x + raw_image.get_width() 
         ending_at_y = y + raw_image.get_height() #+ self.margin_in
@@ -112,14 +131,30 @@ class Card(pygame.Surface):
         # set colors by user or default
         if color    is None: color = self.StatsColor
         if bg_color is None: bg_color = self.CardColor
-        
+
+        # nothing to do if the same text is already drawn at this position
+        key = (text_string, color, bg_color)
+        Row = self.Rows.get((x,y))
+        if Row is not None:
+            if Row[0] == key: return Row[2]
+            # clear the old text, the new one might be shorter
+            self.DirtyRects.append(self.fill(bg_color, Row[1]))
+
+        # render the text only if we have not seen it before
+        Text = self.TextCache.get(key)
+        if Text is None:
+            if len(self.TextCache) >= Card.TEXT_CACHE_SIZE: self.TextCache.clear()
+            Text = self.StatsFont.render(text_string, 1, color, bg_color)
+            self.TextCache[key] = Text
+
         # draw the text to the surface
-        Text = self.StatsFont.render(text_string, 1, color, bg_color)
-        self.blit(Text,(x,y))
+        TextRect = self.blit(Text,(x,y))
+        self.DirtyRects.append(TextRect)
 
         # returns the ending x and y pixel positions inside the card. Those can be used in later calls.
         ending_at_x = x + Text.get_width()
         ending_at_y = y + Text.get_height() #+ self.margin_in
+        self.Rows[(x,y)] = (key, TextRect, (ending_at_x, ending_at_y))
         return (ending_at_x, ending_at_y)
 
     def draw_line(self, thickness, color, position, full_width=False, y_margin=None):
@@ -224,6 +259,9 @@ class AgentCard(Card):
             self.Scaled_VIEW_W   = self.ViewPort_GRID_W * self.FIX_TILE_SIZE
             self.Scaled_VIEW_H   = self.ViewPort_GRID_H * self.FIX_TILE_SIZE
 
+        # the view is rescaled into this surface on every update
+        self.ScaledView = pygame.Surface((self.Scaled_VIEW_W, self.Scaled_VIEW_H))
+
         self.VIEW_Y  = 0
         self.BASIC_STATS_Y = 0
         self.DETAIL_STATS_Y = 0
@@ -257,8 +295,8 @@ class AgentCard(Card):
         next_y = self.VIEW_Y
 
         if self.TileSize != self.FIX_TILE_SIZE:
-            ScaledView = pygame.transform.scale(self.AgentView, ( self.Scaled_VIEW_W, self.Scaled_VIEW_H ))
-            next_x, next_y = self.draw_observation(ScaledView, (0, next_y))
+            pygame.transform.scale(self.AgentView, ( self.Scaled_VIEW_W, self.Scaled_VIEW_H ), self.ScaledView)
+            next_x, next_y = self.draw_observation(self.ScaledView, (0, next_y))
         else:
             next_x, next_y = self.draw_observation(self.AgentView, (0, next_y))
 
@@ -0,0 +1,968 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import sys
+import copy
+import logging
+
+# third party imports
+import numpy as np
+
+# local imports
+from . import events
+
+logger = logging.getLogger(__name__)
+
+'''
+The rules of the game without pygame: the movement tables, the map generation and CoreWorld, which plays the game
+on plain arrays. A SandBoxWorld steps a CoreWorld, its sprites (game_objects, map) only draw the state of it.
+'''
+
+# orientation
+UP    = 0
+RIGHT = 1
+DOWN  = 2
+LEFT  = 3
+
+# TILE TYPES
+EOW   = 0
+WATER = 1
+DIRT  = 2
+GRASS = 3
+MUD   = 4
+GRASS_GROWING = 5
+TREES_GROWING = 6
+
+# basic movement depending on orientation
+MOVE_FORWARD  = {UP: [ 0,-1, 0], DOWN: [ 0, 1, 0], LEFT: [-1, 0, 0], RIGHT: [ 1, 0, 0]}
+MOVE_BACKWARD = {UP: [ 0, 1, 0], DOWN: [ 0,-1, 0], LEFT: [ 1, 0, 0], RIGHT: [-1, 0, 0]}
+MOVE_LEFT     = {UP: [-1, 0, 0], DOWN: [ 1, 0, 0], LEFT: [ 0, 1, 0], RIGHT: [ 0,-1, 0]}
+MOVE_RIGHT    = {UP: [ 1, 0, 0], DOWN: [-1, 0, 0], LEFT: [ 0,-1, 0], RIGHT: [ 0, 1, 0]}
+NOOP          = {UP: [ 0, 0, 0], DOWN: [ 0, 0, 0], LEFT: [ 0, 0, 0], RIGHT: [ 0, 0, 0]}
+
+# Define additional Survivor specific movement
+AGENT_TURN_LEFT     = {UP: [ 0, 0,-1], DOWN: [ 0, 0,-1], LEFT: [ 0, 0,-1], RIGHT: [ 0, 0,-1]}
+AGENT_TURN_RIGHT    = {UP: [ 0, 0, 1], DOWN: [ 0, 0, 1], LEFT: [ 0, 0, 1], RIGHT: [ 0, 0, 1]}
+
+# Define additional Animal specific movement
+ANIMAL_TURN_LEFT     = {UP: [-1, 0,-1], DOWN: [ 0, 1,-1], LEFT: [ 0, 0,-1], RIGHT: [ 1,-1,-1]}
+ANIMAL_TURN_RIGHT    = {UP: [ 0, 0, 1], DOWN: [-1, 1, 1], LEFT: [ 0,-1, 1], RIGHT: [ 1, 0, 1]}
+ANIMAL_TURN_FULL     = {UP: [ 0, 0, 2], DOWN: [ 0, 0, 2], LEFT: [ 0, 0, 2], RIGHT: [ 0, 0, 2]}
+
+# Constants for NPCs move mappings
+FORWARD = 0
+TURN_L  = 1
+TURN_R  = 2
+TURN_F  = 3
+STAY    = 4
+
+# The moves as arrays: [action, orientation] -> (dx, dy, d_orientation).
+# The agent actions have the order of the direct/batched step APIs (Survivor.ACTION_KEYS), the animal actions FORWARD..STAY.
+def move_table(tables):
+    return np.array([[table[orientation] for orientation in (UP, RIGHT, DOWN, LEFT)] for table in tables], dtype=np.int64)
+
+AGENT_MOVES  = move_table([MOVE_FORWARD, MOVE_BACKWARD, MOVE_LEFT, MOVE_RIGHT, NOOP, AGENT_TURN_LEFT, AGENT_TURN_RIGHT])
+ANIMAL_MOVES = move_table([MOVE_FORWARD, ANIMAL_TURN_LEFT, ANIMAL_TURN_RIGHT, ANIMAL_TURN_FULL, NOOP])
+
+# The moves of a hunting wolf: [sheep is left, right, above, below of the wolf][orientation of the wolf] -> action
+HUNT_MOVES = {
+    "left"  : {UP: TURN_L,  DOWN: TURN_R,  RIGHT: TURN_F,  LEFT: FORWARD},
+    "right" : {UP: TURN_R,  DOWN: TURN_L,  RIGHT: FORWARD, LEFT: TURN_F},
+    "above" : {UP: FORWARD, DOWN: TURN_F,  RIGHT: TURN_L,  LEFT: TURN_R},
+    "below" : {UP: TURN_F,  DOWN: FORWARD, RIGHT: TURN_R,  LEFT: TURN_L}
+}
+
+# game dynamics
+COST_MULT_LAND  = 1
+COST_MULT_WATER = 3
+GRASS_FOOD      = 100  # the food value of a grass tile, one bite eats it all
+ENERGY_BONUS    = 0.25 # for every agent when one collects food, guards the fire or herds a sheep
+WOLF_ENERGY     = 0.25 # for every agent per step the caught wolf was alive
+WOLF_DMG        = 50
+WOLF_SLOW, WOLF_FAST   = 4, 1 # move every n steps
+SHEEP_SLOW, SHEEP_FAST = 6, 2
+
+# The kinds of game objects with their grid size (width, height) and activation area (left, right, front, back)
+SURVIVOR  = 0
+SHEEP     = 1
+WOLF      = 2
+FIREPLACE = 3
+
+SIZES = {SURVIVOR: (1,1), SHEEP: (1,2), WOLF: (1,2), FIREPLACE: (4,4)}
+SHEEP_AREA = (5,5,5,4)
+WOLF_AREA  = (8,8,8,8)
+FIRE_AREA  = (3,3,3,3)
+AREAS = {SURVIVOR: (0,0,0,0), SHEEP: SHEEP_AREA, WOLF: WOLF_AREA, FIREPLACE: FIRE_AREA}
+
+SURVIVOR_STATISTICS = {
+
+            "basics" : {
+                "steps_alive" : 0,
+                "steps_water" : 0,
+                "steps_land"  : 0,
+                "collisions"  : 0
+            },
+            "specialisation" : {
+                "steps_as_fireguard" : 0,
+                "steps_as_shepherd"  : 0,
+                "blocked_sheep"    : 0,
+                "hits_from_wolf"   : 0,
+                "catched_wolf"     : 0,
+                "energy_from_wolf" : 0,
+                "collected_food"   : 0
+            },
+            "rewards" : {
+                "reward_from_fire"  : 0,
+                "reward_from_sheep" : 0,
+                "reward_from_wolf"  : 0,
+                "reward_from_food"  : 0,
+                "reward_total"      : 0
+            }
+        }
+
+SHEEP_STATISTICS = {
+
+            "basics" : {
+                "steps_total" : 0,
+                "steps_slow"  : 0,
+                "steps_fast"  : 0,
+                "collisions"  : 0
+            },
+            "specialisation" : {
+                "collected_food"  : 0,
+                "catched_by_wolf" : 0,
+                "steps_with_shepherd"    : 0,
+                "steps_without_shepherd" : 0,
+                "shepherd_switches" : 0
+            }
+        }
+
+WOLF_STATISTICS = {
+
+            "basics" : {
+                "steps_total" : 0,
+                "steps_slow"  : 0,
+                "steps_fast"  : 0,
+                "collisions"  : 0
+            },
+            "specialisation" : {
+                "steps_hunting" : 0,
+                "catched_sheep"  : 0,
+                "catched_by_survivor" : 0,
+                "attacked_survivor"   : 0
+            }
+        }
+
+FIRE_STATISTICS = {
+
+            "specialisation" : {
+                "steps_fire_on"   : 0,
+                "steps_fire_off"  : 0,
+                "fire_switches" : 0
+            }
+        }
+
+STATISTICS = {SURVIVOR: SURVIVOR_STATISTICS, SHEEP: SHEEP_STATISTICS, WOLF: WOLF_STATISTICS, FIREPLACE: FIRE_STATISTICS}
+
+def grid_from_position(pos, size_x, size_y):
+    '''
+    Return all points of a grid, given a point and a size.
+    '''
+    collision_grid = []
+
+    if pos[2] == UP or pos[2] == DOWN:
+        for w in range(size_x):
+            for h in range(size_y):
+                collision_grid.append((pos[0]+w,pos[1]+h))
+    else:
+        for w in range(size_x):
+            for h in range(size_y):
+                collision_grid.append((pos[0]+h,pos[1]+w))
+
+    return tuple(collision_grid)
+
+def view_rect(pos, area, size_x=1, size_y=1):
+    '''
+    Returns the area (left, top, width, height) in grid points around an object of size (size_x, size_y) at pos,
+    turned with its orientation. area is (left, right, front, back) as in ViewPort.
+    '''
+    grid_left, grid_right, grid_front, grid_back = area
+    x, y, orientation = pos[0], pos[1], pos[2]
+
+    # Not smart but clear
+    if orientation == UP:
+        return (x - grid_left,  y - grid_front, grid_left + grid_right + size_x, grid_front + grid_back + size_y)
+    elif orientation == DOWN:
+        return (x - grid_left,  y - grid_back,  grid_left + grid_right + size_x, grid_front + grid_back + size_y)
+    elif orientation == RIGHT:
+        return (x - grid_back,  y - grid_left,  grid_front + grid_back + size_y, grid_left + grid_right + size_x)
+    else:
+        return (x - grid_front, y - grid_right, grid_front + grid_back + size_y, grid_left + grid_right + size_x)
+
+def in_rect(rect, point):
+    '''
+    True if point is inside rect (left, top, width, height), like pygame.Rect.collidepoint.
+    '''
+    return rect[0] <= point[0] < rect[0] + rect[2] and rect[1] <= point[1] < rect[1] + rect[3]
+
+def hunt_move(orientation, hunter_pos, victim_pos):
+    '''
+    Returns the move of a wolf at hunter_pos with orientation towards the sheep at victim_pos:
+    reduce the bigger of the two distances first.
+    '''
+    diff_x = hunter_pos[0] - victim_pos[0]
+    diff_y = hunter_pos[1] - victim_pos[1]
+
+    reduce = diff_x if abs(diff_x) >= abs(diff_y) else diff_y
+
+    if reduce == diff_x:
+        side = "left" if diff_x > 0 else "right"
+    else:
+        side = "above" if diff_y > 0 else "below"
+    return HUNT_MOVES[side][orientation]
+
+'''
+Procedural map generation
+'''
+def interpolate(a: float,b: float,t: float):
+        T2 = (1 - np.cos(t * np.pi)) / 2
+        return (a * (1 - T2) + b * T2)
+
+class ValueNoise2D():
+
+    def __init__(self, width, height, octaves=8, rng=np.random):
+        # instance variables
+        self.rng = rng
+        self.OCTAVES = octaves
+        self.WIDTH = width
+        self.HEIGHT = height
+        self.START_FREQUENCY_X = 3
+        self.START_FREQUENCY_Y = 3
+        self._HeightMap = np.zeros(shape=(width,height),dtype=float)
+
+    def _normalize (self):
+        Min = self._HeightMap.min()
+        self._HeightMap = self._HeightMap - Min
+        Max = self._HeightMap.max()
+        self.HeightMap = self._HeightMap / Max
+
+    def get_height_map(self):
+        return self._HeightMap
+
+    def calculate(self):
+        CurrentFrequency_X = self.START_FREQUENCY_X
+        CurrentFrequency_Y = self.START_FREQUENCY_Y
+        CurrentAlpha = 1
+
+        for octave in range(self.OCTAVES):
+
+            if octave > 0:
+                CurrentFrequency_X *= 2
+                CurrentFrequency_Y *= 2
+                CurrentAlpha /= 2
+
+            DiscretePoints = np.zeros(shape=(CurrentFrequency_X + 1, CurrentFrequency_Y + 1))
+            for i in range(CurrentFrequency_X + 1):
+                for k in range(CurrentFrequency_Y + 1):
+                    # random between 0 and 1.
+                    DiscretePoints[i, k] = self.rng.random() * CurrentAlpha
+
+
+            for i in range(self.WIDTH):
+                for k in range(self.HEIGHT):
+                    Current_X = i / self.WIDTH  * CurrentFrequency_X
+                    Current_Y = k / self.HEIGHT * CurrentFrequency_Y
+
+                    Index_X = int(Current_X)
+                    Index_Y = int(Current_Y)
+
+                    w0 = interpolate(DiscretePoints[ Index_X, Index_Y],     DiscretePoints[Index_X + 1, Index_Y],     Current_X - Index_X)
+                    w1 = interpolate(DiscretePoints[ Index_X, Index_Y + 1], DiscretePoints[Index_X + 1, Index_Y + 1], Current_X - Index_X)
+                    w  = interpolate(w0, w1, Current_Y - Index_Y)
+
+                    self._HeightMap[i,k] += w
+
+        self._normalize()
+
+def parse_height_map(width, height, water_percentage, height_map):
+    '''
+    Converts a value noise height map in a meaningful environment.
+    This is the place to define or change the map characteristics.
+    '''
+    #print(height_map, height_map.shape)
+    RawMap  = np.zeros([width, height], dtype=int, order='F')
+    statistics = {"water" : 0, "land"  : 0, "dirt"  : 0, "grass" : 0, "total" : 0, "check" : 0}
+
+    #Convert HightMap into a TileMap
+    for row in range(width):
+        for column in range(height):
+
+            # EOW - end of world border
+            if row == 0 or row == (width - 1) or column == 0 or column == (height -1):
+            #if row < 22 or row > (height - 21) or column < 22 or column > (width -21):
+                RawMap[row,column] = EOW
+                continue
+
+            # water
+            if height_map[row,column] <= water_percentage:
+                RawMap[row,column] = WATER
+                statistics["water"] += 1
+                continue
+
+            # dirt
+            if height_map[row,column] > 0.7:
+                RawMap[row,column] = DIRT
+                statistics["dirt"] += 1
+                continue
+
+            # grass
+            if height_map[row,column] > water_percentage:
+                RawMap[row,column] = GRASS
+                statistics["grass"] += 1
+                continue
+
+    # compute some more stats
+    statistics["land"]  = statistics["dirt"] + statistics["grass"]
+    statistics["total"] = statistics["land"] + statistics["water"]
+    statistics["check"] = (width - 2) * (height - 2) # substract the Left/Right/Top/Down EOW border (-2)
+
+    return RawMap, statistics
+
+def generate_raw_map(width, height, water_percentage, rng=np.random):
+    '''
+    Returns a new raw map (an int array of tile types), drawn from rng the same way as map.generate_tile_map.
+    '''
+    Vc = ValueNoise2D(width=width, height=height, octaves=8, rng=rng)
+    Vc.calculate()
+    RawMap, Stats = parse_height_map(width, height, water_percentage, Vc.get_height_map())
+    return RawMap
+
+class CoreWorld():
+    '''
+    Plays the game on plain arrays, without pygame: the dynamics (movement, collisions, energy, food, fire, shepherding
+    and hunting), the rewards, the game events and the statistics, but no rendering and no observations.
+    A SandBoxWorld steps one and draws its state, so given the same map, settings and RandomState both play the same trajectory.
+
+    The game objects are indexed by slot: the agents by ID first, then the sheep, wolves and fireplaces
+    (the order of SandBoxWorld.get_game_objects). Their state lives in arrays with one row per slot:
+
+    Kind, ID       : the kind of the object (SURVIVOR, SHEEP, WOLF, FIREPLACE) and its ID within its kind
+    Pos            : int array (objects, 3) with x, y and orientation
+    Energy, Score, StepsAlive, CostMultiplier : the agents (StepsAlive is used by the wolves too)
+    MoveEvery, WorldSteps : the animals
+    Owner, On      : the shepherd of a sheep, the fire guard and the status of a fireplace (-1 is no owner)
+    Grid           : the grid points every object covers, for an agent Grid[i][0] is its position
+    Statistics     : one dict per slot, the copy of the STATISTICS of its kind that the rules count into
+
+    Terrain and Food hold the TileType (int8) and FoodValue (int32) of every grid point.
+    '''
+    # The arrays that change while the game runs, besides Pos (see get_state)
+    STATE_ARRAYS = ("Energy", "Score", "StepsAlive", "CostMultiplier", "MoveEvery", "WorldSteps", "Owner", "On")
+
+    def __init__(self, raw_map, rewards, num_agents=1, agent_life=999, num_sheep=0, num_wolf=0, num_fire=0, rng=np.random):
+
+        if ((num_agents > 3) or (num_agents < 1)): raise Exception("Supported number of agents: 1-3. Given: %s" % num_agents)
+
+        # All randomness of this world (map, spawn positions, animal moves) is drawn from rng
+        self.rng = rng
+        self.AgentLife = agent_life
+        self.NumAgents = num_agents
+
+        self.rewards = rewards
+        self.update_reward_values()
+
+        # The game events of the last step
+        self.EventLog = events.EventLog()
+
+        self.set_map(raw_map)
+
+        self.Kind = np.array([SURVIVOR] * num_agents + [SHEEP] * num_sheep + [WOLF] * num_wolf + [FIREPLACE] * num_fire, dtype=np.int8)
+        self.ID   = np.array(list(range(num_agents)) + list(range(num_sheep)) + list(range(num_wolf)) + list(range(num_fire)), dtype=np.int64)
+        self.NumObjects = len(self.Kind)
+        # the same as lists, they never change and a list lookup is cheaper than a numpy one in the rules below
+        self.Kinds = self.Kind.tolist()
+        self.IDs   = self.ID.tolist()
+
+        # Grid size, activation area and the space needed to spawn per object
+        self.Sizes   = [SIZES[kind] for kind in self.Kind]
+        self.Areas   = [AREAS[kind] for kind in self.Kind]
+        self.GridMax = [max(size) for size in self.Sizes]
+
+        self.Pos     = np.zeros((self.NumObjects, 3), dtype=np.int64)
+        self.OldPos  = np.zeros((self.NumObjects, 3), dtype=np.int64)
+        self.Grid    = [()] * self.NumObjects
+        self.OldGrid = [()] * self.NumObjects
+
+        self.Energy         = np.zeros(self.NumObjects, dtype=np.float64)
+        self.Score          = np.zeros(self.NumObjects, dtype=np.float64)
+        self.StepsAlive     = np.zeros(self.NumObjects, dtype=np.int64)
+        self.CostMultiplier = np.ones (self.NumObjects, dtype=np.int64)
+        self.MoveEvery      = np.zeros(self.NumObjects, dtype=np.int64)
+        self.WorldSteps     = np.zeros(self.NumObjects, dtype=np.int64)
+        self.Owner          = np.full (self.NumObjects, -1, dtype=np.int64)
+        self.On             = np.zeros(self.NumObjects, dtype=bool)
+        self.Statistics     = [copy.deepcopy(STATISTICS[kind]) for kind in self.Kinds]
+
+        self.MoveEvery[self.Kind == SHEEP] = SHEEP_SLOW
+        self.MoveEvery[self.Kind == WOLF]  = WOLF_FAST
+
+        # The per step rewards of the agents
+        self.Rewards = np.zeros(num_agents, dtype=np.float32)
+
+        # The living objects in the update order of the SandBoxWorld groups. An agent that dies is removed and
+        # added at the end again on reset, like a sprite that is killed and added to a pygame group.
+        self.Living    = []
+        self.Survivors = []
+
+        # The grid points of the tiles that changed in the last step
+        self.ChangedTiles = []
+
+        # Place the objects once before the first reset, the reset draws the positions again
+        for i in range(self.NumObjects):
+            self.place(i, self.spawn_position(i))
+            self.add(i)
+
+        self.reset()
+
+    @classmethod
+    def generate(cls, width, height, water_percentage, rewards, num_agents=1, agent_life=999, num_sheep=0, num_wolf=0, num_fire=0, rng=np.random):
+        '''
+        Creates a world on a new map, with the same map and start positions as a SandBoxWorld initialised with an equal rng.
+        '''
+        raw_map = generate_raw_map(width, height, water_percentage, rng)
+        return cls(raw_map, rewards, num_agents, agent_life, num_sheep, num_wolf, num_fire, rng)
+
+    def set_map(self, raw_map):
+        # one byte per TileType, the food of an eaten tile keeps counting the bites (see eat)
+        self.START_TERRAIN = np.array(raw_map, dtype=np.int8)
+        self.START_FOOD    = np.where(self.START_TERRAIN == GRASS, GRASS_FOOD, 0).astype(np.int32)
+        self.Terrain = self.START_TERRAIN.copy()
+        self.Food    = self.START_FOOD.copy()
+
+    def memory_usage(self):
+        '''
+        Returns an estimate of the memory of this world in bytes: the numpy arrays (the map grids START_TERRAIN, START_FOOD,
+        Terrain and Food and the state of the objects), the collision grids and the statistics dicts. Python objects are
+        counted shallow (sys.getsizeof), like SandBoxWorld.memory_usage.
+        '''
+        Arrays = sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+        Grids  = sum(sys.getsizeof(grid) + sum(sys.getsizeof(point) for point in grid) for grid in self.Grid + self.OldGrid)
+        Statistics = sum(sys.getsizeof(group) for statistics in self.Statistics for group in [statistics] + list(statistics.values()))
+        return Arrays + Grids + Statistics
+
+    def update_reward_values(self):
+        '''
+        Caches the reward values. Call it again if the rewards dict changed.
+        '''
+        self.RewardGrass = self.rewards["grass"]
+        self.RewardSheep = self.rewards["sheep"]
+        self.RewardFire  = self.rewards["fire"]
+        self.RewardWolf  = self.rewards["wolf"]
+
+    def reset(self, raw_map=None):
+        '''
+        Puts the map back to its start and every object to a new random position with new statistics,
+        or starts on raw_map if given (a new map from generate_raw_map or a loaded one).
+        '''
+        self.EventLog.clear()
+        self.ChangedTiles = []
+        self.Statistics   = [copy.deepcopy(STATISTICS[kind]) for kind in self.Kinds]
+
+        if raw_map is not None:
+            self.set_map(raw_map)
+            self.Living    = []
+            self.Survivors = []
+        else:
+            self.Terrain[:] = self.START_TERRAIN
+            self.Food[:]    = self.START_FOOD
+
+        for i in range(self.NumObjects):
+            self.reset_object(i, self.spawn_position(i))
+            self.add(i)
+
+    def spawn_position(self, i):
+        if self.Kinds[i] == SURVIVOR:
+            return self.free_random_position(self.Living, min_space=self.GridMax[i])
+        return self.free_random_position(self.Living, forbidden_types=[WATER], min_space=self.GridMax[i])
+
+    def add(self, i):
+        if i not in self.Living:
+            self.Living.append(i)
+        if self.Kinds[i] == SURVIVOR and i not in self.Survivors:
+            self.Survivors.append(i)
+
+    def kill(self, i):
+        self.Living.remove(i)
+        self.Survivors.remove(i)
+
+    def place(self, i, pos):
+        self.Pos[i]    = pos
+        self.OldPos[i] = pos
+        self.Grid[i]   = grid_from_position(self.Pos[i].tolist(), *self.Sizes[i])
+        self.OldGrid[i] = self.Grid[i]
+
+    def reset_object(self, i, pos):
+        '''
+        Puts an object to pos and resets its state, the statistics are kept until the world is reset.
+        '''
+        kind = self.Kinds[i]
+        if kind == SURVIVOR:
+            self.Energy[i]         = self.AgentLife
+            self.Score[i]          = 0
+            self.StepsAlive[i]     = 0
+            self.CostMultiplier[i] = 1
+        elif kind == WOLF:
+            self.WorldSteps[i] = 0
+            self.StepsAlive[i] = 0
+        elif kind == FIREPLACE:
+            self.On[i]    = False
+            self.Owner[i] = -1
+        self.place(i, pos)
+
+    def random_position(self, forbidden_types=[], min_space=1):
+        '''
+        Returns a random position (x, y, UP) that is min_space points away from the border. With forbidden_types
+        the whole area of min_space from that point must neither be one of them nor EOW.
+        '''
+        # calculate bounds
+        MAX_WIDTH  = self.Terrain.shape[0] - 1 - (min_space - 1)
+        MAX_HEIGHT = self.Terrain.shape[1] - 1 - (min_space - 1)
+
+        tries = 0
+        while True:
+            if tries >= 10000: raise Exception("WARNING: We tried {} times to find a valid position of size ({},{}). Please consider a bigger map size than {}, or reduce the number of GameObjects!".format(tries, min_space, min_space, self.Terrain.shape))
+            tries += 1
+
+            X = self.rng.randint(1, MAX_WIDTH)
+            Y = self.rng.randint(1, MAX_HEIGHT)
+
+            if forbidden_types:
+                area = self.Terrain[X:X+min_space, Y:Y+min_space]
+                if (area == EOW).any() or np.isin(area, forbidden_types).any(): continue
+
+            return (X, Y, 0)
+
+    def free_random_position(self, objects, forbidden_types=[], min_space=1):
+        '''
+        Returns a random position (see random_position) whose area of min_space is not blocked by the given objects.
+        '''
+        tries = 0
+        while True:
+            if tries >= 10000: raise Exception("WARNING: We tried {} times to place an object of size ({},{}). Please consider a bigger map size than {}, or reduce the number of GameObjects!".format(tries, min_space, min_space, self.Terrain.shape))
+            tries += 1
+
+            candidate = self.random_position(forbidden_types, min_space)
+            candidate_grid = grid_from_position(candidate, min_space, min_space)
+
+            if not any(point in self.Grid[i] for i in objects for point in candidate_grid):
+                return candidate
+
+    def move(self, i, moves, action):
+        self.OldPos[i]  = self.Pos[i]
+        self.OldGrid[i] = self.Grid[i]
+
+        pos = self.Pos[i]
+        pos += moves[action, pos[2]]
+        pos[2] %= 4 # clip orientation to (0..3)
+        self.Grid[i] = grid_from_position(pos.tolist(), *self.Sizes[i])
+
+    def set_back(self, i):
+        self.Pos[i]  = self.OldPos[i]
+        self.Grid[i] = self.OldGrid[i]
+
+    def add_reward(self, i, reward):
+        # add to the total score and to this steps reward
+        self.Score[i] += reward
+        self.Rewards[self.IDs[i]] += reward
+        self.Statistics[i]["rewards"]["reward_total"] = self.Score[i].item()
+
+    def add_energy(self, living, energy):
+        for i in living:
+            if self.Kinds[i] == SURVIVOR:
+                self.Energy[i] += energy
+
+    def eat(self, i, point):
+        '''
+        A creature steps on a grid point. Returns True if it ate the grass, the grass turns into mud.
+        Only grass and the tiles that changed since the start map count the bites, the others are not part of the snapshots.
+        '''
+        terrain = self.Terrain[point]
+        if terrain != GRASS and terrain == self.START_TERRAIN[point]: return False
+
+        self.Food[point] -= GRASS_FOOD
+
+        if self.Food[point] <= 0 and terrain == GRASS:
+            self.Food[point]    = 0
+            self.Terrain[point] = MUD
+            self.ChangedTiles.append(point)
+
+            if self.Kinds[i] == SURVIVOR:
+                self.add_reward(i, self.RewardGrass)
+                self.EventLog.emit(events.GRASS_EATEN, self.IDs[i], -1, point[0], point[1])
+                self.Statistics[i]["specialisation"]["collected_food"] +=1
+                self.Statistics[i]["rewards"]["reward_from_food"] += self.RewardGrass
+            elif self.Kinds[i] == SHEEP:
+                self.EventLog.emit(events.SHEEP_GRAZED, self.IDs[i], -1, point[0], point[1])
+                self.Statistics[i]["specialisation"]["collected_food"] +=1
+            return True
+
+        return False
+
+    def step(self, actions):
+        '''
+        Plays one step. actions holds one action index per agent ID (see AGENT_MOVES).
+        '''
+        if not self.begin_step(): return
+
+        # update (living) agents first, npcs second
+        self.step_survivors(actions)
+        self.step_npcs()
+
+    def begin_step(self):
+        '''
+        Clears the rewards, events and changed tiles of the last step. Returns False if the game is over.
+        A SandBoxWorld calls it and then step_survivors and step_npcs on its own to time them separately.
+        '''
+        self.Rewards.fill(0)
+        self.EventLog.clear()
+        self.ChangedTiles = []
+
+        return not self.game_over()
+
+    def step_survivors(self, actions):
+        for i in list(self.Survivors):
+            self.update_survivor(i, actions[self.IDs[i]], self.Living)
+
+    def step_npcs(self):
+        for i in range(self.NumAgents, self.NumObjects):
+            kind = self.Kinds[i]
+            if kind == SHEEP:
+                self.update_sheep(i, self.Living)
+            elif kind == WOLF:
+                self.update_wolf(i, self.Living)
+            else:
+                self.update_fireplace(i, self.Living)
+
+    def update_survivor(self, i, action, living):
+
+        # apply the basic cost
+        self.Energy[i] -= 1 * self.CostMultiplier[i]
+
+        # If survivor is dead return
+        if self.Energy[i] <= 0:
+            self.EventLog.emit(events.SURVIVOR_DIED, self.IDs[i], -1, self.Pos[i,0], self.Pos[i,1])
+            self.kill(i)
+            return
+
+        self.StepsAlive[i] += 1
+        Statistics = self.Statistics[i]
+        Statistics["basics"]["steps_alive"] +=1
+        self.move(i, AGENT_MOVES, action)
+
+        # Check collisions with map and other game_objects
+        for point in self.Grid[i]:
+
+            if self.Terrain[point] == EOW:
+                self.set_back(i)
+                Statistics["basics"]["collisions"] +=1
+                break
+
+            for j in living:
+                if point in self.Grid[j]:
+                    kind = self.Kinds[j]
+
+                    if kind == SURVIVOR:
+                        if i != j:
+                            self.set_back(i)
+                            Statistics["basics"]["collisions"] +=1
+                            break
+
+                    elif kind == WOLF:
+                        self.add_reward(i, self.RewardWolf)
+                        self.EventLog.emit(events.WOLF_CAUGHT, self.IDs[i], self.IDs[j], self.Pos[j,0], self.Pos[j,1])
+
+                        # every living agent gets the energy, the catcher counts all of it
+                        energy_from_wolf = self.StepsAlive[j].item() * WOLF_ENERGY
+                        self.add_energy(living, energy_from_wolf)
+                        Statistics["specialisation"]["energy_from_wolf"] += energy_from_wolf * len(self.Survivors)
+
+                        # Find a new random position for the wolf and reset
+                        self.reset_object(j, self.free_random_position(living, forbidden_types=[WATER], min_space=self.GridMax[j]))
+
+                        self.Statistics[j]["specialisation"]["catched_by_survivor"] +=1
+                        Statistics["specialisation"]["catched_wolf"] +=1
+                        Statistics["rewards"]["reward_from_wolf"] += self.RewardWolf
+                        break
+                    else:
+                        self.set_back(i)
+                        Statistics["basics"]["collisions"] +=1
+                        break
+
+        # Now that we have the final position update the map on this position
+        for point in self.Grid[i]:
+            if self.Terrain[point] == WATER:
+                self.CostMultiplier[i] = COST_MULT_WATER
+                Statistics["basics"]["steps_water"] +=1
+            else:
+                self.CostMultiplier[i] = COST_MULT_LAND
+                Statistics["basics"]["steps_land"] +=1
+
+            if self.eat(i, point):
+                self.add_energy(living, ENERGY_BONUS)
+
+    def select_animal_move(self, i):
+        # Every n world steps select a move with some probability
+        action_prob = self.rng.random()
+        if action_prob < 0.1:
+            return TURN_L
+        elif action_prob < 0.2:
+            return TURN_R
+        elif action_prob < 0.9:
+            return FORWARD
+        return STAY
+
+    def update_sheep(self, i, living):
+
+        self.WorldSteps[i] += 1
+        Statistics = self.Statistics[i]
+
+        # steps_slow counts the steps at both speeds, steps_fast stays 0
+        Statistics["basics"]["steps_slow"] +=1
+
+        action = STAY
+        if self.WorldSteps[i] % self.MoveEvery[i] == 0:
+            Statistics["basics"]["steps_total"] +=1
+            action = self.select_animal_move(i)
+        self.move(i, ANIMAL_MOVES, action)
+
+        # Check collisions and set the final position
+        for point in self.Grid[i]:
+            tile_type = self.Terrain[point]
+
+            if tile_type == EOW:
+                self.set_back(i)
+                Statistics["basics"]["collisions"] +=1
+                break
+
+            if tile_type == WATER:
+                self.set_back(i)
+                self.move(i, ANIMAL_MOVES, TURN_F)
+                Statistics["basics"]["collisions"] +=1
+                break
+
+            # The Sheep is blocked by every other creature
+            for j in living:
+                if point in self.Grid[j]:
+                    if self.Kinds[j] != SHEEP or i != j:
+                        self.set_back(i)
+                        Statistics["basics"]["collisions"] +=1
+                        if self.Kinds[j] == SURVIVOR:
+                            self.Statistics[j]["specialisation"]["blocked_sheep"] +=1
+                        break
+
+        for point in self.Grid[i]:
+            self.eat(i, point)
+
+        # With the final position search for shepherds
+        has_a_shepherd = False
+        area = view_rect(self.Pos[i].tolist(), self.Areas[i], *self.Sizes[i])
+        for j in living:
+            if self.Kinds[j] == SURVIVOR and in_rect(area, self.Grid[j][0]):
+
+                # If the sheep has no shepherd or the survivor is already its shepherd, apply the reward and set "new" shepherd
+                if (self.Owner[i] == -1) or (self.Owner[i] == self.IDs[j]):
+                    if self.Owner[i] != self.IDs[j]:
+                        self.EventLog.emit(events.SHEPHERD, self.IDs[i], self.IDs[j], self.Pos[i,0], self.Pos[i,1])
+                    self.Owner[i] = self.IDs[j]
+                    self.add_reward(j, self.RewardSheep)
+                    has_a_shepherd = True
+
+                    self.Statistics[j]["specialisation"]["steps_as_shepherd"] +=1
+                    self.Statistics[j]["rewards"]["reward_from_sheep"] += self.RewardSheep
+                    Statistics["specialisation"]["steps_with_shepherd"] +=1
+
+        if has_a_shepherd:
+            self.add_energy(living, ENERGY_BONUS)
+        else:
+            if self.Owner[i] != -1:
+                self.EventLog.emit(events.SHEPHERD, self.IDs[i], -1, self.Pos[i,0], self.Pos[i,1])
+            self.Owner[i] = -1
+            Statistics["specialisation"]["steps_without_shepherd"] +=1
+
+    def update_wolf(self, i, living):
+
+        self.WorldSteps[i] += 1
+        self.StepsAlive[i] += 1
+        Statistics = self.Statistics[i]
+
+        # Check if a sheep is in the hunting range, the last one found is hunted
+        hunting   = False
+        sheep_pos = ()
+        area = view_rect(self.Pos[i].tolist(), self.Areas[i], *self.Sizes[i])
+        for j in living:
+            if self.Kinds[j] == SHEEP:
+                for point in self.Grid[j]:
+                    if in_rect(area, point):
+                        hunting   = True
+                        sheep_pos = (self.Pos[j,0], self.Pos[j,1])
+                        break
+
+        # steps_slow counts the steps at both speeds, steps_fast stays 0
+        Statistics["basics"]["steps_slow"] +=1
+
+        action = STAY
+        if self.WorldSteps[i] % self.MoveEvery[i] == 0:
+            Statistics["basics"]["steps_total"] +=1
+            if hunting:
+                action = hunt_move(self.Pos[i,2], self.Pos[i], sheep_pos)
+                Statistics["specialisation"]["steps_hunting"] +=1
+            else:
+                action = self.select_animal_move(i)
+        self.move(i, ANIMAL_MOVES, action)
+
+        # check collisions with map and game objects
+        for point in self.Grid[i]:
+            tile_type = self.Terrain[point]
+
+            if tile_type == EOW:
+                self.set_back(i)
+                Statistics["basics"]["collisions"] +=1
+                break
+
+            if tile_type == WATER:
+                self.set_back(i)
+                self.move(i, ANIMAL_MOVES, TURN_F)
+                Statistics["basics"]["collisions"] +=1
+
+                if hunting:
+                    # attempt another move to better escape from "trapped" situations
+                    self.move(i, ANIMAL_MOVES, self.rng.choice([FORWARD, TURN_R, TURN_L, STAY]))
+
+                    for new_point in self.Grid[i]:
+                        if self.Terrain[new_point] == WATER or self.Terrain[new_point] == EOW:
+                            self.set_back(i)
+                            Statistics["basics"]["collisions"] +=1
+                            break
+                        self.wolf_collisions(i, new_point, living)
+                break
+
+            self.wolf_collisions(i, point, living)
+
+    def wolf_collisions(self, i, point, living):
+
+        for j in living:
+            if point in self.Grid[j]:
+                kind = self.Kinds[j]
+
+                if kind == WOLF:
+                    if i != j:
+                        self.set_back(i)
+                        self.Statistics[i]["basics"]["collisions"] +=1
+                        break
+
+                elif kind == SHEEP:
+                    self.EventLog.emit(events.SHEEP_KILLED, self.IDs[i], self.IDs[j], self.Pos[j,0], self.Pos[j,1])
+
+                    # Find a new random position for the sheep and reset
+                    self.reset_object(j, self.free_random_position(living, forbidden_types=[WATER], min_space=self.GridMax[j]))
+
+                    self.Statistics[i]["specialisation"]["catched_sheep"] +=1
+                    self.Statistics[j]["specialisation"]["catched_by_wolf"] +=1
+                    break
+
+                elif kind == SURVIVOR:
+                    # Apply the attack damage of the wolf to the survivor, reset position
+                    self.Energy[j] -= WOLF_DMG
+                    self.EventLog.emit(events.WOLF_ATTACK, self.IDs[i], self.IDs[j], self.Pos[j,0], self.Pos[j,1])
+                    self.set_back(i)
+                    self.Statistics[i]["specialisation"]["attacked_survivor"] +=1
+                    self.Statistics[j]["specialisation"]["hits_from_wolf"] +=1
+
+                    logger.debug("WOLF attacks Agent %d -%s dmg, new energy: %s!", self.IDs[j], WOLF_DMG, self.Energy[j])
+                    break
+                else:
+                    # Every other game object is just unwalkable for the wolf
+                    self.set_back(i)
+                    break
+
+    def update_fireplace(self, i, living):
+
+        self.On[i] = False
+        area = view_rect(self.Pos[i].tolist(), self.Areas[i], *self.Sizes[i])
+        for j in living:
+            if self.Kinds[j] == SURVIVOR and in_rect(area, self.Grid[j][0]):
+
+                # If no one or the current survivor is the fire guard, apply the reward and turn the fire on.
+                if (self.Owner[i] == -1) or (self.Owner[i] == self.IDs[j]):
+                    if self.Owner[i] != self.IDs[j]:
+                        self.EventLog.emit(events.FIRE_GUARD, self.IDs[i], self.IDs[j], self.Pos[i,0], self.Pos[i,1])
+                    self.Owner[i] = self.IDs[j]
+                    self.add_reward(j, self.RewardFire)
+                    self.Statistics[j]["specialisation"]["steps_as_fireguard"] +=1
+                    self.Statistics[j]["rewards"]["reward_from_fire"] += self.RewardFire
+                    self.On[i] = True
+
+        # Switch the Wolf and Sheep Movement Speed depending on the fire status and add Energy to the agents!
+        for j in living:
+            kind = self.Kinds[j]
+            if kind == SURVIVOR and self.On[i]:
+                self.Energy[j] += ENERGY_BONUS
+            elif kind == WOLF:
+                self.MoveEvery[j] = WOLF_SLOW if self.On[i] else WOLF_FAST
+            elif kind == SHEEP:
+                self.MoveEvery[j] = SHEEP_FAST if self.On[i] else SHEEP_SLOW
+
+        if self.On[i]:
+            self.Statistics[i]["specialisation"]["steps_fire_on"] +=1
+        else:
+            self.Statistics[i]["specialisation"]["steps_fire_off"] +=1
+            if self.Owner[i] != -1:
+                self.EventLog.emit(events.FIRE_GUARD, self.IDs[i], -1, self.Pos[i,0], self.Pos[i,1])
+            self.Owner[i] = -1
+
+    def game_over(self):
+        # Game Over if all Agents are Dead
+        return not self.Survivors
+
+    def get_score(self):
+        return self.Score[:self.NumAgents].sum()
+
+    def get_rewards(self):
+        return self.Rewards
+
+    def get_events(self):
+        return self.EventLog.get_events()
+
+    def get_state(self):
+        '''
+        Returns copies of the positions, the STATE_ARRAYS and the statistics and the living objects and agents
+        in update order, see set_state.
+        '''
+        return (self.Pos.copy(),
+                tuple(getattr(self, name).copy() for name in CoreWorld.STATE_ARRAYS),
+                tuple({group: values.copy() for group, values in statistics.items()} for statistics in self.Statistics),
+                tuple(self.Living),
+                tuple(self.Survivors))
+
+    def set_state(self, positions, states, statistics, living, survivors):
+        '''
+        Puts the objects back to a state from get_state, the terrain is set with set_tile and reset_tile.
+        '''
+        for i in range(self.NumObjects):
+            self.place(i, positions[i])
+        for name, values in zip(CoreWorld.STATE_ARRAYS, states):
+            getattr(self, name)[:] = values
+
+        self.Statistics = [{group: values.copy() for group, values in stats.items()} for stats in statistics]
+        self.Living     = list(living)
+        self.Survivors  = list(survivors)
+        self.ChangedTiles = []
+        self.EventLog.clear()
+
+    def set_tile(self, point, tile_type, food_value):
+        self.Terrain[point] = tile_type
+        self.Food[point]    = food_value
+
+    def reset_tile(self, point):
+        self.Terrain[point] = self.START_TERRAIN[point]
+        self.Food[point]    = self.START_FOOD[point]
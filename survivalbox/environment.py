@@ -1,6 +1,7 @@
 __author__ = 'Johannes Theodoridis'
 
 # standard imports
+import logging
 
 # third party imports
 import numpy as np
@@ -9,31 +10,63 @@ import pickle
 
 # local imports
 from . import map
+from . import core
 from . import utils
-from .game_objects import Survivor, ViewPort, Fireplace, Sheep, Wolf, create_marker_rect
+from . import events
+from . import profiling
+from . import assets
+from .game_objects import Survivor, ViewPort, Fireplace, Sheep, Wolf, create_marker_rect, ROTATED_IMAGES
 from .card import Card, AgentCard, StatisticsCard
+from .observation import FrameStack, ObservationProcessor
+from .snapshot import WorldSnapshot, terrain_array
+
+logger = logging.getLogger(__name__)
 
 class SandBoxWorld():
     '''
     A class that holds the GameState in:
     TileMap, AgentList
-    Applies dynamics based on agent actions and
+    Applies dynamics based on agent actions by stepping a core.CoreWorld and
     can render the World State as well as the Agent Views
     '''
-    def __init__(self, map_width, map_height, water_percentage, init_tile_size, rewards, full_map_observation):
+    # pygame key of an agent action -> action index of the core (see core.AGENT_MOVES)
+    ACTION_INDEX = {key: index for index, key in enumerate(Survivor.ACTION_KEYS)}
+
+    def __init__(self, map_width, map_height, water_percentage, init_tile_size, rewards, full_map_observation, render_human_view=True, frame_stack=1,
+                 grayscale=False, downsample=1, observation_size=None):
 
         self.FULL_MAP_OBSERVATION = full_map_observation
+        # Reduce the observations inside the engine: 1 gray channel instead of RGB and/or every n'th pixel only
+        self.GRAYSCALE  = grayscale
+        self.DOWNSAMPLE = downsample
+        # A fixed (width, height) for the full map observation, independent of the map size
+        self.OBSERVATION_SIZE = observation_size
+        if self.OBSERVATION_SIZE is not None and not self.FULL_MAP_OBSERVATION:
+            raise Exception("A fixed observation_size is only supported with full_map_observation=True")
+        if self.DOWNSAMPLE < 1: raise Exception("Downsample factor needs to be >= 1. Given: %s" % self.DOWNSAMPLE)
+        # The number of past observations kept per agent, 1 means no frame stacking
+        self.FRAME_STACK = frame_stack
+        # If False, update() only produces what the observations need and the human view is drawn on demand by render()
+        self.RENDER_HUMAN_VIEW = render_human_view
 
         self.MAPWIDTH = map_width
         self.MAPHEIGHT = map_height
         self.WATER_PERCENTAGE = water_percentage
 
+        # The rules and the state of the game on plain arrays, the sprites and tiles below only draw it
+        self.Core = None
         # The actual world map (GameState) as a 2D array
         self.TileMap = None
         # A dict holding the inital state of the world
         self.START_MAP = None
+        # True if a map was created or loaded since the last reset, the core starts over on it
+        self.NewMap = False
         # The map surface to draw the maps state
         self.MapSurface = pygame.Surface((0,0))
+        # The cached terrain layer, only redrawn where a tile changes its type
+        self.TerrainSurface = pygame.Surface((0,0))
+        # Where the game objects were drawn on the MapSurface in the last frame
+        self.EntityRects = []
         # The pixel of a single grid tile, used for drawing the game state
         self.TileSize = init_tile_size
         # An extra Clipping border based on the Agents max ViewPort
@@ -52,6 +85,28 @@ class SandBoxWorld():
 
         self.AgentList = {}
         self.NPC_List  = []
+        # The rewards every agent received in the last update, filled by the core where the rewards are granted
+        self.Rewards = np.zeros(0, dtype=np.float32)
+        # The game events of the last update (grass eaten, wolf caught, ...), filled by the core where the rules fire
+        self.EventLog = events.EventLog()
+        # The tiles that differ from the start map (grid position -> tile) and their snapshot array, None if it is outdated
+        self.ChangedTiles    = {}
+        self.TerrainSnapshot = None
+        # Preallocated uint8 buffer (NumAgents, width, height, channels) holding the agent observations
+        self.Observations = None
+        # Turns the raw agent views into observations (grayscale, downsampling)
+        self.ObservationProcessor = None
+        # The full map is scaled into this surface if a fixed OBSERVATION_SIZE is given
+        self.ScaledMapView = None
+        # The history of the last FRAME_STACK observations, only used with FRAME_STACK > 1
+        self.FrameStack = None
+        # Times the phases of update, reset, create_new_map and get_agent_views, None while profiling is disabled
+        self.Timer = None
+        # Receives the statistics of every finished episode at the next reset, see set_statistics_exporter
+        self.StatisticsExporter = None
+        self.StatisticsLabel    = 0
+        self.Episodes     = 0   # the finished episodes
+        self.EpisodeSteps = 0   # the updates of the current episode
         self.CardList  = {}
         self.StatisticsCard = None
         self.CARD_MARGIN = 10
@@ -63,6 +118,14 @@ class SandBoxWorld():
         self.RENDER_CARDS       = True
         self.RENDER_SCALED_MAP  = True
 
+        # Dirty rectangle bookkeeping for the human view
+        self.MAX_DIRTY_RECTS = 256     # with more changes than this we simply redraw everything
+        self.MapDirtyRects   = []      # changed areas of the MapSurface since the last render, None for everything
+        self.ScreenUpdates   = None    # changed areas of the screen since the last display update, None for everything
+        self.FullRedraw      = True    # the screen layout changed, redraw everything
+        self.RenderScreen    = None    # the screen we rendered to last time
+        self.HugeMap         = None    # the scaled up MapSurface, updated incrementally
+
         # Some helpful sprite groups which we can use for drawing and collison detection
         self.everything_group       = pygame.sprite.RenderUpdates()
         # Map related groups
@@ -102,8 +165,10 @@ class SandBoxWorld():
             self.MAX_VIEW_PORT = np.max(ViewPort_Grid)
             self.ClippingBorder = (self.MAX_VIEW_PORT - 1) * self.TileSize
         
-        self.MapSurface = pygame.Surface((self.MAPWIDTH  * self.TileSize  + 2 * self.ClippingBorder,
-                                          self.MAPHEIGHT * self.TileSize  + 2 * self.ClippingBorder))
+        self.create_map_surfaces()
+
+        # the map size might have changed, so we need new observation buffers
+        self.create_observation_buffer()
 
         self.create_new_map(loaded_map)
 
@@ -119,8 +184,11 @@ class SandBoxWorld():
 
     def init(self, rng, num_agents=1, agent_life=999, view_port_dimensions={}, num_sheep=0, num_wolf=0, num_fire=0):
 
-        # Set the rng
+        # Set the rng, all randomness of this world (map, spawn positions, animal moves) is drawn from it
         self.rng = rng
+
+        timer = self.Timer
+        if timer is not None: start = timer.clock()
         
         # Set the number of agents
         self.NumAgents = num_agents
@@ -151,67 +219,66 @@ class SandBoxWorld():
             self.ClippingBorder = (self.MAX_VIEW_PORT - 1) * self.TileSize
         
         # Create a drawing Surface
-        self.MapSurface = pygame.Surface((self.MAPWIDTH  * self.TileSize  + 2 * self.ClippingBorder,
-                                          self.MAPHEIGHT * self.TileSize  + 2 * self.ClippingBorder))
+        self.create_map_surfaces()
+
+        # Allocate the observation buffer once, it is filled in place on every update
+        self.create_observation_buffer()
+
+        if timer is not None: timer.lap("surfaces", start)
 
         # If no map is loaded create a new one based on the current settings
         if(self.START_MAP is None):
             self.create_new_map()
 
+        if timer is not None: start = timer.clock()
+
+        # The core places all objects and resets itself
+        self.Core = core.CoreWorld(self.START_MAP["RawMap"], self.rewards, self.NumAgents, self.AgentLife, self.NumSheeps, self.NumWolfs, self.NumFires, self.rng)
+        self.NewMap   = False
+        self.Rewards  = self.Core.Rewards
+        self.EventLog = self.Core.EventLog
+
         # Create our Agents
         self.create_agents(self.NumAgents)
 
         # Create the Game Objects
         self.create_game_objects(self.NumSheeps, self.NumWolfs, self.NumFires)
 
-        # Reset the GameState
-        self.reset()
+        if timer is not None: timer.lap("spawn", start)
+
+        # Draw the reset GameState
+        self.TileMap = self.START_MAP["TileMap"]
+        self.reset_sprites()
 
         # Create cards for human friendly rendering interface
         self.create_cards()
 
     def create_agents(self, num_agents):
+        # The sprites of the core slots, the agents by ID first (see core.CoreWorld)
         self.AgentList = {}
         for ID in range(num_agents):
 
-            start_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites())
-            NewAgent = Survivor(ID, self.rewards, self.ViewPort, start_pos, self.TileSize, self.ClippingBorder, self.AgentLife)
+            NewAgent = Survivor(ID, self.ViewPort, self.Core.Pos[ID], self.TileSize, self.ClippingBorder, self.AgentLife)
+            AgentView = pygame.Surface(self.get_observation_shape()[:2])
             
-            self.AgentList[ID] = { "ID" : ID, "Agent" : NewAgent, "ViewPort_Grid" : NewAgent.ViewPort.get_grid_dimensions(), "ViewPort" : None, "AgentView" : None}
-            # add to groups
-            self.everything_group.add(NewAgent)
-            self.game_objects_group.add(NewAgent)
-            self.survivor_group.add(NewAgent)
+            self.AgentList[ID] = { "ID" : ID, "Agent" : NewAgent, "ViewPort_Grid" : NewAgent.ViewPort.get_grid_dimensions(), "ViewPort" : None, "AgentView" : AgentView}
 
     def create_game_objects(self, num_sheep, num_wolf, num_fire):
+        # The sprites of the core slots after the agents: sheep, wolves and fireplaces
         self.NPC_List = []
+        slot = self.NumAgents
 
         for ID in range(num_sheep):
-            start_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites(), forbidden_types=[map.WATER], min_space=2)
-            sheep = Sheep(ID, start_pos, self.TileSize, self.ClippingBorder)
-            
-            self.everything_group.add(sheep)
-            self.game_objects_group.add(sheep)
-            self.npc_group.add(sheep)
-            self.NPC_List.append(sheep)
+            self.NPC_List.append(Sheep(ID, self.Core.Pos[slot], self.TileSize, self.ClippingBorder))
+            slot += 1
 
         for ID in range(num_wolf):
-            start_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites(), forbidden_types=[map.WATER], min_space=2)
-            wolf = Wolf(ID, start_pos, self.TileSize, self.ClippingBorder)
-            
-            self.everything_group.add(wolf)
-            self.game_objects_group.add(wolf)
-            self.npc_group.add(wolf)
-            self.NPC_List.append(wolf)
+            self.NPC_List.append(Wolf(ID, self.Core.Pos[slot], self.TileSize, self.ClippingBorder))
+            slot += 1
 
         for ID in range(num_fire):
-            start_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites(), forbidden_types=[map.WATER], min_space=4)
-            fp = Fireplace(ID, start_pos, self.TileSize, self.ClippingBorder)
-            
-            self.everything_group.add(fp)
-            self.game_objects_group.add(fp)
-            self.npc_group.add(fp)
-            self.NPC_List.append(fp)
+            self.NPC_List.append(Fireplace(ID, self.Core.Pos[slot], self.TileSize, self.ClippingBorder))
+            slot += 1
 
     def create_cards(self):
         self.CardList = {}
@@ -230,7 +297,10 @@ class SandBoxWorld():
             self.StatisticsCard = StatisticsCard(self.START_MAP["Stats"], self.START_MAP["Meta"], self.NPC_List, self.rewards)
 
     def create_new_map(self, loaded_map=None):
-        
+
+        timer = self.Timer
+        if timer is not None: start = timer.clock()
+
         self.everything_group.empty()      
         self.bord_objects_group.empty()  
         self.eow_group.empty()
@@ -243,6 +313,9 @@ class SandBoxWorld():
         self.survivor_group.empty()
         self.npc_group.empty()
 
+        # the core starts over on the new map at the next reset
+        self.NewMap = True
+
         if loaded_map:
             self.START_MAP = loaded_map
             self.TileMap   = self.START_MAP["TileMap"]
@@ -251,7 +324,9 @@ class SandBoxWorld():
                                                                  self.MAPHEIGHT, 
                                                                  self.WATER_PERCENTAGE, 
                                                                  self.TileSize, 
-                                                                 self.ClippingBorder)
+                                                                 self.ClippingBorder,
+                                                                 self.rng,
+                                                                 timer)
 
         # TODO: We should do some sanity checks to make sure every GameObject will fit on the map!
         # Something like: Map must have more valid spawn places (for the biggest object) than > total num of objects
@@ -277,10 +352,21 @@ class SandBoxWorld():
                 self.water_group.add(Tile)
             else:
                 self.land_group.add(Tile)
-  
-            
+
+        if timer is not None: timer.lap("new_map", start)
+
     def reset(self, new_map=False):
 
+        timer = self.Timer
+        if timer is not None: start = timer.clock()
+
+        # hand over the statistics of the finished episode before they are reset
+        if self.EpisodeSteps > 0:
+            if self.StatisticsExporter is not None:
+                self.StatisticsExporter.export(self.get_episode_statistics())
+            self.Episodes += 1
+        self.EpisodeSteps = 0
+
         self.score = 0
         
         # Reset TileMap to StartMap or create a new one
@@ -288,38 +374,88 @@ class SandBoxWorld():
             self.create_new_map()
         else:
             self.TileMap = self.START_MAP["TileMap"] # in case a new map was loaded AFTER init...
-       
-        # Reset all Tiles of the map 
-        for Tile in self.TileMap.flatten():
-            Tile.reset()
-       
-        # Reset all Agents
-        for ID in self.AgentList:
-            agent = self.AgentList[ID]["Agent"]
 
-            # find a position that is no blocked by another GameObject
-            new_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites())
-            agent.reset(new_pos, reset_stats=True)
+        # Reset the core, on a new or loaded map it starts over with the raw map of it
+        self.Core.reset(self.START_MAP["RawMap"] if self.NewMap else None)
+        self.NewMap = False
 
-            self.everything_group.add(agent)
-            self.game_objects_group.add(agent)
-            self.survivor_group.add(agent)
+        self.reset_sprites()
 
-        for NPC in self.NPC_List:
+        if timer is not None: timer.lap("reset", start)
 
-            # find a position that is no blocked by another GameObject
-            new_pos = utils.free_random_position(self.TileMap, self.game_objects_group.sprites(), forbidden_types=[map.WATER], min_space=NPC.GRID_MAX)
-            NPC.reset(new_pos, reset_stats=True)
+    def reset_sprites(self):
+        '''
+        Puts the tiles and game objects to the state of the core after a reset and redraws everything.
+        '''
+        self.ChangedTiles    = {}
+        self.TerrainSnapshot = None
 
-            self.everything_group.add(NPC)
-            self.game_objects_group.add(NPC)
-            self.npc_group.add(NPC)
+        # Reset all Tiles of the map 
+        for Tile in self.TileMap.flatten():
+            Tile.reset()
 
+        self.mirror_game_objects()
+        self.sync_groups()
 
         # redraw everything to have a "clean" screen and update the agent views
-        self.everything_group.draw(self.MapSurface)
+        self.redraw_map()
         self.update_agent_views()
+        self.reset_frame_stack()
         self.reset_cards()
+        self.FullRedraw = True
+
+    def mirror_game_objects(self):
+        '''
+        Moves every game object sprite to the position and state of its core slot.
+        '''
+        for i, game_object in enumerate(self.get_game_objects()):
+            game_object.mirror(self.Core, i)
+
+    def sync_groups(self):
+        '''
+        Puts the living game objects of the core into the sprite groups, in the update order of the core.
+        A dead agent is removed from all groups, so its sprite is no longer alive().
+        '''
+        GameObjects = self.get_game_objects()
+        Living = [GameObjects[i] for i in self.Core.Living]
+        if self.game_objects_group.sprites() == Living and len(self.npc_group) == len(self.NPC_List): return
+
+        self.game_objects_group.empty()
+        self.game_objects_group.add(*Living)
+        self.survivor_group.empty()
+        self.survivor_group.add(*[GameObjects[i] for i in self.Core.Survivors])
+        self.npc_group.add(*self.NPC_List)
+
+        for game_object in GameObjects:
+            if self.game_objects_group.has(game_object):
+                self.everything_group.add(game_object)
+            else:
+                self.everything_group.remove(game_object)
+
+    def create_map_surfaces(self):
+        '''
+        Creates the MapSurface and the terrain layer for the current map size, TileSize and ClippingBorder.
+        '''
+        size = (self.MAPWIDTH  * self.TileSize  + 2 * self.ClippingBorder,
+                self.MAPHEIGHT * self.TileSize  + 2 * self.ClippingBorder)
+
+        self.MapSurface     = pygame.Surface(size)
+        self.TerrainSurface = pygame.Surface(size)
+        self.EntityRects    = []
+
+    def redraw_map(self):
+        '''
+        Draws all tiles to the terrain layer and composes the MapSurface from scratch.
+        '''
+        self.bord_objects_group.draw(self.TerrainSurface)
+        self.MapSurface.blit(self.TerrainSurface, (0,0))
+        self.EntityRects = self.draw_entities()
+
+    def draw_entities(self):
+        '''
+        Draws all living game objects on top of the MapSurface in one batch and returns their rects.
+        '''
+        return self.MapSurface.blits([(game_object.image, game_object.rect) for game_object in self.game_objects_group.sprites()])
 
     def reset_cards(self):
         for card in self.CardList:
@@ -332,16 +468,20 @@ class SandBoxWorld():
 
     def toggle_view_area(self):
         self.DRAW_VIEW_AREAS = not self.DRAW_VIEW_AREAS
+        self.FullRedraw = True
 
     def toggle_marker(self):
         self.DRAW_MARKER = not self.DRAW_MARKER
+        self.FullRedraw = True
 
     def toggle_cards(self):
         self.RENDER_CARDS = not self.RENDER_CARDS
         self.create_cards()
+        self.FullRedraw = True
 
     def toggle_scaled_map(self):
         self.RENDER_SCALED_MAP  = not self.RENDER_SCALED_MAP
+        self.FullRedraw = True
 
     def get_screen_dimensions(self):
 
@@ -400,20 +540,107 @@ class SandBoxWorld():
         self.TileSize = tile_size
 
         self.ClippingBorder = (self.MAX_VIEW_PORT - 1) * self.TileSize
-        print("MAX ViewPort Gird: {} TileSise: {} ClippingBorder: {}".format(self.MAX_VIEW_PORT, self.TileSize, self.ClippingBorder))
+        logger.debug("MAX ViewPort Gird: %s TileSise: %s ClippingBorder: %s", self.MAX_VIEW_PORT, self.TileSize, self.ClippingBorder)
 
         # Scale all Sprites to new Size 
         for sprite in self.everything_group.sprites():
             sprite.scale_to(self.TileSize, self.ClippingBorder)
 
-        print("ClippingBorder: {}".format(self.ClippingBorder))
+        logger.debug("ClippingBorder: %s", self.ClippingBorder)
         # Create/Recreate a Surface for our map
-        self.MapSurface = pygame.Surface((self.MAPWIDTH  * self.TileSize  + 2 * self.ClippingBorder,
-                                          self.MAPHEIGHT * self.TileSize  + 2 * self.ClippingBorder))
+        self.create_map_surfaces()
+
+        # the observation size depends on the TileSize
+        self.create_observation_buffer()
 
-        self.everything_group.draw(self.MapSurface)
+        self.redraw_map()
         self.update_agent_views()
+        self.reset_frame_stack()
         self.create_cards()
+        self.FullRedraw = True
+
+    def get_view_size(self):
+        '''
+        Returns the size (width, height) of a single agent view in pixels, before grayscale and downsampling.
+        '''
+        if self.FULL_MAP_OBSERVATION:
+            if self.OBSERVATION_SIZE is not None:
+                return tuple(self.OBSERVATION_SIZE)
+            return (self.MAPWIDTH * self.TileSize, self.MAPHEIGHT * self.TileSize)
+        else:
+            grid_w, grid_h = self.ViewPort.get_grid_dimensions()
+            return (grid_w * self.TileSize, grid_h * self.TileSize)
+
+    def get_observation_shape(self):
+        '''
+        Returns the shape (width, height, channels) of a single agent observation.
+        '''
+        width, height = self.get_view_size()
+        channels = 1 if self.GRAYSCALE else 3
+        # every DOWNSAMPLE'th pixel, starting with the first one
+        return ((width + self.DOWNSAMPLE - 1) // self.DOWNSAMPLE, (height + self.DOWNSAMPLE - 1) // self.DOWNSAMPLE, channels)
+
+    def create_observation_buffer(self):
+        '''
+        Allocates the buffer that holds the observations of all agents. It is filled in place by update_agent_views.
+        '''
+        self.ObservationProcessor = ObservationProcessor(self.get_view_size(), self.GRAYSCALE, self.DOWNSAMPLE)
+
+        if self.OBSERVATION_SIZE is not None:
+            # same pixel format as the map, so the map can be scaled straight into it
+            self.ScaledMapView = pygame.Surface(self.get_view_size(), 0, self.MapSurface)
+
+        shape = (self.NumAgents,) + self.ObservationProcessor.get_shape()
+        self.Observations = np.zeros(shape, dtype=np.uint8)
+
+        if self.FRAME_STACK > 1:
+            self.FrameStack = FrameStack(self.FRAME_STACK, shape)
+
+        # The surfaces to show the observations on the cards, they are only filled when the human view is drawn
+        for ID in self.AgentList:
+            self.AgentList[ID]["AgentView"] = pygame.Surface(shape[1:3])
+
+    def set_observation_buffer(self, buffer=None):
+        '''
+        Lets the world write the agent observations straight into a caller provided uint8 array
+        of shape (NumAgents, width, height, channels), e.g. a slot of a rollout storage.
+        Passing None switches back to an internal buffer.
+        '''
+        if buffer is None:
+            # fill the new buffer and frame stack with the current state
+            self.create_observation_buffer()
+            self.update_agent_views()
+            self.reset_frame_stack()
+            return
+
+        shape = (self.NumAgents,) + self.get_observation_shape()
+        if buffer.shape != shape or buffer.dtype != np.uint8:
+            raise Exception("Observation buffer must be a uint8 array of shape {}. Given: {} {}".format(shape, buffer.dtype, buffer.shape))
+
+        self.Observations = buffer
+        # fill the new buffer with the current state
+        self.update_agent_views()
+
+    def write_observation(self, ID, view_rect, orientation):
+        '''
+        Copies the pixels of the given map area into the observation buffer of agent ID without allocating
+        temporary surfaces or arrays. The view is rotated so that the agent always looks UP.
+        '''
+        if self.ScaledMapView is not None:
+            # scale the full map to the fixed observation size
+            pygame.transform.scale(self.MapSurface.subsurface(view_rect), self.ScaledMapView.get_size(), self.ScaledMapView)
+            Pixels = pygame.surfarray.pixels3d(self.ScaledMapView)
+        else:
+            Pixels = pygame.surfarray.pixels3d(self.MapSurface.subsurface(view_rect))
+
+        if self.FULL_MAP_OBSERVATION:
+            self.ObservationProcessor.process(Pixels, self.Observations[ID])
+        else:
+            # same as pygame.transform.rotate(view, orientation * 90) but as a strided numpy view
+            self.ObservationProcessor.process(np.rot90(Pixels, -orientation), self.Observations[ID])
+
+        # release the surface lock
+        del Pixels
 
     def update_agent_views(self):
 
@@ -432,37 +659,294 @@ class SandBoxWorld():
                     player.draw_as_self(self.MapSurface)
 
             if self.FULL_MAP_OBSERVATION:
-                ClippedView = self.MapSurface.subsurface((self.ClippingBorder,self.ClippingBorder,self.MAPWIDTH*self.TileSize, self.MAPHEIGHT*self.TileSize))
+                MapArea = (self.ClippingBorder,self.ClippingBorder,self.MAPWIDTH*self.TileSize, self.MAPHEIGHT*self.TileSize)
+                self.write_observation(myID, MapArea, 0)
             else:
-                # Get the clipped View of the Agent
-                ClippedView = self.MapSurface.subsurface(ViewPort) #.copy()
-                # Rotate to fix UP view
-                ClippedView = pygame.transform.rotate(ClippedView, agent.Pos[2] * 90)
+                self.write_observation(myID, ViewPort, agent.Pos[2])
             
-            # Append to the list
+            # Save the ViewPort for drawing
             self.AgentList[myID]["ViewPort"]  = ViewPort.copy()
-            self.AgentList[myID]["AgentView"] = ClippedView
-
-    def get_agent_views(self):
-        views = []
-        for agent in self.AgentList:
-            #   = self.AgentList[agent]["ID"]
-            VIEW = self.AgentList[agent]["AgentView"]
-            views.append( pygame.surfarray.array3d(VIEW).astype(np.uint8))
-        return views
+
+    def update_agent_view_surfaces(self):
+        '''
+        Copies the observations into the AgentView surfaces of the cards. Only needed for the human view.
+        '''
+        for ID in self.AgentList:
+            View = self.Observations[ID]
+            if self.GRAYSCALE:
+                # show the gray channel as RGB without copying it
+                View = np.broadcast_to(View, View.shape[:2] + (3,))
+            pygame.surfarray.blit_array(self.AgentList[ID]["AgentView"], View)
+
+    def get_agent_views(self, out=None):
+        '''
+        Returns the observations of all agents as one uint8 array of shape (NumAgents, width, height, channels).
+        Without `out` the internal buffer is returned, which is overwritten in place on the next update.
+        If `out` is given, the observations are copied into it.
+        '''
+        if out is None:
+            return self.Observations
+
+        timer = self.Timer
+        if timer is not None: start = timer.clock()
+
+        np.copyto(out, self.Observations)
+
+        if timer is not None: timer.lap("get_agent_views", start)
+        return out
+
+    def reset_frame_stack(self):
+        '''
+        Fills the frame history with the current observations, so a new episode never sees frames of the last one.
+        '''
+        if self.FrameStack is not None:
+            self.FrameStack.reset(self.Observations)
+
+    def get_stacked_views(self, out=None):
+        '''
+        Returns the last FRAME_STACK observations of all agents as a uint8 array of shape (NumAgents, FRAME_STACK, width, height, channels), oldest first.
+        Without `out` this is a view of the frame history, which is overwritten in place on the next update.
+        If `out` is given, the frames are copied into it.
+        '''
+        if self.FrameStack is None:
+            raise Exception("Frame stacking is disabled, create the world with frame_stack > 1")
+
+        if out is None:
+            return self.FrameStack.get_frames()
+
+        np.copyto(out, self.FrameStack.get_frames())
+        return out
         
+    def get_rewards(self):
+        '''
+        Returns the rewards every agent received in the last update as a float32 array of shape (NumAgents,).
+        The array is overwritten in place on the next update.
+        '''
+        return self.Rewards
+
+    def set_reward_buffer(self, buffer):
+        '''
+        Lets the core add the rewards straight into a caller provided float32 array of shape (NumAgents,).
+        '''
+        if buffer.shape != self.Rewards.shape or buffer.dtype != np.float32:
+            raise Exception("Reward buffer must be a float32 array of shape {}. Given: {} {}".format(self.Rewards.shape, buffer.dtype, buffer.shape))
+
+        np.copyto(buffer, self.Rewards)
+        self.Rewards = buffer
+        self.Core.Rewards = buffer
+
+    def get_events(self):
+        '''
+        Returns the game events of the last update as a structured array of events.EVENT_DTYPE (type, actor, target, x, y).
+        The array is a view that is overwritten on the next update, copy it to keep it.
+        '''
+        return self.EventLog.get_events()
+
+    def get_game_objects(self):
+        '''
+        Returns all game objects, dead or alive, in a fixed order: the agents by ID, then the NPCs.
+        '''
+        return [self.AgentList[ID]["Agent"] for ID in self.AgentList] + self.NPC_List
+
+    def set_statistics_exporter(self, exporter, label=0):
+        '''
+        Hands the statistics of every finished episode (see get_episode_statistics) to exporter.export at the next reset,
+        e.g. a statistics.StatisticsExporter. label tells the worlds of one exporter apart, None stops the export.
+        '''
+        self.StatisticsExporter = exporter
+        self.StatisticsLabel    = label
+
+    def get_episode_statistics(self):
+        '''
+        Returns the statistics of the current episode as one flat dict: world label, episode, length, score and done
+        (False if the episode was cut short by a reset), the map Meta and Stats ('map.width', 'map.water', ...) and the Statistics of every game object
+        ('survivor_0.rewards.reward_total', 'sheep_1.basics.collisions', ...).
+        '''
+        row = {"world": self.StatisticsLabel, "episode": self.Episodes, "length": self.EpisodeSteps, "score": self.getScore(),
+               "done": self.game_over()}
+
+        for key in ("Meta", "Stats"):
+            for name, value in self.START_MAP[key].items():
+                row["map." + name] = value
+
+        for game_object, statistics in zip(self.get_game_objects(), self.Core.Statistics):
+            prefix = "{}_{}.".format(type(game_object).__name__.lower(), game_object.ID)
+            for group, values in statistics.items():
+                for name, value in values.items():
+                    row[prefix + group + "." + name] = value
+
+        return row
+
+    def memory_usage(self):
+        '''
+        Returns an estimate of the memory of this world in bytes by component:
+
+        tiles        : the Tile sprites (one per grid point), their attributes, rects and group memberships
+        tile_maps    : the object arrays holding the tiles (the TileMap and the START_MAP copy, if they differ)
+        start_map    : the HeightMap and RawMap of the START_MAP
+        groups       : the bookkeeping of the sprite groups
+        game_objects : the agents and NPCs (without their shared images)
+        map_surfaces : MapSurface, TerrainSurface, the scaled HugeMap and ScaledMapView
+        agent_views  : the per-agent view surfaces of the cards
+        observations : the observation buffer, the frame stack and the buffers of the ObservationProcessor
+        cards        : the card surfaces
+        core         : the core.CoreWorld that plays the game, its map grids, object state, collision grids and statistics
+        total        : the sum of the above
+
+        shared_images is not part of the total, the scaled textures and rotated images are shared by all worlds of a process.
+        Python objects are counted shallow (sys.getsizeof), so the RSS of a process is somewhat higher.
+        '''
+        usage = {}
+
+        Tiles = self.TileMap.ravel() if isinstance(self.TileMap, np.ndarray) else []
+        usage["tiles"] = sum(utils.sprite_bytes(Tile) for Tile in Tiles)
+
+        TileMaps = {}
+        if isinstance(self.TileMap, np.ndarray): TileMaps[id(self.TileMap)] = self.TileMap
+        if self.START_MAP is not None: TileMaps[id(self.START_MAP["TileMap"])] = self.START_MAP["TileMap"]
+        usage["tile_maps"] = sum(TileMap.nbytes for TileMap in TileMaps.values())
+
+        usage["start_map"] = 0
+        if self.START_MAP is not None:
+            usage["start_map"] = sum(self.START_MAP[key].nbytes for key in ("HeightMap", "RawMap") if isinstance(self.START_MAP.get(key), np.ndarray))
+
+        Groups = (self.everything_group, self.bord_objects_group, self.eow_group, self.map_group, self.land_group, self.water_group,
+                  self.dirty_sprites_group, self.game_objects_group, self.survivor_group, self.npc_group)
+        usage["groups"] = sum(utils.group_bytes(group) for group in Groups)
+
+        usage["game_objects"] = sum(utils.sprite_bytes(game_object) for game_object in self.get_game_objects())
+
+        usage["map_surfaces"] = sum(utils.surface_bytes(surface) for surface in (self.MapSurface, self.TerrainSurface, self.HugeMap, self.ScaledMapView))
+        usage["agent_views"]  = sum(utils.surface_bytes(self.AgentList[ID]["AgentView"]) for ID in self.AgentList)
+
+        usage["observations"] = self.Observations.nbytes if self.Observations is not None else 0
+        if self.FrameStack is not None:
+            usage["observations"] += self.FrameStack.Frames.nbytes
+        if self.ObservationProcessor is not None and self.ObservationProcessor.GRAYSCALE:
+            usage["observations"] += self.ObservationProcessor.Luma.nbytes + self.ObservationProcessor.Channel.nbytes
+
+        Cards = list(self.CardList.values()) + ([self.StatisticsCard] if self.StatisticsCard is not None else [])
+        usage["cards"] = sum(utils.surface_bytes(card) + utils.surface_bytes(getattr(card, "ScaledView", None)) for card in Cards)
+
+        usage["core"] = self.Core.memory_usage() if self.Core is not None else 0
+
+        usage["total"] = sum(usage.values())
+
+        SharedImages = list(map.SCALED_TEXTURES.values()) + list(assets.IMAGES.values()) + [image for images in ROTATED_IMAGES.values() for image in images]
+        usage["shared_images"] = sum(utils.surface_bytes(image) for image in SharedImages)
+
+        return usage
+
+    def snapshot(self):
+        '''
+        Returns the dynamic state of the world as a WorldSnapshot: the changed tiles, positions, energies, scores,
+        fire and sheep ownership, statistics and the RNG state. The cost depends on the number of game objects
+        and changed tiles, not on the map size. Tree search can restore it any number of times.
+        '''
+        # the views of dead agents are not drawn again, keep their last observations
+        DeadAgents = [ID for ID in range(self.NumAgents) if not self.survivor_group.has(self.AgentList[ID]["Agent"])]
+
+        return WorldSnapshot(self.TileMap,
+                             self.get_terrain_snapshot(),
+                             *self.Core.get_state(),
+                             self.Rewards.copy(),
+                             self.score,
+                             self.rng.get_state(),
+                             self.EpisodeSteps,
+                             DeadAgents,
+                             self.Observations[DeadAgents])
+
+    def get_terrain_snapshot(self):
+        '''
+        Returns the read only terrain array of the changed tiles (see snapshot.terrain_array), rebuilt only after tiles changed.
+        '''
+        if self.TerrainSnapshot is None:
+            self.TerrainSnapshot = terrain_array(self.ChangedTiles, self.Core.Terrain, self.Core.Food)
+        return self.TerrainSnapshot
+
+    def restore(self, snapshot):
+        '''
+        Puts the world back to the state of a snapshot taken on the same map. Only the tiles that changed since
+        the start map (now or in the snapshot) are touched, and only the changed areas are redrawn.
+        The frame stack is refilled with the restored observations, dead agents get the last view of the snapshot.
+        '''
+        if snapshot.TileMap is not self.TileMap: raise Exception("The snapshot belongs to another map, it can not be restored after a new map was created or loaded")
+
+        # Terrain: set the tiles of the snapshot, reset the tiles that changed after it
+        Redraw = []
+        SnapshotTiles = {}
+        for x, y, tile_type, food_value in snapshot.Terrain.tolist():
+            Tile = self.TileMap[x, y]
+            SnapshotTiles[(x, y)] = Tile
+            self.Core.set_tile((x, y), tile_type, food_value)
+            if Tile.set_terrain(tile_type, food_value):
+                Redraw.append(Tile)
+
+        for Pos, Tile in self.ChangedTiles.items():
+            if Pos not in SnapshotTiles:
+                self.Core.reset_tile(Pos)
+                Tile.reset()
+                Redraw.append(Tile)
+
+        self.ChangedTiles    = SnapshotTiles
+        self.TerrainSnapshot = snapshot.Terrain
+
+        # Game objects and the living ones in update order, agents might have died since the snapshot
+        self.Core.set_state(snapshot.Positions, snapshot.States, snapshot.Statistics, snapshot.GameObjects, snapshot.Survivors)
+        self.mirror_game_objects()
+        self.sync_groups()
+
+        np.copyto(self.Rewards, snapshot.Rewards)
+        self.score = snapshot.Score
+        self.EpisodeSteps = snapshot.EpisodeSteps
+        self.rng.set_state(snapshot.RNGState)
+
+        # Redraw the changed tiles and the game objects, then update the agent views
+        self.TerrainSurface.blits([(Tile.image, Tile.rect) for Tile in Redraw], False)
+        restore_rects = [Tile.rect for Tile in Redraw] + self.EntityRects
+        self.MapSurface.blits([(self.TerrainSurface, rect, rect) for rect in restore_rects], False)
+        self.EntityRects = self.draw_entities()
+        self.add_map_dirty_rects(restore_rects + self.EntityRects)
+
+        if snapshot.DeadAgents:
+            self.Observations[snapshot.DeadAgents] = snapshot.DeadViews
+        self.update_agent_views()
+        self.reset_frame_stack()
+        self.FullRedraw = True
+
+    def enable_profiling(self, log_every=0):
+        '''
+        Starts timing the phases of update, reset, create_new_map (noise, parse, convert), init and get_agent_views
+        (see profiling.PhaseTimer).
+        With log_every > 0 a summary line is logged every log_every updates. Returns the timer.
+        '''
+        self.Timer = profiling.PhaseTimer(log_every)
+        return self.Timer
+
+    def disable_profiling(self):
+        self.Timer = None
+
+    def get_phase_timings(self, histograms=False):
+        '''
+        Returns phase -> summary (count, total_ms, mean_us, p50_us, p99_us, max_us) since profiling was enabled,
+        or phase -> histogram counts (see profiling.BIN_EDGES_US) if histograms is True. None if profiling is disabled.
+        '''
+        if self.Timer is None:
+            return None
+        return self.Timer.get_histograms() if histograms else self.Timer.get_summary()
+
+    def update_reward_values(self):
+        '''
+        Lets the core pick up changed values of the rewards dict.
+        '''
+        self.Core.update_reward_values()
+
     def game_over(self):
         # Game Over if all Agents are Dead
-        survivors = self.survivor_group.sprites()
-        return not survivors
+        return self.Core.game_over()
 
     def getScore(self):
-
-        score = 0
-        for agent in self.AgentList:
-            score += self.AgentList[agent]["Agent"].Score
-        return score
-#        return self.score
+        return self.Core.get_score().item()
 
     def set_active_agent(self, agent):
         self.ActivePlayer = agent
@@ -470,9 +954,15 @@ class SandBoxWorld():
     def update(self, screen, action_list):
         #screen.fill((255,255,255))
 
-        if self.game_over(): return
+        # the rewards and events of this step are added by the core
+        if not self.Core.begin_step(): return
+        self.EpisodeSteps += 1
+
+        # time the phases if profiling is enabled
+        timer = self.Timer
+        if timer is not None: start = lap = timer.clock()
 
-        # clear the drawing group
+        # clear the group of changed map tiles
         self.dirty_sprites_group.empty()
 
         ###############################################################################
@@ -480,64 +970,150 @@ class SandBoxWorld():
         ###############################################################################   
 
         # update (living) agents first
-        for agent in self.survivor_group.sprites():
-
-            # get all "living" game objects
-            game_objects  = self.game_objects_group.sprites()
+        self.Core.step_survivors([SandBoxWorld.ACTION_INDEX[key] for key in action_list])
 
-            # update the agent and add dirty sprites to the redraw group
-            dirty_sprites = agent.update(action_list, self.TileMap, game_objects)
-            self.dirty_sprites_group.add(dirty_sprites)
+        if timer is not None: lap = timer.lap("survivors", lap)
 
         # update npcs second
-        for npc in self.npc_group:
+        self.Core.step_npcs()
+
+        if timer is not None: lap = timer.lap("npcs", lap)
+
+        # Move the sprites to the new state, the dead agents leave the groups
+        self.mirror_game_objects()
+        if len(self.survivor_group) != len(self.Core.Survivors):
+            self.sync_groups()
 
-            # get all "living" game objects
-            game_objects  = self.game_objects_group.sprites()
+        # Update the tiles that changed and remember them for the snapshots
+        if self.Core.ChangedTiles:
+            for point in self.Core.ChangedTiles:
+                Tile = self.TileMap[point]
+                Tile.set_terrain(self.Core.Terrain[point].item(), self.Core.Food[point].item())
+                self.dirty_sprites_group.add(Tile)
+                self.ChangedTiles[point] = Tile
+            self.TerrainSnapshot = None
 
-            # update the NPC and add dirty sprites to the redraw group
-            dirty_sprites = npc.update(action_list, self.TileMap, game_objects)
-            self.dirty_sprites_group.add(dirty_sprites)
+        if timer is not None: lap = timer.lap("sprites", lap)
 
         ###############################################################################
         # DRAW the important stuff that is necessary to generate the agents observation
         ###############################################################################     
         
-        # Draw the dirty map sprites
-        #self.MapSurface.fill((255,255,255)) # white background
-        #self.bord_objects_group.draw(self.MapSurface) # all game objects
-        self.dirty_sprites_group.draw(self.MapSurface)
+        # Draw the tiles that changed their type to the terrain layer
+        restore_rects = self.dirty_sprites_group.draw(self.TerrainSurface)
+
+        # Restore the terrain under the changed tiles and the game objects of the last frame
+        restore_rects += self.EntityRects
+        self.MapSurface.blits([(self.TerrainSurface, rect, rect) for rect in restore_rects], False)
+
+        if timer is not None: lap = timer.lap("terrain", lap)
 
          # Draw the "living" game objects AFTER the map to ensure that they are always visible
-        self.game_objects_group.draw(self.MapSurface)
+        self.EntityRects = self.draw_entities()
+
+        # Remember the changed areas for the human view
+        self.add_map_dirty_rects(restore_rects + self.EntityRects)
+
+        if timer is not None: lap = timer.lap("entities", lap)
 
         # Update the Agent Views
         self.update_agent_views()
 
+        # Add them to the frame history
+        if self.FrameStack is not None:
+            self.FrameStack.push(self.Observations)
+
+        if timer is not None: lap = timer.lap("agent_views", lap)
+
         ###############################################################################
         # DRAW the "unimportant" Stuff for a Preview or Demo: Only when Display = True
         ###############################################################################
 
+        if self.RENDER_HUMAN_VIEW:
+            self.render(screen)
+
+        if timer is not None:
+            timer.lap("render", lap)
+            timer.lap("update", start)
+            timer.end_update()
+
+    def add_map_dirty_rects(self, rects):
+        '''
+        Collects the changed areas of the MapSurface until the next render call.
+        '''
+        if self.MapDirtyRects is None: return
+
+        self.MapDirtyRects += rects
+        if len(self.MapDirtyRects) > self.MAX_DIRTY_RECTS:
+            self.MapDirtyRects = None
+
+    def add_screen_updates(self, rects):
+        '''
+        Collects the changed areas of the screen until the next display update.
+        '''
+        if self.ScreenUpdates is None: return
+
+        self.ScreenUpdates += rects
+        if len(self.ScreenUpdates) > self.MAX_DIRTY_RECTS:
+            self.ScreenUpdates = None
+
+    def pop_screen_updates(self):
+        '''
+        Returns the changed screen areas since the last call, which can be passed to pygame.display.update.
+        None means the whole screen has to be updated.
+        '''
+        rects = self.ScreenUpdates
+        self.ScreenUpdates = []
+        return rects
+
+    def render(self, screen):
+        '''
+        Draws the 'human friendly' version of the game (map, view areas, markers and cards) to the screen.
+        This is not needed for the observations and can be skipped while training.
+        Only the areas that changed since the last render are drawn, see pop_screen_updates.
+        '''
         # Redraw Agents for Map View 
         self.survivor_group.draw(self.MapSurface)
 
-        # Draw the a 'human friendly' version of the game
-        if(self.TileSize < 8):
+        # A new screen or layout needs a complete redraw
+        full = self.FullRedraw or (screen is not self.RenderScreen) or (self.MapDirtyRects is None)
+        if full:
+            screen.fill((0,0,0))
+            self.ScreenUpdates = None
 
-            if self.RENDER_SCALED_MAP:
-                huge_w, huge_h, huge_offset = self.draw_huge_map(screen)
-                self.draw_normal_map(screen, huge_offset - self.ClippingBorder, huge_h)
-                self.draw_cards(screen, huge_w, huge_offset)
-            else:
-                w, h, offset = self.draw_normal_map(screen, 0,0)
-                self.draw_cards(screen, w, offset)
+        # View areas and markers are drawn on top of the screen, so we redraw everything while they are visible
+        redraw_all = full or self.DRAW_VIEW_AREAS or self.DRAW_MARKER
+        if redraw_all:
+            self.ScreenUpdates = None
+
+        timer = self.Timer
+        if timer is not None: lap = timer.clock()
+
+        # Draw the a 'human friendly' version of the game, small tiles get a scaled up map next to the normal one
+        if (self.TileSize < 8) and self.RENDER_SCALED_MAP:
+            huge_w, huge_h, huge_offset = self.draw_huge_map(screen, full, redraw_all)
+            if timer is not None: lap = timer.lap("huge_map", lap)
+
+            self.draw_normal_map(screen, huge_offset - self.ClippingBorder, huge_h, redraw_all)
+            card_x, card_y = huge_w, huge_offset
         else:
-            w,h,offset = self.draw_normal_map(screen, 0,0)
-            self.draw_cards(screen, w, offset)
+            w, h, offset = self.draw_normal_map(screen, 0,0, redraw_all)
+            card_x, card_y = w, offset
+        if timer is not None: lap = timer.lap("normal_map", lap)
+
+        self.draw_cards(screen, card_x, card_y, redraw_all)
+        if timer is not None: timer.lap("cards", lap)
+
+        self.MapDirtyRects = []
+        self.FullRedraw    = False
+        self.RenderScreen  = screen
 
-    def draw_cards(self, screen, offset_x, offset_y):
+    def draw_cards(self, screen, offset_x, offset_y, redraw_all=True):
             margin = self.CARD_MARGIN # margin between Cards
 
+            if self.CardList:
+                self.update_agent_view_surfaces()
+
             card_off = 0
             margin = self.CARD_MARGIN
             for card in self.CardList:
@@ -557,20 +1133,55 @@ class SandBoxWorld():
                 if card > 5:
                     y += self.CardList[card].get_height() + self.CARD_MARGIN
                 # draw the card
-                screen.blit(self.CardList[card], (x,y))
+                self.blit_card(screen, self.CardList[card], (x,y), redraw_all)
 
             if self.StatisticsCard is not None:
                 self.StatisticsCard.update(self.NPC_List)
-                screen.blit(self.StatisticsCard, (offset_x, card_off + 3 * self.CARD_MARGIN))
+                self.blit_card(screen, self.StatisticsCard, (offset_x, card_off + 3 * self.CARD_MARGIN), redraw_all)
+
+    def blit_card(self, screen, card, position, redraw_all=True):
+        '''
+        Blits the changed areas of a card (or the whole card) to the screen.
+        '''
+        if redraw_all:
+            screen.blit(card, position)
+        else:
+            updates = [screen.blit(card, (position[0] + area.x, position[1] + area.y), area) for area in card.DirtyRects]
+            self.add_screen_updates(updates)
+        card.DirtyRects = []
 
-    def draw_huge_map(self, screen):
+    def draw_huge_map(self, screen, full=True, redraw_all=True):
         
         Offset = (self.MAX_VIEW_PORT - 1) * 8
 
         w = (self.MAPWIDTH  * 8) + (2 * Offset)
         h = (self.MAPHEIGHT * 8) + (2 * Offset)
-        HugeMap = pygame.transform.scale(self.MapSurface, (w,h))
-        screen.blit(HugeMap,(0,0))
+
+        # Only TileSizes that divide 8 can be scaled in parts, every other size is rescaled completely
+        factor = 8 // self.TileSize
+        if (8 % self.TileSize != 0) or (self.HugeMap is None) or (self.HugeMap.get_size() != (w,h)):
+            self.HugeMap = pygame.Surface((w,h))
+            full = True
+
+        if full:
+            pygame.transform.scale(self.MapSurface, (w,h), self.HugeMap)
+        else:
+            # Only scale the changed areas of the MapSurface
+            updates = []
+            MapRect = self.MapSurface.get_rect()
+            for rect in self.MapDirtyRects:
+                rect = rect.clip(MapRect)
+                if rect.width == 0 or rect.height == 0: continue
+                HugeRect = pygame.Rect(rect.x * factor, rect.y * factor, rect.width * factor, rect.height * factor)
+                pygame.transform.scale(self.MapSurface.subsurface(rect), HugeRect.size, self.HugeMap.subsurface(HugeRect))
+                if not redraw_all:
+                    updates.append(screen.blit(self.HugeMap, HugeRect, HugeRect))
+            self.add_screen_updates(updates)
+
+        if redraw_all:
+            screen.blit(self.HugeMap,(0,0))
+        elif full:
+            self.add_screen_updates([screen.blit(self.HugeMap,(0,0))])
 
         for game_object in self.game_objects_group.sprites():
             #if isinstance(game_object, Survivor):
@@ -600,9 +1211,13 @@ class SandBoxWorld():
 
         return (w, h, Offset)
 
-    def draw_normal_map(self, screen, x, y):
+    def draw_normal_map(self, screen, x, y, redraw_all=True):
 
-        screen.blit(self.MapSurface, (x,y))
+        if redraw_all:
+            screen.blit(self.MapSurface, (x,y))
+        else:
+            updates = [screen.blit(self.MapSurface, rect.move(x,y), rect) for rect in self.MapDirtyRects]
+            self.add_screen_updates(updates)
 
         for game_object in self.game_objects_group.sprites():
             
@@ -627,7 +1242,7 @@ class SandBoxWorld():
             # Get the agents ViewPort
 
             if self.DRAW_VIEW_AREAS:
-                ViewPort = self.AgentList[id]["ViewPort"]
+                ViewPort = self.AgentList[id]["ViewPort"].copy()
                 ViewPort.x += x
                 ViewPort.y += y 
                 pygame.draw.rect(screen, (0,0,255), ViewPort, 2)
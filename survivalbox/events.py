@@ -0,0 +1,81 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+
+# third party imports
+import numpy as np
+
+# local imports
+
+# EVENT TYPES (actor -> target)
+GRASS_EATEN      = 1 # Survivor ate the grass tile at x,y
+SHEEP_GRAZED     = 2 # Sheep ate the grass tile at x,y
+WOLF_CAUGHT      = 3 # Survivor -> Wolf, x,y is where the wolf was caught
+SHEEP_KILLED     = 4 # Wolf -> Sheep, x,y is where the sheep was killed
+WOLF_ATTACK      = 5 # Wolf -> Survivor, x,y is the position of the survivor
+FIRE_GUARD       = 6 # Fireplace -> the new fire guard (Survivor) or -1 if the fire went out
+SHEPHERD         = 7 # Sheep -> the new shepherd (Survivor) or -1 if the sheep lost it
+SURVIVOR_DIED    = 8 # Survivor at x,y ran out of energy
+
+EVENT_NAMES = {
+    GRASS_EATEN   : "grass_eaten",
+    SHEEP_GRAZED  : "sheep_grazed",
+    WOLF_CAUGHT   : "wolf_caught",
+    SHEEP_KILLED  : "sheep_killed",
+    WOLF_ATTACK   : "wolf_attack",
+    FIRE_GUARD    : "fire_guard",
+    SHEPHERD      : "shepherd",
+    SURVIVOR_DIED : "survivor_died"
+}
+
+# One event: what happened, who did it to whom (the IDs of the game objects, -1 for none) and where (grid position)
+EVENT_DTYPE = np.dtype([("type", np.uint8), ("actor", np.int16), ("target", np.int16), ("x", np.int16), ("y", np.int16)])
+
+# The events of a batch of worlds, with the index of the world
+VEC_EVENT_DTYPE = np.dtype(EVENT_DTYPE.descr + [("env", np.int32)])
+
+class EventLog():
+    '''
+    Collects the events of one world step in a preallocated structured array (EVENT_DTYPE).
+    The world clears it at the start of every update, the game objects emit into it where the rules fire.
+    '''
+    def __init__(self, capacity=64):
+        self.Events = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.Count  = 0
+
+    def clear(self):
+        self.Count = 0
+
+    def emit(self, event_type, actor, target, x, y):
+        if self.Count == len(self.Events):
+            # very busy step, double the capacity
+            self.Events = np.concatenate((self.Events, np.zeros(len(self.Events), dtype=EVENT_DTYPE)))
+
+        self.Events[self.Count] = (event_type, actor, target, x, y)
+        self.Count += 1
+
+    def get_events(self):
+        '''
+        Returns a view of the events of the last step, it is overwritten on the next step.
+        '''
+        return self.Events[:self.Count]
+
+def batch_events(event_arrays, envs=None):
+    '''
+    Returns the events of several worlds as one new array of VEC_EVENT_DTYPE.
+    The env field is the index of the world in event_arrays, or the matching entry of envs if given.
+    '''
+    if envs is None:
+        envs = range(len(event_arrays))
+
+    events = np.zeros(sum(len(array) for array in event_arrays), dtype=VEC_EVENT_DTYPE)
+
+    start = 0
+    for env, array in zip(envs, event_arrays):
+        stop = start + len(array)
+        for field in EVENT_DTYPE.names:
+            events[field][start:stop] = array[field]
+        events["env"][start:stop] = env
+        start = stop
+
+    return events
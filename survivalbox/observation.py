@@ -0,0 +1,100 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+
+# third party imports
+import numpy as np
+
+# local imports
+
+class FrameStack():
+    '''
+    Holds the last k observations of all agents in one circular uint8 buffer of shape (NumAgents, 2*k, width, height, channels).
+    Every new frame is written twice, at Next and Next + k, so the last k frames are always one contiguous
+    slice of the buffer and can be returned as a view (oldest frame first) without copying the history.
+    '''
+    def __init__(self, num_frames, frame_shape):
+
+        if num_frames < 1: raise Exception("Frame stack needs at least 1 frame. Given: %s" % num_frames)
+
+        self.NUM_FRAMES = num_frames
+        # frame_shape is the shape of the observations of all agents (NumAgents, width, height, channels)
+        self.Frames = np.zeros((frame_shape[0], 2 * num_frames) + tuple(frame_shape[1:]), dtype=np.uint8)
+        # the slot the next frame is written to, the oldest frame of the stack
+        self.Next = 0
+
+    def reset(self, frame):
+        '''
+        Fills the whole history with the given observations, e.g. the first frame of an episode.
+        '''
+        self.Frames[:] = frame[:, np.newaxis]
+        self.Next = 0
+
+    def push(self, frame):
+        '''
+        Adds the observations of all agents as the newest frame and drops the oldest one.
+        '''
+        np.copyto(self.Frames[:, self.Next], frame)
+        np.copyto(self.Frames[:, self.Next + self.NUM_FRAMES], frame)
+        self.Next = (self.Next + 1) % self.NUM_FRAMES
+
+    def get_frames(self):
+        '''
+        Returns a view of shape (NumAgents, k, width, height, channels) with the last k frames, oldest first.
+        The view is overwritten in place by the next push.
+        '''
+        return self.Frames[:, self.Next:self.Next + self.NUM_FRAMES]
+
+class ObservationProcessor():
+    '''
+    Reduces the agent views inside the engine: integer factor downsampling by strided slicing and
+    an integer luminance grayscale conversion. Works directly on the pixel views of the map surface and
+    only writes the reduced result, all temporary arrays are preallocated once for the given view size.
+    '''
+    # ITU-R 601 luma weights in 8 bit fixed point, they sum up to 256
+    LUMA_R = 77
+    LUMA_G = 150
+    LUMA_B = 29
+
+    def __init__(self, view_size, grayscale=False, downsample=1):
+
+        if downsample < 1: raise Exception("Downsample factor needs to be >= 1. Given: %s" % downsample)
+
+        self.GRAYSCALE  = grayscale
+        self.DOWNSAMPLE = downsample
+
+        # strided slicing keeps every DOWNSAMPLE'th pixel, starting with the first one
+        self.WIDTH  = (view_size[0] + downsample - 1) // downsample
+        self.HEIGHT = (view_size[1] + downsample - 1) // downsample
+
+        # scratch buffers for the grayscale conversion, the weighted sum fits into 16 bit
+        if self.GRAYSCALE:
+            self.Luma    = np.empty((self.WIDTH, self.HEIGHT), dtype=np.uint16)
+            self.Channel = np.empty((self.WIDTH, self.HEIGHT), dtype=np.uint16)
+
+    def get_shape(self):
+        '''
+        Returns the shape (width, height, channels) of a processed view.
+        '''
+        return (self.WIDTH, self.HEIGHT, 1 if self.GRAYSCALE else 3)
+
+    def process(self, pixels, out):
+        '''
+        Writes the processed version of pixels, a (width, height, 3) uint8 view, into out.
+        '''
+        if self.DOWNSAMPLE > 1:
+            pixels = pixels[::self.DOWNSAMPLE, ::self.DOWNSAMPLE]
+
+        if not self.GRAYSCALE:
+            np.copyto(out, pixels)
+            return
+
+        # Luma = (77 * R + 150 * G + 29 * B) >> 8
+        np.multiply(pixels[..., 0], self.LUMA_R, out=self.Luma,    dtype=np.uint16)
+        np.multiply(pixels[..., 1], self.LUMA_G, out=self.Channel, dtype=np.uint16)
+        np.add(self.Luma, self.Channel, out=self.Luma)
+        np.multiply(pixels[..., 2], self.LUMA_B, out=self.Channel, dtype=np.uint16)
+        np.add(self.Luma, self.Channel, out=self.Luma)
+        np.right_shift(self.Luma, 8, out=self.Luma)
+
+        np.copyto(out[..., 0], self.Luma, casting='unsafe')
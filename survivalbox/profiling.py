@@ -0,0 +1,105 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import time
+import logging
+
+# third party imports
+import numpy as np
+
+# local imports
+
+logger = logging.getLogger(__name__)
+
+# Histogram bins: bin b counts the durations of [2^(b-1), 2^b) microseconds, bin 0 everything below 1 us
+NUM_BINS = 32
+BIN_EDGES_US = np.array([0] + [2 ** b for b in range(NUM_BINS)], dtype=np.float64)
+
+# The phases of SandBoxWorld.update, the human view (render) is split further into huge_map, normal_map and cards.
+# Outside of update: reset, new_map (with its stages noise, parse and convert), get_agent_views and in init surfaces and spawn.
+UPDATE_PHASES = ("survivors", "npcs", "sprites", "terrain", "entities", "agent_views", "render", "huge_map", "normal_map", "cards")
+
+class PhaseTimer():
+    '''
+    Times the phases of a SandBoxWorld (see UPDATE_PHASES) and aggregates a log2 histogram of the durations per phase.
+
+    The world only calls it while profiling is enabled (SandBoxWorld.enable_profiling), so a disabled timer costs
+    one "is not None" check per phase. With log_every > 0 a summary line is logged (info) every log_every updates.
+    '''
+    def __init__(self, log_every=0):
+        self.LOG_EVERY = log_every
+        self.reset()
+
+    def reset(self):
+        # phase -> [count, total seconds, max seconds, histogram counts]
+        self.Phases  = {}
+        self.Updates = 0
+
+    def clock(self):
+        return time.perf_counter()
+
+    def lap(self, phase, start):
+        '''
+        Records the time since start for phase and returns the current clock, the start of the next phase.
+        '''
+        now = time.perf_counter()
+        elapsed = now - start
+
+        stats = self.Phases.get(phase)
+        if stats is None:
+            stats = self.Phases[phase] = [0, 0.0, 0.0, [0] * NUM_BINS]
+
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]: stats[2] = elapsed
+        stats[3][min(int(elapsed * 1e6).bit_length(), NUM_BINS - 1)] += 1
+        return now
+
+    def end_update(self):
+        '''
+        Called by the world after every update, logs the summary line every LOG_EVERY updates.
+        '''
+        self.Updates += 1
+        if self.LOG_EVERY and self.Updates % self.LOG_EVERY == 0:
+            logger.info(self.summary_line())
+
+    def get_histograms(self):
+        '''
+        Returns phase -> int array of counts per bin, see BIN_EDGES_US.
+        '''
+        return {phase: np.array(stats[3], dtype=np.int64) for phase, stats in self.Phases.items()}
+
+    def get_summary(self):
+        '''
+        Returns phase -> dict with count, total_ms, mean_us, p50_us, p99_us and max_us.
+        The percentiles are the upper edges of the histogram bins they fall into.
+        '''
+        summary = {}
+        for phase, (count, total, maximum, histogram) in self.Phases.items():
+            cumulative = np.cumsum(histogram)
+            p50, p99 = BIN_EDGES_US[1:][np.searchsorted(cumulative, [0.5 * count, 0.99 * count])]
+            summary[phase] = {"count"   : count,
+                              "total_ms": total * 1e3,
+                              "mean_us" : total / count * 1e6,
+                              "p50_us"  : float(min(p50, maximum * 1e6)),
+                              "p99_us"  : float(min(p99, maximum * 1e6)),
+                              "max_us"  : maximum * 1e6}
+        return summary
+
+    def summary_line(self):
+        '''
+        Returns one line with the mean time per update and of every phase, the phases of an update with their share of it.
+        '''
+        summary = self.get_summary()
+        update  = summary.get("update")
+        if update is None:
+            return "[profile] no updates"
+
+        parts = []
+        for phase, values in summary.items():
+            if phase == "update": continue
+            if phase in UPDATE_PHASES:
+                parts.append("{} {:.1f}us ({:.0%})".format(phase, values["mean_us"], values["total_ms"] / update["total_ms"]))
+            else:
+                parts.append("{} {:.1f}us".format(phase, values["mean_us"]))
+        return "[profile] {} updates, {:.1f}us/update: {}".format(update["count"], update["mean_us"], ", ".join(parts))
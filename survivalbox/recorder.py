@@ -0,0 +1,248 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import json
+import queue
+import shutil
+import threading
+import subprocess
+
+# third party imports
+import numpy as np
+import pygame
+
+# local imports
+
+class RawWriter():
+    '''
+    Appends the frames of one stream as raw uint8 bytes to <name>.u8 and describes them in <name>.json.
+    Lossless and the cheapest format to write, read it back with load_raw.
+    '''
+    def __init__(self, path, shape, fps):
+        self.PATH  = path
+        self.SHAPE = shape
+        self.Frames = 0
+        self.File = open(path + ".u8", "wb")
+
+    def write(self, frame):
+        self.File.write(frame.tobytes())
+        self.Frames += 1
+
+    def close(self):
+        self.File.close()
+        with open(self.PATH + ".json", "w") as file:
+            json.dump({"shape": list(self.SHAPE), "dtype": "uint8", "frames": self.Frames}, file)
+
+class PNGWriter():
+    '''
+    Writes every frame of one stream as <name>/<frame>.png. Uses Pillow if available, pygame otherwise.
+    '''
+    def __init__(self, path, shape, fps):
+        self.PATH  = path
+        self.SHAPE = shape
+        self.Frames = 0
+        os.makedirs(path, exist_ok=True)
+
+        try:
+            from PIL import Image
+            self.Image = Image
+        except ImportError:
+            self.Image = None
+
+    def write(self, frame):
+        file_name = os.path.join(self.PATH, "{:06d}.png".format(self.Frames))
+
+        # grayscale views have a single channel
+        if frame.shape[2] == 1:
+            frame = np.repeat(frame, 3, axis=2) if self.Image is None else frame[:, :, 0]
+
+        if self.Image is not None:
+            # Pillow expects (height, width)
+            self.Image.fromarray(np.ascontiguousarray(frame.swapaxes(0, 1))).save(file_name)
+        else:
+            pygame.image.save(pygame.surfarray.make_surface(frame), file_name)
+
+        self.Frames += 1
+
+    def close(self):
+        pass
+
+class FFmpegWriter():
+    '''
+    Pipes the frames of one stream to an ffmpeg process that encodes them losslessly (FFV1) into <name>.mkv.
+    '''
+    def __init__(self, path, shape, fps):
+
+        FFMPEG = shutil.which("ffmpeg")
+        if FFMPEG is None: raise Exception("ffmpeg not found, use the 'raw' or 'png' format instead")
+
+        self.PATH  = path
+        self.SHAPE = shape
+        self.Frames = 0
+
+        pixel_format = "gray" if shape[2] == 1 else "rgb24"
+        command = [FFMPEG, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", pixel_format, "-s", "{}x{}".format(shape[0], shape[1]), "-r", str(fps), "-i", "-",
+                   "-c:v", "ffv1", path + ".mkv"]
+        self.Process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        # ffmpeg expects rows, our frames are (width, height, channels)
+        self.Process.stdin.write(np.ascontiguousarray(frame.swapaxes(0, 1)).tobytes())
+        self.Frames += 1
+
+    def close(self):
+        self.Process.stdin.close()
+        self.Process.wait()
+
+WRITERS = {
+    "raw"    : RawWriter,
+    "png"    : PNGWriter,
+    "ffmpeg" : FFmpegWriter
+}
+
+def load_raw(path):
+    '''
+    Returns the frames written by a RawWriter as a uint8 array of shape (frames, width, height, channels).
+    '''
+    with open(path + ".json") as file:
+        meta = json.load(file)
+
+    frames = np.fromfile(path + ".u8", dtype=np.uint8)
+    return frames.reshape([meta["frames"]] + meta["shape"])
+
+class Recorder():
+    '''
+    Records the map and the agent views of a SandBoxWorld without slowing down the game loop.
+    capture() copies the current frames into one of a fixed number of preallocated slots, a background thread
+    writes the filled slots to disk and hands them back. If all slots are in use, capture() either waits for
+    the writer (BLOCK) or skips the frame (DROP). The display is never touched, frames are taken from the
+    MapSurface and the observation buffer.
+    '''
+    # POLICIES
+    BLOCK = "block"
+    DROP  = "drop"
+
+    def __init__(self, directory, format="raw", max_queue=64, policy=BLOCK, record_map=True, record_agents=True, fps=30):
+
+        if format not in WRITERS: raise Exception("Unknown record format: {}. Supported: {}".format(format, list(WRITERS.keys())))
+        if policy not in (Recorder.BLOCK, Recorder.DROP): raise Exception("Unknown queue policy: %s" % policy)
+        if format == "ffmpeg" and shutil.which("ffmpeg") is None: raise Exception("ffmpeg not found, use the 'raw' or 'png' format instead")
+
+        self.DIRECTORY = directory
+        self.FORMAT    = format
+        self.POLICY    = policy
+        self.FPS       = fps
+        self.RECORD_MAP    = record_map
+        self.RECORD_AGENTS = record_agents
+
+        os.makedirs(self.DIRECTORY, exist_ok=True)
+
+        # Free and filled frame slots, a slot is a dict stream name -> uint8 frame
+        self.FreeSlots   = queue.Queue()
+        self.FilledSlots = queue.Queue()
+        for i in range(max_queue):
+            self.FreeSlots.put({})
+
+        # One writer per stream, a new segment is started if the frame size changes
+        self.Writers  = {}
+        self.Segments = {}
+
+        self.Captured = 0
+        self.Dropped  = 0
+        self.Written  = 0
+        self.Error    = None
+
+        self.Thread = threading.Thread(target=self.write_loop, name="SurvivalBoxRecorder", daemon=True)
+        self.Thread.start()
+
+    def capture(self, world):
+        '''
+        Queues the current map and agent views of the world for writing.
+        Returns False if the frame was dropped because the writer is too slow.
+        '''
+        self.check_error()
+
+        if self.POLICY == Recorder.BLOCK:
+            Slot = self.FreeSlots.get()
+        else:
+            try:
+                Slot = self.FreeSlots.get_nowait()
+            except queue.Empty:
+                self.Dropped += 1
+                return False
+
+        if self.RECORD_MAP:
+            MapArea = (world.ClippingBorder, world.ClippingBorder, world.MAPWIDTH * world.TileSize, world.MAPHEIGHT * world.TileSize)
+            Pixels  = pygame.surfarray.pixels3d(world.MapSurface.subsurface(MapArea))
+            self.copy_to_slot(Slot, "map", Pixels)
+            # release the surface lock
+            del Pixels
+
+        if self.RECORD_AGENTS:
+            Views = world.get_agent_views()
+            for ID in range(Views.shape[0]):
+                self.copy_to_slot(Slot, "agent_{}".format(ID), Views[ID])
+
+        self.FilledSlots.put(Slot)
+        self.Captured += 1
+        return True
+
+    def copy_to_slot(self, slot, name, frame):
+        # reuse the slot buffer, only allocate if the frame size changed (e.g. after scale_to)
+        Buffer = slot.get(name)
+        if Buffer is None or Buffer.shape != frame.shape:
+            Buffer = np.empty(frame.shape, dtype=np.uint8)
+            slot[name] = Buffer
+        np.copyto(Buffer, frame)
+
+    def write_loop(self):
+        # runs in the background thread until close() sends None
+        while True:
+            Slot = self.FilledSlots.get()
+            if Slot is None: break
+
+            try:
+                if self.Error is None:
+                    for name, frame in Slot.items():
+                        self.get_writer(name, frame.shape).write(frame)
+                    self.Written += 1
+            except Exception as error:
+                self.Error = error
+
+            self.FreeSlots.put(Slot)
+
+        for writer in self.Writers.values():
+            writer.close()
+        self.Writers = {}
+
+    def get_writer(self, name, shape):
+        Writer = self.Writers.get(name)
+        if Writer is not None and Writer.SHAPE == shape:
+            return Writer
+
+        # first frame of this stream or the frame size changed: start a new segment
+        if Writer is not None:
+            Writer.close()
+
+        Segment = self.Segments.get(name, -1) + 1
+        self.Segments[name] = Segment
+
+        path = os.path.join(self.DIRECTORY, "{}_{:03d}".format(name, Segment))
+        Writer = WRITERS[self.FORMAT](path, shape, self.FPS)
+        self.Writers[name] = Writer
+        return Writer
+
+    def check_error(self):
+        if self.Error is not None:
+            raise Exception("Recorder failed: {}".format(self.Error))
+
+    def close(self):
+        '''
+        Writes all queued frames, closes the files and stops the background thread.
+        '''
+        if self.Thread.is_alive():
+            self.FilledSlots.put(None)
+            self.Thread.join()
+        self.check_error()
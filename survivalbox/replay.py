@@ -0,0 +1,162 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import json
+import time
+import struct
+import hashlib
+
+# third party imports
+import numpy as np
+
+# local imports
+from .vec_env import VecSurvivalBox
+
+# Golden trajectories: a TrajectoryWriter logs the VecSurvivalBox config (with the seeds) and the actions of every step
+# together with hashes of the world states, replay() runs them again headless and reports the first step that differs.
+#
+# File layout (little endian):
+#     MAGIC, uint32 version, uint32 length of the json header, json header (config, components, initial hashes)
+#     one record per step: uint8 actions (num_envs, num_agents) and uint64 hashes (num_envs, components)
+MAGIC   = b"SBTRAJ"
+VERSION = 1
+
+# The parts of a world state that are hashed separately, so a divergence says what differs
+COMPONENTS = ("positions", "energies", "scores", "npcs", "terrain")
+
+def digest(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def state_hashes(world):
+    '''
+    Returns one uint64 hash per COMPONENTS of the state of a SandBoxWorld: the positions and liveness of all game objects,
+    the energies of the agents, their scores and rewards, the state of the NPCs and the tiles that differ from the start map.
+    '''
+    GameObjects = world.get_game_objects()
+    Agents      = GameObjects[:world.NumAgents]
+
+    Positions = np.array([list(game_object.Pos) + [world.game_objects_group.has(game_object)] for game_object in GameObjects], dtype=np.int64)
+    Energies  = np.array([agent.Energy for agent in Agents], dtype=np.float64)
+    Scores    = np.array([agent.Score  for agent in Agents] + world.Rewards.tolist(), dtype=np.float64)
+    NPCs      = repr([game_object.get_state()[0] for game_object in world.NPC_List]).encode()
+
+    # the terrain array of snapshot(), it is only rebuilt after tiles changed. Sorted by position,
+    # the order in which the tiles changed does not matter
+    TerrainSnapshot = world.get_terrain_snapshot()
+    Terrain   = TerrainSnapshot[np.lexsort((TerrainSnapshot[:, 1], TerrainSnapshot[:, 0]))]
+
+    return [digest(Positions.tobytes()), digest(Energies.tobytes()), digest(Scores.tobytes()), digest(NPCs), digest(Terrain.tobytes())]
+
+def record_dtype(num_envs, num_agents):
+    return np.dtype([("actions", np.uint8, (num_envs, num_agents)), ("hashes", "<u8", (num_envs, len(COMPONENTS)))])
+
+def create_envs(config):
+    # json has no tuples
+    if config.get("observation_size") is not None:
+        config = dict(config, observation_size=tuple(config["observation_size"]))
+
+    envs = VecSurvivalBox(**config)
+    envs.reset()
+    return envs
+
+class TrajectoryWriter():
+    '''
+    Records a golden trajectory of a VecSurvivalBox created from config (its keyword arguments, the seeds included):
+
+        writer = TrajectoryWriter("golden.sbtraj", config)
+        envs   = writer.create_envs()
+        for step in range(steps):
+            envs.step(actions)
+            writer.write(actions, envs)
+        writer.close()
+
+    A record costs num_envs * (num_agents + 8 * len(COMPONENTS)) bytes per step.
+    '''
+    def __init__(self, path, config):
+        if config.get("seeds") is None: raise Exception("A golden trajectory needs the seeds of the worlds in the config")
+
+        self.CONFIG = dict(config)
+        self.DTYPE  = record_dtype(len(self.CONFIG["seeds"]), self.CONFIG.get("num_agents", 2))
+        self.File   = open(path, "wb")
+        self.Record = np.zeros(1, dtype=self.DTYPE)
+        self.Steps  = 0
+
+    def create_envs(self):
+        '''
+        Creates and resets the VecSurvivalBox of the config and writes the header with the initial state hashes.
+        '''
+        envs = create_envs(self.CONFIG)
+        header = json.dumps({"config": self.CONFIG, "components": COMPONENTS,
+                             "initial": [state_hashes(world) for world in envs.Worlds]}).encode()
+        self.File.write(MAGIC + struct.pack("<II", VERSION, len(header)) + header)
+        return envs
+
+    def write(self, actions, envs):
+        '''
+        Appends the actions of the last step and the state hashes after it.
+        '''
+        self.Record["actions"][0] = actions
+        self.Record["hashes"][0]  = [state_hashes(world) for world in envs.Worlds]
+        self.File.write(self.Record.tobytes())
+        self.Steps += 1
+
+    def close(self):
+        self.File.close()
+
+def load(path):
+    '''
+    Returns the header and the records (a structured array with actions and hashes per step) of a trajectory file.
+    '''
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC: raise Exception("{} is not a trajectory file".format(path))
+        version, length = struct.unpack("<II", file.read(8))
+        if version != VERSION: raise Exception("Unsupported trajectory version {}, expected {}".format(version, VERSION))
+
+        header = json.loads(file.read(length).decode())
+        config = header["config"]
+        records = np.frombuffer(file.read(), dtype=record_dtype(len(config["seeds"]), config.get("num_agents", 2)))
+    return header, records
+
+class Divergence():
+    '''
+    The first difference between a golden trajectory and its replay: the step (-1 is the initial reset),
+    the env index and the names of the components whose hashes differ.
+    '''
+    def __init__(self, step, env, components):
+        self.Step = step
+        self.Env  = env
+        self.Components = components
+
+    def __repr__(self):
+        return "step {} env {}: {}".format(self.Step, self.Env, ", ".join(self.Components))
+
+def first_divergence(step, expected, hashes):
+    for env, (old, new) in enumerate(zip(expected, hashes)):
+        components = [name for name, a, b in zip(COMPONENTS, old, new) if a != b]
+        if components:
+            return Divergence(step, env, components)
+    return None
+
+def replay(path):
+    '''
+    Runs a golden trajectory again and compares the state hashes after the reset and after every step.
+    Returns (divergence, steps, steps per second), divergence is None if the replay matches.
+    '''
+    header, records = load(path)
+    envs = create_envs(header["config"])
+
+    divergence = first_divergence(-1, header["initial"], [state_hashes(world) for world in envs.Worlds])
+    if divergence is not None:
+        return divergence, 0, 0.0
+
+    start = time.perf_counter()
+    for step, record in enumerate(records):
+        envs.step(record["actions"])
+        divergence = first_divergence(step, record["hashes"].tolist(), [state_hashes(world) for world in envs.Worlds])
+        if divergence is not None:
+            break
+    seconds = time.perf_counter() - start
+
+    envs.close()
+    steps = step + 1 if len(records) else 0
+    return divergence, steps, steps / seconds if seconds > 0 else 0.0
@@ -0,0 +1,151 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import json
+import time
+import argparse
+import multiprocessing
+
+# third party imports
+
+# local imports
+from . import replay
+
+# Renders recorded episodes after the fact: the worlds of a golden trajectory (see replay.TrajectoryWriter) are replayed
+# headless, one world per job on a process pool, and the map view, the agent views and optionally the human view are
+# written with the recorder writers, either at chosen steps or for every step. Training never pays for the pixels.
+
+def render_env(job):
+    '''
+    Replays one world of a trajectory and writes its frames to <directory>/env_<k>/. Runs in a pool worker.
+    Returns a dict with the env index, the replayed steps, the written frames, the first divergence (or None) and the seconds.
+    '''
+    import pygame
+    from .recorder import WRITERS
+
+    path, env, steps, directory, format, overrides, human_view, verify, fps = job
+    start = time.perf_counter()
+
+    header, records = replay.load(path)
+    # every world has its own seeded RandomState, so it can be replayed on its own
+    config = dict(header["config"], **overrides)
+    config["num_envs"] = 1
+    config["seeds"] = [header["config"]["seeds"][env]]
+
+    envs  = replay.create_envs(config)
+    world = envs.Worlds[0]
+    screen = pygame.Surface(world.get_screen_dimensions()) if human_view else None
+
+    Wanted = None if steps is None else set(steps)
+    Last   = len(records) - 1 if steps is None else min(max(steps), len(records) - 1)
+
+    EnvDirectory = os.path.join(directory, "env_{}".format(env))
+    os.makedirs(EnvDirectory, exist_ok=True)
+    Writers  = {}
+    Rendered = []
+    result = {"env": env, "steps": 0, "frames": 0, "divergence": None}
+
+    def write(name, frame):
+        if name not in Writers:
+            Writers[name] = WRITERS[format](os.path.join(EnvDirectory, name), frame.shape, fps)
+        Writers[name].write(frame)
+
+    def diverges(step, expected):
+        divergence = replay.first_divergence(step, [expected], [replay.state_hashes(world)])
+        if divergence is not None:
+            divergence.Env = env
+            result["divergence"] = repr(divergence)
+        return divergence is not None
+
+    if verify and diverges(-1, header["initial"][env]):
+        Last = -1
+
+    for step in range(Last + 1):
+        envs.step(records[step]["actions"][env:env + 1])
+        result["steps"] += 1
+
+        if verify and diverges(step, records[step]["hashes"][env].tolist()):
+            break
+
+        if Wanted is not None and step not in Wanted: continue
+
+        # the map as the agents see it, without the clipping border
+        MapArea = (world.ClippingBorder, world.ClippingBorder, world.MAPWIDTH * world.TileSize, world.MAPHEIGHT * world.TileSize)
+        write("map", pygame.surfarray.array3d(world.MapSurface.subsurface(MapArea)))
+
+        Views = world.get_agent_views()
+        for ID in range(Views.shape[0]):
+            write("agent_{}".format(ID), Views[ID])
+
+        if human_view:
+            world.render(screen)
+            write("screen", pygame.surfarray.array3d(screen))
+
+        Rendered.append(step)
+
+    for writer in Writers.values():
+        writer.close()
+    with open(os.path.join(EnvDirectory, "steps.json"), "w") as file:
+        json.dump(Rendered, file)
+
+    envs.close()
+    result["frames"]  = len(Rendered)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def rerender(path, directory, envs=None, steps=None, format="raw", workers=None, tile_size=None, human_view=False,
+             verify=True, fps=30, start_method="spawn"):
+    '''
+    Renders the worlds of a trajectory file in parallel and returns one result dict per world (see render_env).
+
+    envs       : the indices of the worlds to render, all if None
+    steps      : the steps to render (0 is the state after the first step), every step if None
+    format     : a recorder format, 'raw', 'png' or 'ffmpeg'
+    tile_size  : render with another TileSize than recorded, the game itself does not depend on it
+    human_view : also render the 'human friendly' screen with the cards
+    verify     : compare the state hashes while replaying, a world stops at its first divergence
+    '''
+    header, records = replay.load(path)
+    if envs is None:
+        envs = range(len(header["config"]["seeds"]))
+
+    # the observations are rendered as recorded unless the tile size is changed
+    overrides = {} if tile_size is None else {"tile_size": tile_size}
+    jobs = [(path, env, steps, directory, format, overrides, human_view, verify, fps) for env in envs]
+
+    if workers == 0 or len(jobs) == 1:
+        return [render_env(job) for job in jobs]
+
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(min(workers or os.cpu_count(), len(jobs))) as pool:
+        return sorted(pool.imap_unordered(render_env, jobs), key=lambda result: result["env"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the worlds of a recorded trajectory after the fact")
+    parser.add_argument("path",        help="a trajectory file of replay.TrajectoryWriter")
+    parser.add_argument("directory",   help="output directory, one sub directory per world")
+    parser.add_argument("--envs",      type=int, nargs="+", default=None)
+    parser.add_argument("--steps",     type=int, nargs="+", default=None, help="the steps to render, all if not given")
+    parser.add_argument("--format",    default="raw", choices=["raw", "png", "ffmpeg"])
+    parser.add_argument("--workers",   type=int, default=None, help="pool processes, 0 renders in this process")
+    parser.add_argument("--tile-size", type=int, default=None)
+    parser.add_argument("--human-view", action="store_true")
+    parser.add_argument("--no-verify", action="store_true")
+    parser.add_argument("--fps",       type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    start = time.perf_counter()
+    results = rerender(args.path, args.directory, args.envs, args.steps, args.format, args.workers, args.tile_size,
+                       args.human_view, not args.no_verify, args.fps)
+
+    for result in results:
+        print("env {:3d}: {:6d} steps replayed, {:6d} frames, {:6.1f}s{}".format(result["env"], result["steps"], result["frames"], result["seconds"],
+              "" if result["divergence"] is None else ", differs at " + result["divergence"]))
+    print("{} worlds in {:.1f}s".format(len(results), time.perf_counter() - start))
+
+    if any(result["divergence"] is not None for result in results): raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+'''
+A local environment server for actors running in other processes.
+
+The server hosts a pool of worlds (a VecSurvivalBox) on a Unix socket or a localhost TCP port. Every client
+claims some of the worlds and sends step and reset requests for them. The step requests of all clients are
+coalesced: the server waits until every client has sent its actions (or max_wait has passed) and steps all
+requested worlds as one batch. The replies are raw numpy bytes behind a small binary header.
+
+python -m survivalbox.server --unix /tmp/survivalbox.sock --envs 16 --agents 2
+'''
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import json
+import time
+import socket
+import struct
+import asyncio
+import argparse
+
+# third party imports
+import numpy as np
+
+# local imports
+from .vec_env import VecSurvivalBox
+
+# Every message is a header (payload length uint32, message type uint8) followed by the payload
+HEADER = struct.Struct("<IB")
+
+# MESSAGE TYPES
+MSG_HELLO = 1 # client -> server: uint32 number of envs wanted          server -> client: json description of the claimed envs
+MSG_RESET = 2 # client -> server: empty                                 server -> client: observations
+MSG_STEP  = 3 # client -> server: int8 actions (envs, agents)           server -> client: rewards, dones, episode scores, episode lengths, observations
+MSG_CLOSE = 4 # client -> server: empty, releases the envs
+MSG_ERROR = 5 # server -> client: utf-8 error message, the connection is closed afterwards
+
+def send_message(writer, message, payload=b""):
+    writer.write(HEADER.pack(len(payload), message) + payload)
+
+class EnvServer():
+    '''
+    Hosts num_envs worlds for many clients, see the module docstring. The address is a path for a Unix socket
+    or a (host, port) tuple for TCP. All other keyword arguments go to the VecSurvivalBox.
+    '''
+    def __init__(self, address, num_envs=8, max_wait=0.002, **env_kwargs):
+
+        self.ADDRESS  = address
+        self.MAX_WAIT = max_wait
+
+        self.Envs = VecSurvivalBox(num_envs=num_envs, **env_kwargs)
+        self.Envs.reset()
+
+        self.FreeEnvs = list(range(num_envs))
+        self.Clients  = {}   # writer -> the env indices of the client
+        self.Pending  = {}   # writer -> (env indices, actions, future) of the clients waiting for the next batch
+
+        # created in start(), they belong to the event loop
+        self.Server    = None
+        self.Stepper   = None
+        self.WorkReady = None
+        self.AllReady  = None
+
+        self.Batches = 0
+        self.Steps   = 0
+
+    async def start(self):
+        self.WorkReady = asyncio.Event()
+        self.AllReady  = asyncio.Event()
+
+        if isinstance(self.ADDRESS, str):
+            if os.path.exists(self.ADDRESS): os.unlink(self.ADDRESS)
+            self.Server = await asyncio.start_unix_server(self.handle_client, path=self.ADDRESS)
+        else:
+            self.Server = await asyncio.start_server(self.handle_client, host=self.ADDRESS[0], port=self.ADDRESS[1])
+
+        self.Stepper = asyncio.ensure_future(self.step_loop())
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.Server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.Stepper is not None:
+            self.Stepper.cancel()
+        if self.Server is not None:
+            self.Server.close()
+        if isinstance(self.ADDRESS, str) and os.path.exists(self.ADDRESS):
+            os.unlink(self.ADDRESS)
+        self.Envs.close()
+
+    def describe(self, envs):
+        return {"envs"              : envs.tolist(),
+                "num_agents"        : self.Envs.NUM_AGENTS,
+                "num_actions"       : self.Envs.NUM_ACTIONS,
+                "observation_shape" : list(self.Envs.get_observation_shape())}
+
+    async def handle_client(self, reader, writer):
+        Envs = None
+        try:
+            while True:
+                try:
+                    length, message = HEADER.unpack(await reader.readexactly(HEADER.size))
+                    payload = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    # the client went away
+                    break
+
+                if message == MSG_HELLO:
+                    if Envs is not None: raise Exception("The client already holds envs {}".format(Envs.tolist()))
+                    num_envs = struct.unpack("<I", payload)[0]
+                    if num_envs < 1 or num_envs > len(self.FreeEnvs): raise Exception("Can not claim {} envs, {} are free".format(num_envs, len(self.FreeEnvs)))
+
+                    Envs = np.array(self.FreeEnvs[:num_envs])
+                    del self.FreeEnvs[:num_envs]
+                    self.Clients[writer] = Envs
+                    send_message(writer, MSG_HELLO, json.dumps(self.describe(Envs)).encode())
+
+                elif message == MSG_RESET:
+                    if Envs is None: raise Exception("Send a hello first")
+                    for k in Envs:
+                        self.Envs.reset_world(k)
+                    send_message(writer, MSG_RESET, self.Envs.Observations[Envs].tobytes())
+
+                elif message == MSG_STEP:
+                    if Envs is None: raise Exception("Send a hello first")
+                    actions = np.frombuffer(payload, dtype=np.int8)
+                    if actions.size != len(Envs) * self.Envs.NUM_AGENTS: raise Exception("Need {} actions. Given: {}".format(len(Envs) * self.Envs.NUM_AGENTS, actions.size))
+                    if actions.min() < 0 or actions.max() >= self.Envs.NUM_ACTIONS: raise Exception("Actions must be in [0, {})".format(self.Envs.NUM_ACTIONS))
+
+                    # queue the request for the next batch and wait for its reply
+                    future = asyncio.get_running_loop().create_future()
+                    self.Pending[writer] = (Envs, actions.reshape(len(Envs), self.Envs.NUM_AGENTS), future)
+                    self.WorkReady.set()
+                    self.check_all_ready()
+                    send_message(writer, MSG_STEP, await future)
+
+                elif message == MSG_CLOSE:
+                    break
+
+                else:
+                    raise Exception("Unknown message type: %s" % message)
+
+                await writer.drain()
+
+        except Exception as error:
+            try:
+                send_message(writer, MSG_ERROR, str(error).encode())
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+        finally:
+            # release the envs of the client
+            self.Pending.pop(writer, None)
+            if self.Clients.pop(writer, None) is not None:
+                self.FreeEnvs += Envs.tolist()
+            self.check_all_ready()
+            writer.close()
+
+    def check_all_ready(self):
+        if self.Pending and len(self.Pending) >= len(self.Clients):
+            self.AllReady.set()
+
+    async def step_loop(self):
+        while True:
+            await self.WorkReady.wait()
+
+            # give the other clients a moment to send their actions, so they are stepped in the same batch
+            if not self.AllReady.is_set():
+                try:
+                    await asyncio.wait_for(self.AllReady.wait(), self.MAX_WAIT)
+                except asyncio.TimeoutError:
+                    pass
+
+            Batch = self.Pending
+            self.Pending = {}
+            self.WorkReady.clear()
+            self.AllReady.clear()
+
+            if Batch:
+                self.step_batch(list(Batch.values()))
+
+    def step_batch(self, batch):
+        try:
+            indices = np.concatenate([envs for envs, actions, future in batch])
+            actions = np.concatenate([actions for envs, actions, future in batch])
+            infos   = self.Envs.step_worlds(indices.tolist(), actions)
+        except Exception as error:
+            for envs, actions, future in batch:
+                if not future.done(): future.set_exception(error)
+            return
+
+        self.Batches += 1
+        self.Steps   += len(indices)
+
+        start = 0
+        for envs, actions, future in batch:
+            stop = start + len(envs)
+            if not future.done():
+                future.set_result(self.step_reply(envs, infos[start:stop]))
+            start = stop
+
+    def step_reply(self, envs, infos):
+        # the score and length of the episodes that ended in this step, 0 otherwise
+        Scores  = np.zeros(len(envs), dtype=np.float32)
+        Lengths = np.zeros(len(envs), dtype=np.int32)
+        for i, info in enumerate(infos):
+            if "episode" in info:
+                Scores[i]  = info["episode"]["score"]
+                Lengths[i] = info["episode"]["length"]
+
+        return b"".join((self.Envs.Rewards[envs].tobytes(),
+                         self.Envs.Dones[envs].astype(np.uint8).tobytes(),
+                         Scores.tobytes(),
+                         Lengths.tobytes(),
+                         self.Envs.Observations[envs].tobytes()))
+
+def serve(address, num_envs=8, max_wait=0.002, **env_kwargs):
+    '''
+    Runs an EnvServer until the process is stopped.
+    '''
+    # the server never shows anything
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    server = EnvServer(address, num_envs, max_wait, **env_kwargs)
+    print("SurvivalBox server with {} envs on {}".format(num_envs, address))
+    asyncio.run(server.serve_forever())
+
+class EnvClient():
+    '''
+    Blocking client of an EnvServer, claims num_envs worlds and steps them with the VecSurvivalBox interface.
+    The returned arrays are views of one preallocated receive buffer and are overwritten in place on the next request.
+    '''
+    def __init__(self, address, num_envs=1, connect_timeout=10.0):
+
+        self.Socket = self.connect(address, connect_timeout)
+
+        Description = json.loads(bytes(self.request(MSG_HELLO, struct.pack("<I", num_envs))).decode())
+        self.ENVS        = Description["envs"]
+        self.NUM_ENVS    = num_envs
+        self.NUM_AGENTS  = Description["num_agents"]
+        self.NUM_ACTIONS = Description["num_actions"]
+        self.OBSERVATION_SHAPE = tuple(Description["observation_shape"])
+
+        # The layout of a step reply, the arrays are views of the receive buffer
+        Layout = [("Rewards",        np.float32, (num_envs, self.NUM_AGENTS)),
+                  ("Dones",          bool,       (num_envs,)),
+                  ("EpisodeScores",  np.float32, (num_envs,)),
+                  ("EpisodeLengths", np.int32,   (num_envs,)),
+                  ("Observations",   np.uint8,   (num_envs,) + self.OBSERVATION_SHAPE)]
+
+        self.Buffer = bytearray(sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for name, dtype, shape in Layout))
+        offset = 0
+        for name, dtype, shape in Layout:
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            setattr(self, name, np.frombuffer(self.Buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape))
+            offset += size
+        self.OBSERVATION_OFFSET = offset - self.Observations.nbytes
+
+        self.Actions = np.zeros((num_envs, self.NUM_AGENTS), dtype=np.int8)
+
+    def connect(self, address, timeout):
+        # the server might still be starting up
+        deadline = time.time() + timeout
+        while True:
+            try:
+                if isinstance(address, str):
+                    Socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                else:
+                    Socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    Socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                Socket.connect(address)
+                return Socket
+            except (FileNotFoundError, ConnectionError):
+                Socket.close()
+                if time.time() > deadline: raise
+                time.sleep(0.05)
+
+    def receive_into(self, view):
+        while len(view):
+            received = self.Socket.recv_into(view)
+            if received == 0: raise Exception("The SurvivalBox server closed the connection")
+            view = view[received:]
+
+    def request(self, message, payload=b"", into=None):
+        '''
+        Sends a request and receives the reply, into the given memoryview if any. Returns the payload otherwise.
+        '''
+        self.Socket.sendall(HEADER.pack(len(payload), message) + payload)
+
+        Header = bytearray(HEADER.size)
+        self.receive_into(memoryview(Header))
+        length, reply = HEADER.unpack(Header)
+
+        if into is None or reply == MSG_ERROR:
+            into = memoryview(bytearray(length))
+        if reply == MSG_ERROR:
+            self.receive_into(into)
+            raise Exception("SurvivalBox server error: {}".format(bytes(into).decode()))
+        if length != len(into): raise Exception("Unexpected reply of {} bytes, expected {}".format(length, len(into)))
+
+        self.receive_into(into)
+        return into
+
+    def reset(self):
+        '''
+        Resets the worlds of this client and returns their observations of shape (num_envs, num_agents, width, height, channels).
+        '''
+        self.request(MSG_RESET, into=memoryview(self.Buffer)[self.OBSERVATION_OFFSET:])
+        return self.Observations
+
+    def step(self, actions):
+        '''
+        Steps the worlds of this client with an int action array of shape (num_envs, num_agents).
+        Returns (observations, rewards, dones, infos) like VecSurvivalBox.step.
+        '''
+        self.Actions[...] = actions
+        self.request(MSG_STEP, self.Actions.tobytes(), into=memoryview(self.Buffer))
+
+        infos = [{} for k in range(self.NUM_ENVS)]
+        for k in np.flatnonzero(self.Dones):
+            infos[k]["episode"] = {"score": float(self.EpisodeScores[k]), "length": int(self.EpisodeLengths[k])}
+
+        return self.Observations, self.Rewards, self.Dones, infos
+
+    def close(self):
+        if self.Socket is not None:
+            try:
+                self.Socket.sendall(HEADER.pack(0, MSG_CLOSE))
+            except OSError:
+                pass
+            self.Socket.close()
+            self.Socket = None
+
+def main():
+    parser = argparse.ArgumentParser(description="SurvivalBox environment server")
+    parser.add_argument("--unix",      type=str, default=None, help="path of the Unix socket")
+    parser.add_argument("--port",      type=int, default=5555, help="localhost TCP port, if no Unix socket is given")
+    parser.add_argument("--envs",      type=int, default=8)
+    parser.add_argument("--size",      type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=4)
+    parser.add_argument("--agents",    type=int, default=2)
+    parser.add_argument("--max-wait",  type=float, default=2.0, help="ms to wait for the other clients before stepping a batch")
+    args = parser.parse_args()
+
+    address = args.unix if args.unix is not None else ("127.0.0.1", args.port)
+    serve(address, args.envs, args.max_wait / 1000,
+          grid_width=args.size, grid_height=args.size, tile_size=args.tile_size, num_agents=args.agents)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+
+# third party imports
+import numpy as np
+
+# local imports
+
+class WorldSnapshot():
+    '''
+    The dynamic state of a SandBoxWorld, taken by SandBoxWorld.snapshot() and put back by SandBoxWorld.restore().
+
+    Terrain    : int32 array (changed tiles, 4) with x, y, TileType and FoodValue of every tile that differs from the
+                 start map. The array is read only and shared by all snapshots until the next tile changes (copy-on-write).
+    Positions  : int array (game objects, 3) with the x, y and orientation of every game object
+    States     : copies of the core.CoreWorld.STATE_ARRAYS (energy, score, shepherd, fire guard, ...)
+    Statistics : a copy of the statistics of every game object
+    GameObjects, Survivors : the core slots of the living game objects and agents in update order
+    Rewards, Score, RNGState : the rewards of the last step, the world score and the state of the world's RandomState
+    EpisodeSteps : the updates of the episode so far
+    DeadAgents, DeadViews : the IDs of the dead agents and a copy of their last observations, the views of the
+                 living agents are drawn again from the restored state
+
+    A snapshot belongs to the map it was taken on and can be restored any number of times.
+    '''
+    def __init__(self, tile_map, terrain, positions, states, statistics, game_objects, survivors, rewards, score, rng_state, episode_steps=0,
+                 dead_agents=[], dead_views=None):
+        self.TileMap     = tile_map
+        self.Terrain     = terrain
+        self.Positions   = positions
+        self.States      = states
+        self.Statistics  = statistics
+        self.GameObjects = game_objects
+        self.Survivors   = survivors
+        self.Rewards     = rewards
+        self.Score       = score
+        self.RNGState    = rng_state
+        self.EpisodeSteps = episode_steps
+        self.DeadAgents  = dead_agents
+        self.DeadViews   = dead_views
+
+def terrain_array(points, tile_types, food_values):
+    '''
+    Returns the read only terrain array of a snapshot for the given grid points of the changed tiles,
+    with their values in the TileType and FoodValue arrays of a core.CoreWorld (Terrain, Food).
+    '''
+    terrain = np.array([(x, y, tile_types[x, y], food_values[x, y]) for x, y in points], dtype=np.int32).reshape(-1, 4)
+    terrain.flags.writeable = False
+    return terrain
@@ -0,0 +1,166 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import csv
+import glob
+import queue
+import threading
+
+# third party imports
+import numpy as np
+
+# local imports
+
+class CSVWriter():
+    '''
+    Appends the rows of one set of columns to <path>.csv, the first line holds the column names.
+    '''
+    def __init__(self, path, columns, chunk_rows):
+        self.COLUMNS = columns
+        self.File   = open(path + ".csv", "w", newline="")
+        self.Writer = csv.writer(self.File)
+        self.Writer.writerow(columns)
+
+    def write(self, row):
+        self.Writer.writerow(row.values())
+
+    def close(self):
+        self.File.close()
+
+class NPZWriter():
+    '''
+    Collects the rows of one set of columns and writes every chunk_rows rows as one array per column
+    to <path>_<chunk>.npz. Read all chunks back with load_npz.
+    '''
+    def __init__(self, path, columns, chunk_rows):
+        self.PATH    = path
+        self.COLUMNS = columns
+        self.CHUNK_ROWS = chunk_rows
+        self.Rows   = []
+        self.Chunks = 0
+
+    def write(self, row):
+        self.Rows.append(list(row.values()))
+        if len(self.Rows) >= self.CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.Rows: return
+
+        Columns = zip(*self.Rows)
+        np.savez("{}_{:06d}.npz".format(self.PATH, self.Chunks), **{name: np.array(values) for name, values in zip(self.COLUMNS, Columns)})
+        self.Chunks += 1
+        self.Rows = []
+
+    def close(self):
+        self.flush()
+
+WRITERS = {
+    "csv" : CSVWriter,
+    "npz" : NPZWriter
+}
+
+def load_npz(path):
+    '''
+    Returns the columns of all chunks written by a NPZWriter to <path>_<chunk>.npz as one dict name -> array.
+    '''
+    Chunks = [np.load(file) for file in sorted(glob.glob(glob.escape(path) + "_[0-9]*.npz"))]
+    if not Chunks:
+        return {}
+    return {name: np.concatenate([chunk[name] for chunk in Chunks]) for name in Chunks[0].files}
+
+class StatisticsExporter():
+    '''
+    Writes one row per finished episode of a SandBoxWorld: the world label, the episode, its length and score, the map
+    Meta and Stats and the Statistics of every survivor, sheep, wolf and fireplace, flattened to columns like
+    'survivor_0.rewards.reward_total'. The world hands the row over at its next reset (see SandBoxWorld.set_statistics_exporter),
+    a background thread writes the rows, so the step loop only pays for flattening the statistics once per episode.
+
+    At most max_queue rows wait for the writer, if the queue is full export() either waits (BLOCK) or drops the row (DROP).
+    Worlds with other entities or maps give other columns, every set of columns is written to its own segment
+    statistics_<segment> in the directory (csv, or chunks of chunk_rows rows as npz).
+    '''
+    # POLICIES
+    BLOCK = "block"
+    DROP  = "drop"
+
+    def __init__(self, directory, format="csv", max_queue=1024, policy=BLOCK, chunk_rows=4096):
+
+        if format not in WRITERS: raise Exception("Unknown statistics format: {}. Supported: {}".format(format, list(WRITERS.keys())))
+        if policy not in (StatisticsExporter.BLOCK, StatisticsExporter.DROP): raise Exception("Unknown queue policy: %s" % policy)
+
+        self.DIRECTORY  = directory
+        self.FORMAT     = format
+        self.POLICY     = policy
+        self.CHUNK_ROWS = chunk_rows
+
+        os.makedirs(self.DIRECTORY, exist_ok=True)
+
+        self.Rows = queue.Queue(max_queue)
+        # One writer per set of columns
+        self.Writers = {}
+
+        self.Exported = 0
+        self.Dropped  = 0
+        self.Written  = 0
+        self.Error    = None
+
+        self.Thread = threading.Thread(target=self.write_loop, name="SurvivalBoxStatistics", daemon=True)
+        self.Thread.start()
+
+    def export(self, row):
+        '''
+        Queues a row (a dict column -> number) for writing. Returns False if it was dropped because the writer is too slow.
+        '''
+        self.check_error()
+
+        if self.POLICY == StatisticsExporter.BLOCK:
+            self.Rows.put(row)
+        else:
+            try:
+                self.Rows.put_nowait(row)
+            except queue.Full:
+                self.Dropped += 1
+                return False
+
+        self.Exported += 1
+        return True
+
+    def write_loop(self):
+        # runs in the background thread until close() sends None
+        while True:
+            Row = self.Rows.get()
+            if Row is None: break
+
+            try:
+                if self.Error is None:
+                    self.get_writer(tuple(Row)).write(Row)
+                    self.Written += 1
+            except Exception as error:
+                self.Error = error
+
+        for writer in self.Writers.values():
+            writer.close()
+        self.Writers = {}
+
+    def get_writer(self, columns):
+        Writer = self.Writers.get(columns)
+        if Writer is None:
+            path = os.path.join(self.DIRECTORY, "statistics_{:03d}".format(len(self.Writers)))
+            Writer = WRITERS[self.FORMAT](path, columns, self.CHUNK_ROWS)
+            self.Writers[columns] = Writer
+        return Writer
+
+    def check_error(self):
+        if self.Error is not None:
+            raise Exception("Statistics export failed: {}".format(self.Error))
+
+    def close(self):
+        '''
+        Writes all queued rows, closes the files and stops the background thread.
+        '''
+        if self.Thread.is_alive():
+            self.Rows.put(None)
+            self.Thread.join()
+        self.check_error()
@@ -25,15 +25,19 @@ class SurvivalBox(PyGameWrapper):
     MAP_ONLY       = 0
     MAP_CARDS      = 1
     MAP_MINI_CARDS = 2
+    TRAINING       = 3 # only draw what the observations need, the human view is drawn when a frame is requested
 
     def __init__(self, 
                  grid_width=50, grid_height=50, tile_size=8, water_percentage=0.5, 
                  num_agents=2,  agent_life=999, view_port_dimensions={},
                  num_sheep=1,   num_wolf=1,     num_fire=1, 
-                 turn_actions=False, always_new_map=False,    human_game=False, full_map_observation=True):
+                 turn_actions=False, always_new_map=False,    human_game=False, full_map_observation=True,
+                 render_mode=MAP_CARDS, frame_stack=1,
+                 grayscale=False, downsample=1, observation_size=None):
 
 
         if ((num_agents > 3) or (num_agents < 1)): raise Exception("Supported number of agents: 1-3. Given: %s" % num_agents)
+        if frame_stack < 1: raise Exception("Frame stack needs at least 1 frame. Given: %s" % frame_stack)
         print("Welcome to SurvivalBox")
 
 
@@ -83,6 +87,11 @@ class SurvivalBox(PyGameWrapper):
         # General Game Init
         self.FULL_MAP_OBSERVATION= full_map_observation
         self.MANUAL_GAME_PLAY = human_game
+        self.RENDER_MODE = render_mode
+        self.FRAME_STACK = frame_stack
+        self.GRAYSCALE   = grayscale
+        self.DOWNSAMPLE  = downsample
+        self.OBSERVATION_SIZE = observation_size
 
         self.Grid_Width  = grid_width  #+ 2 # Plus 2 for the border
         self.Grid_Height = grid_height #+ 2 # Plus 2 for the border
@@ -103,6 +112,13 @@ class SurvivalBox(PyGameWrapper):
         self.PlayTime = 0
         self.ActivePlayer = 0
 
+        # True once PLE called _setup and created the window, otherwise we draw to an off-screen surface
+        self.HasDisplay = False
+
+        # Direct step API: action index -> key, and the preallocated per agent done flags
+        self.ACTION_KEYS = Survivor.ACTION_KEYS[:len(self.ACTIONS)]
+        self.Dones = np.zeros(self.NUM_AGENTS, dtype=bool)
+
         PyGameWrapper.__init__(self, self.Grid_Width * self.TileSize, self.Grid_Height * self.TileSize, actions=self.ACTIONS)
 
         self.rewards = {
@@ -153,6 +169,12 @@ class SurvivalBox(PyGameWrapper):
         self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
         self.clock = pygame.time.Clock()
     '''
+    def _setup(self):
+        """
+        Setups up the pygame env, the display and game clock. Only called when the game runs through PLE.
+        """
+        PyGameWrapper._setup(self)
+        self.HasDisplay = True
 
     '''
     def _setAction(self, action, last_action):
@@ -171,15 +193,27 @@ class SurvivalBox(PyGameWrapper):
         pygame.event.post(kd)
         pygame.event.post(ku)
     '''
-    '''
     def _draw_frame(self, draw_screen):
         """
         Decides if the screen will be drawn too
         """
 
         if draw_screen == True:
+            # In TRAINING mode (or if the world was created without a window) the step does not draw the human view, so build it now
+            if not self.env.RENDER_HUMAN_VIEW:
+                self.env.render(self.screen)
+            self.update_display()
+
+    def update_display(self):
+        """
+        Updates only the areas of the display that changed since the last update.
+        """
+        rects = self.env.pop_screen_updates()
+        if rects is None:
             pygame.display.update()
-    '''
+        elif rects:
+            pygame.display.update(rects)
+
     def save_map(self, file_name, dir="./"):
         self.env.save_map(file_name, dir)        
 
@@ -187,24 +221,32 @@ class SurvivalBox(PyGameWrapper):
         if self.env is None: raise Exception("No Environment yet, init first please!")
 
         self.Grid_Width, self.Grid_Height, self.WATER_PERCENTAGE = self.env.load_map(file_name, dir)
-        self.screen_dim = self.env.get_screen_dimensions()
-        self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+        self.reset_screen()
         
     
-    def getScreenRGB(self):
+    def getScreenRGB(self, out=None):
         """
-        Returns the current game screen in RGB format.
+        Returns the current observations of all agents in RGB format.
+
+        Parameters
+        ----------
+        out : numpy uint8 array, optional
+            If given, the observations are copied into this array, e.g. a slot of a rollout storage.
 
         Returns
         --------
         numpy uint8 array
-            Returns a numpy array with the shape (width, height, 3).
+            Returns a numpy array with the shape (num_agents, width, height, channels), channels is 1 with grayscale=True and 3 otherwise.
+            With frame_stack > 1 the shape is (num_agents, frame_stack, width, height, channels), oldest frame first.
+            Without `out` this is the environments observation buffer, which is overwritten in place on every step.
 
         """
 
         #return pygame.surfarray.array3d(
         #    pygame.display.get_surface()).astype(np.uint8)
-        return self.env.get_agent_views()  
+        if self.FRAME_STACK > 1:
+            return self.env.get_stacked_views(out)
+        return self.env.get_agent_views(out)
     '''
     def tick(self, fps):
         """
@@ -228,6 +270,10 @@ class SurvivalBox(PyGameWrapper):
             if key in self.rewards:
                 self.rewards[key] = rewards[key]
 
+        # PLE adjusts the rewards before init
+        if self.env is None: return
+
+        self.env.update_reward_values()
         if self.env.StatisticsCard is not None:
             self.env.StatisticsCard.update_static()
     '''
@@ -289,13 +335,13 @@ class SurvivalBox(PyGameWrapper):
             self.rng = np.random.RandomState(24)
 
         if not self.env:
-            self.env = environment.SandBoxWorld(self.Grid_Width, self.Grid_Height, self.WATER_PERCENTAGE, self.TileSize, self.rewards, self.FULL_MAP_OBSERVATION)
+            self.env = environment.SandBoxWorld(self.Grid_Width, self.Grid_Height, self.WATER_PERCENTAGE, self.TileSize, self.rewards, self.FULL_MAP_OBSERVATION, self.render_human_view(), self.FRAME_STACK,
+                                                self.GRAYSCALE, self.DOWNSAMPLE, self.OBSERVATION_SIZE)
             self.env.init(self.rng, self.NUM_AGENTS, self.AGENT_LIFE, self.view_port_dimensions, self.NUM_SHEEP, self.NUM_WOLF, self.NUM_FIRE)
 
             # change this also in scale_to...
             # only change screen size if they are different from what we requested.
-            self.screen_dim = self.env.get_screen_dimensions()
-            self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+            self.reset_screen()
 
         else:
             self.env.reset(self.ALWAYS_NEW_MAP)
@@ -304,20 +350,48 @@ class SurvivalBox(PyGameWrapper):
 
     def new_map(self):
         print("NEW MAP DIMENSIONS: %s x %s" % (self.Grid_Width, self.Grid_Height))
-        self.env = environment.SandBoxWorld(self.Grid_Width, self.Grid_Height, self.WATER_PERCENTAGE, self.TileSize, self.rewards, self.FULL_MAP_OBSERVATION)
+        self.env = environment.SandBoxWorld(self.Grid_Width, self.Grid_Height, self.WATER_PERCENTAGE, self.TileSize, self.rewards, self.FULL_MAP_OBSERVATION, self.render_human_view(), self.FRAME_STACK,
+                                            self.GRAYSCALE, self.DOWNSAMPLE, self.OBSERVATION_SIZE)
         self.env.init(self.rng, self.NUM_AGENTS, self.AGENT_LIFE, self.view_port_dimensions, self.NUM_SHEEP, self.NUM_WOLF, self.NUM_FIRE)
 
         # change this also in scale_to...
         # only change screen size if they are different from what we requested.
-        self.screen_dim = self.env.get_screen_dimensions()
-        self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+        self.reset_screen()
     
+    def render_human_view(self):
+        # Only draw the human view on every step if we are not training and there is a window to show it,
+        # without one (step_agents) the world draws it only when a frame is requested, like in TRAINING mode
+        return self.RENDER_MODE != SurvivalBox.TRAINING and self.HasDisplay
+
     def reset(self):
         """
         Wraps the init() function, can be setup to reset certain poritions of the game only if needed.
         """
         self.init()
     
+    def getRewards(self):
+        """
+        Returns the reward of every agent in the last step.
+
+        Returns
+        -------
+        numpy float32 array
+            The rewards with the shape (num_agents,), overwritten in place on every step.
+        """
+        return self.env.get_rewards()
+
+    def getEvents(self):
+        """
+        Returns the game events of the last step: grass eaten, sheep grazed, wolf caught, sheep killed, wolf attacks,
+        fire guard and shepherd changes and survivor deaths, see survivalbox.events.
+
+        Returns
+        -------
+        numpy structured array
+            One row (type, actor, target, x, y) per event with the dtype events.EVENT_DTYPE, overwritten in place on every step.
+        """
+        return self.env.get_events()
+
     def getScore(self):
         """
         Return the current score of the game.
@@ -349,7 +423,43 @@ class SurvivalBox(PyGameWrapper):
     def reset_screen(self):
         #self.screen.fill((0,0,0))
         self.screen_dim = self.env.get_screen_dimensions()
-        self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+        if self.HasDisplay:
+            self.screen = pygame.display.set_mode(self.getScreenDims(), 0, 32)
+        else:
+            self.screen = pygame.Surface(self.getScreenDims())
+
+    def step_agents(self, actions):
+        """
+        Steps the game forward with one action per agent, without PLE, the pygame event queue or the window.
+
+        Parameters
+        ----------
+        actions : list or numpy array of int
+            One action index per agent, an index into ACTION_KEYS: up, down, left, right, noop and with turn_actions=True turn left, turn right.
+
+        Returns
+        --------
+        tuple
+            (observations, rewards, dones, info): the observations like getScreenRGB(), the reward of every agent
+            in this step (num_agents,), for every agent if it is dead (num_agents,) and an info dict with
+            "game_over", the total "score" and the "events" of this step (see getEvents). The arrays are overwritten
+            in place on the next step.
+
+        Without a window (the game is not run through PLE) the human view and the cards are not drawn on every step,
+        whatever the render_mode: the observations do not need them and they cost more than half of a step.
+        Call game.env.render(game.screen) to draw them into the off-screen surface.
+
+        """
+        if len(actions) != self.NUM_AGENTS: raise Exception("Need one action per agent ({}). Given: {}".format(self.NUM_AGENTS, len(actions)))
+
+        action_list = [self.ACTION_KEYS[action] for action in actions]
+        self.env.update(self.screen, action_list)
+
+        for ID in range(self.NUM_AGENTS):
+            self.Dones[ID] = not self.env.AgentList[ID]["Agent"].alive()
+
+        info = {"game_over": self.env.game_over(), "score": self.env.getScore(), "events": self.env.get_events()}
+        return self.getScreenRGB(), self.env.get_rewards(), self.Dones, info
 
     def step(self, dt):
         """
@@ -364,9 +474,10 @@ class SurvivalBox(PyGameWrapper):
         self.PlayTime += dt / 1000
 
         # Print some basic info in window title
-        text = "FPS: {0:.2f}   Playtime: {1:.2f}".format(self.clock.get_fps(), self.PlayTime)
-        #text = "FPS: {0:.2f}".format(clock.get_fps())
-        pygame.display.set_caption(text)
+        if self.RENDER_MODE != SurvivalBox.TRAINING:
+            text = "FPS: {0:.2f}   Playtime: {1:.2f}".format(self.clock.get_fps(), self.PlayTime)
+            #text = "FPS: {0:.2f}".format(clock.get_fps())
+            pygame.display.set_caption(text)
         
         # get all user events
         action_list = []
@@ -480,4 +591,4 @@ class SurvivalBox(PyGameWrapper):
         
         # While developing update display here, later automatic from _draw_frame
         if self.MANUAL_GAME_PLAY:
-            pygame.display.update()
+            self.update_display()
@@ -0,0 +1,438 @@
+__author__ = 'Johannes Theodoridis'
+
+# standard imports
+import os
+import traceback
+import multiprocessing
+from   multiprocessing import shared_memory
+
+# third party imports
+import numpy as np
+
+# local imports
+from . import environment
+from . import events
+from .game_objects import Survivor
+
+# The action index of the batched interface -> the key the Survivors understand
+ACTION_KEYS = Survivor.ACTION_KEYS
+
+class VecSurvivalBox():
+    '''
+    Runs K SandBoxWorlds in one process behind a batched interface.
+    step() takes an int action array of shape (K, num_agents) and returns the observations, rewards and dones of
+    all worlds in preallocated arrays. Every world has its own seeded RandomState and is reset automatically
+    when it is over. The worlds never draw the human view and write their observations straight into one
+    shared buffer of shape (K, num_agents, width, height, channels).
+    '''
+    def __init__(self,
+                 num_envs=8,
+                 grid_width=50, grid_height=50, tile_size=8, water_percentage=0.5,
+                 num_agents=2,  agent_life=999, view_port_dimensions={},
+                 num_sheep=1,   num_wolf=1,     num_fire=1,
+                 turn_actions=False, always_new_map=False, full_map_observation=True,
+                 grayscale=False, downsample=1, observation_size=None,
+                 rewards={}, seeds=None):
+
+        if ((num_agents > 3) or (num_agents < 1)): raise Exception("Supported number of agents: 1-3. Given: %s" % num_agents)
+        if seeds is not None and len(seeds) != num_envs: raise Exception("Need one seed per env. Given: {} seeds for {} envs".format(len(seeds), num_envs))
+
+        self.NUM_ENVS   = num_envs
+        self.NUM_AGENTS = num_agents
+        self.ALWAYS_NEW_MAP = always_new_map
+
+        # The key lookup table for the action indices
+        self.NUM_ACTIONS = len(ACTION_KEYS) if turn_actions else 5
+        self.ACTION_KEYS = np.array(ACTION_KEYS[:self.NUM_ACTIONS])
+
+        self.rewards = {
+            "positive":  1.0,
+            "negative": -1.0,
+            "tick"    :  0.0,
+            "loss"    : -5.0,
+            "win"     :  5.0,
+            "grass"   :  1.0,
+            "sheep"   :  1.0,
+            "fire"    :  1.0,
+            "wolf"    :  1.0
+        }
+        self.rewards.update(rewards)
+
+        if seeds is None:
+            seeds = list(range(num_envs))
+        self.Seeds = list(seeds)
+
+        self.Worlds = []
+        for k in range(self.NUM_ENVS):
+            world = environment.SandBoxWorld(grid_width, grid_height, water_percentage, tile_size, self.rewards, full_map_observation,
+                                             render_human_view=False, grayscale=grayscale, downsample=downsample, observation_size=observation_size)
+            world.init(np.random.RandomState(self.Seeds[k]), num_agents, agent_life, view_port_dimensions, num_sheep, num_wolf, num_fire)
+            self.Worlds.append(world)
+
+        # Preallocated batch arrays, the worlds write their observations straight into their slice
+        self.Observations = np.zeros((self.NUM_ENVS,) + self.Worlds[0].Observations.shape, dtype=np.uint8)
+        for k, world in enumerate(self.Worlds):
+            world.set_observation_buffer(self.Observations[k])
+
+        # The agents add their rewards straight into their world's row
+        self.Rewards = np.zeros((self.NUM_ENVS, self.NUM_AGENTS), dtype=np.float32)
+        for k, world in enumerate(self.Worlds):
+            world.set_reward_buffer(self.Rewards[k])
+
+        self.Dones   = np.zeros(self.NUM_ENVS, dtype=bool)
+        self.EpisodeSteps = np.zeros(self.NUM_ENVS, dtype=np.int64)
+        # The game events of all worlds in the last step
+        self.Events  = np.zeros(0, dtype=events.VEC_EVENT_DTYPE)
+
+    def set_buffers(self, observations, rewards, dones):
+        '''
+        Lets the worlds write their observations, rewards and dones straight into caller provided arrays,
+        e.g. views of shared memory. The arrays need the shapes and dtypes of the internal ones.
+        '''
+        for name, array, own in (("observations", observations, self.Observations), ("rewards", rewards, self.Rewards), ("dones", dones, self.Dones)):
+            if array.shape != own.shape or array.dtype != own.dtype:
+                raise Exception("The {} buffer must be a {} array of shape {}. Given: {} {}".format(name, own.dtype, own.shape, array.dtype, array.shape))
+
+        self.Observations = observations
+        for k, world in enumerate(self.Worlds):
+            world.set_observation_buffer(self.Observations[k])
+
+        self.Rewards = rewards
+        for k, world in enumerate(self.Worlds):
+            world.set_reward_buffer(self.Rewards[k])
+
+        self.Dones   = dones
+
+    def set_statistics_exporter(self, exporter):
+        '''
+        Exports the statistics of every finished episode of all worlds, labeled with the index of the world,
+        see SandBoxWorld.set_statistics_exporter and statistics.StatisticsExporter. None stops the export.
+        '''
+        for k, world in enumerate(self.Worlds):
+            world.set_statistics_exporter(exporter, k)
+
+    def get_observation_shape(self):
+        '''
+        Returns the shape (num_agents, width, height, channels) of the observations of one env.
+        '''
+        return self.Observations.shape[1:]
+
+    def reset(self):
+        '''
+        Resets all worlds and returns the observations of shape (K, num_agents, width, height, channels).
+        The array is overwritten in place on the next step.
+        '''
+        for k in range(self.NUM_ENVS):
+            self.reset_world(k)
+        return self.Observations
+
+    def reset_world(self, k):
+        self.Worlds[k].reset(self.ALWAYS_NEW_MAP)
+        self.EpisodeSteps[k] = 0
+
+    def step(self, actions):
+        '''
+        Steps all worlds with an int action array of shape (K, num_agents), see ACTION_KEYS.
+
+        Returns (observations, rewards, dones, infos): the observations of shape (K, num_agents, width, height, channels),
+        the rewards of every agent (K, num_agents), the done flags (K,) and a list with one info dict per env.
+        All arrays are preallocated and overwritten in place on the next step. A world that is done is reset
+        right away, its observations are already the first ones of the next episode and its info holds
+        the score and length of the finished episode.
+        '''
+        actions = np.asarray(actions)
+        if actions.shape != (self.NUM_ENVS, self.NUM_AGENTS): raise Exception("Actions must be of shape {}. Given: {}".format((self.NUM_ENVS, self.NUM_AGENTS), actions.shape))
+
+        infos = self.step_worlds(range(self.NUM_ENVS), actions)
+        return self.Observations, self.Rewards, self.Dones, infos
+
+    def step_worlds(self, indices, actions):
+        '''
+        Steps only the worlds with the given indices, with an int action array of shape (len(indices), num_agents).
+        Returns one info dict per stepped world. The observations, rewards and dones of the other worlds are left untouched.
+        '''
+        Keys  = self.ACTION_KEYS[actions].tolist()
+        infos = [{} for k in indices]
+        WorldEvents = []
+
+        for i, k in enumerate(indices):
+            world = self.Worlds[k]
+            world.update(None, Keys[i])
+            self.EpisodeSteps[k] += 1
+            WorldEvents.append(world.get_events())
+
+            self.Dones[k] = world.game_over()
+            if self.Dones[k]:
+                infos[i]["episode"] = {"score": world.getScore(), "length": int(self.EpisodeSteps[k])}
+                # the reset clears the event log of the world, keep the last events of the episode
+                WorldEvents[i] = WorldEvents[i].copy()
+                self.reset_world(k)
+
+        self.Events = events.batch_events(WorldEvents, indices)
+        return infos
+
+    def get_events(self):
+        '''
+        Returns the game events of the worlds stepped last as one array of events.VEC_EVENT_DTYPE,
+        the env field is the index of the world. For a world that was reset these are the last events of the finished episode.
+        '''
+        return self.Events
+
+    def close(self):
+        self.Worlds = []
+
+
+def batch_shapes(num_envs, num_agents, observation_shape):
+    '''
+    Returns the (shape, dtype) of the observations, rewards, dones and actions of a batch of num_envs envs.
+    '''
+    return [((num_envs,) + tuple(observation_shape), np.uint8),
+            ((num_envs, num_agents),                np.float32),
+            ((num_envs,),                           bool),
+            ((num_envs, num_agents),                np.int64)]
+
+def shared_arrays(memory, shapes):
+    '''
+    Returns numpy arrays backed by the given shared memory blocks, one per (shape, dtype).
+    '''
+    return [np.ndarray(shape, dtype=dtype, buffer=block.buf) for block, (shape, dtype) in zip(memory, shapes)]
+
+class RowBuffer():
+    '''
+    Stands in for the statistics exporter of the worlds in a worker, keeps their rows until they are sent to the parent.
+    '''
+    def __init__(self):
+        self.Rows = []
+
+    def export(self, row):
+        self.Rows.append(row)
+        return True
+
+    def take(self):
+        Rows, self.Rows = self.Rows, []
+        return Rows
+
+def worker_loop(remote, env_kwargs, seeds):
+    '''
+    Runs in a worker process: owns a VecSurvivalBox with one world per seed and executes the commands
+    of a SubprocVecSurvivalBox. Observations, rewards, dones and actions live in shared memory,
+    only the commands, the (mostly empty) infos, the game events and the statistics rows of finished episodes go through the pipe.
+    '''
+    # the workers never show anything
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    envs   = None
+    Memory = []
+    Arrays = []
+    Rows   = RowBuffer()
+    try:
+        envs = VecSurvivalBox(num_envs=len(seeds), seeds=seeds, **env_kwargs)
+        remote.send(("shape", envs.get_observation_shape()))
+
+        while True:
+            command, data = remote.recv()
+
+            if command == "step":
+                _, _, _, infos = envs.step(Arrays[3])
+                remote.send(("infos", (infos, envs.get_events(), Rows.take())))
+            elif command == "reset":
+                envs.reset()
+                remote.send(("rows", Rows.take()))
+            elif command == "statistics":
+                envs.set_statistics_exporter(Rows if data else None)
+                remote.send(("ok", None))
+            elif command == "attach":
+                # the shared memory blocks of the whole batch and the slice of it this worker owns
+                names, shapes, start, stop = data
+                Memory = [shared_memory.SharedMemory(name=name) for name in names]
+                Arrays = [array[start:stop] for array in shared_arrays(Memory, shapes)]
+                envs.set_buffers(Arrays[0], Arrays[1], Arrays[2])
+                remote.send(("ok", None))
+            elif command == "close":
+                break
+            else:
+                raise Exception("Unknown command: %s" % command)
+
+    except Exception:
+        remote.send(("error", traceback.format_exc()))
+
+    finally:
+        # drop all array views before closing the shared memory
+        envs   = None
+        Arrays = []
+        for memory in Memory:
+            memory.close()
+        remote.close()
+
+class SubprocVecSurvivalBox():
+    '''
+    Spreads K SandBoxWorlds over worker processes, each worker runs a VecSurvivalBox with its share of the worlds.
+    The observations, rewards, dones and actions of the whole batch live in shared memory: the workers write
+    straight into their slice and step() returns numpy views of the shared blocks, so no observation is ever
+    pickled. Only small command messages and the infos cross the process boundaries.
+    Takes the same arguments as VecSurvivalBox plus the number of worker processes.
+    '''
+    def __init__(self, num_envs=8, num_workers=None, seeds=None, start_method="spawn", **env_kwargs):
+
+        self.Remotes   = []
+        self.Processes = []
+        self.Memory    = []
+        self.Events    = np.zeros(0, dtype=events.VEC_EVENT_DTYPE)
+        self.Waiting   = False
+        self.StatisticsExporter = None
+
+        if num_workers is None:
+            num_workers = min(num_envs, os.cpu_count() or 1)
+        if num_workers < 1 or num_workers > num_envs: raise Exception("Need 1 to num_envs ({}) workers. Given: {}".format(num_envs, num_workers))
+
+        if seeds is None:
+            seeds = list(range(num_envs))
+        if len(seeds) != num_envs: raise Exception("Need one seed per env. Given: {} seeds for {} envs".format(len(seeds), num_envs))
+
+        self.NUM_ENVS    = num_envs
+        self.NUM_WORKERS = num_workers
+        self.NUM_AGENTS  = env_kwargs.get("num_agents", 2)
+        self.NUM_ACTIONS = len(ACTION_KEYS) if env_kwargs.get("turn_actions", False) else 5
+        self.Seeds = list(seeds)
+
+        # The envs of every worker, as slices of the batch
+        Bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self.Slices = [(Bounds[w], Bounds[w + 1]) for w in range(num_workers)]
+
+        context = multiprocessing.get_context(start_method)
+        for start, stop in self.Slices:
+            remote, worker_remote = context.Pipe()
+            process = context.Process(target=worker_loop, args=(worker_remote, env_kwargs, self.Seeds[start:stop]), daemon=True)
+            process.start()
+            worker_remote.close()
+            self.Remotes.append(remote)
+            self.Processes.append(process)
+
+        try:
+            # every worker reports the observation shape of its worlds, then we allocate the shared batch
+            shapes = self.receive_all()
+            self.ObservationShape = shapes[0]
+
+            Shapes = batch_shapes(self.NUM_ENVS, self.NUM_AGENTS, self.ObservationShape)
+            self.Memory = [shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)) for shape, dtype in Shapes]
+            self.Observations, self.Rewards, self.Dones, self.Actions = shared_arrays(self.Memory, Shapes)
+
+            names = [memory.name for memory in self.Memory]
+            for remote, (start, stop) in zip(self.Remotes, self.Slices):
+                remote.send(("attach", (names, Shapes, start, stop)))
+            self.receive_all()
+        except Exception:
+            self.close()
+            raise
+
+    def receive_all(self):
+        # collects one message of every worker before raising a worker exception, so no answer is left in a pipe
+        messages = [remote.recv() for remote in self.Remotes]
+        for message, data in messages:
+            if message == "error":
+                raise Exception("SurvivalBox worker failed:\n{}".format(data))
+        return [data for message, data in messages]
+
+    def get_observation_shape(self):
+        '''
+        Returns the shape (num_agents, width, height, channels) of the observations of one env.
+        '''
+        return self.ObservationShape
+
+    def set_statistics_exporter(self, exporter):
+        '''
+        Exports the statistics of every finished episode of all worlds like VecSurvivalBox.set_statistics_exporter.
+        The workers send the rows with their next answer, the exporter runs in this process. None stops the export.
+        '''
+        for remote in self.Remotes:
+            remote.send(("statistics", exporter is not None))
+        self.receive_all()
+        self.StatisticsExporter = exporter
+
+    def export_statistics(self, worker_rows):
+        for (start, stop), rows in zip(self.Slices, worker_rows):
+            for row in rows:
+                # the workers count their envs from 0
+                row["world"] += start
+                self.StatisticsExporter.export(row)
+
+    def reset(self):
+        '''
+        Resets all worlds and returns the shared observations of shape (K, num_agents, width, height, channels).
+        '''
+        for remote in self.Remotes:
+            remote.send(("reset", None))
+        worker_rows = self.receive_all()
+        if self.StatisticsExporter is not None:
+            self.export_statistics(worker_rows)
+        return self.Observations
+
+    def step_async(self, actions):
+        '''
+        Starts a step of all workers with an int action array of shape (K, num_agents) and returns right away.
+        '''
+        actions = np.asarray(actions)
+        if actions.shape != self.Actions.shape: raise Exception("Actions must be of shape {}. Given: {}".format(self.Actions.shape, actions.shape))
+
+        np.copyto(self.Actions, actions, casting="same_kind")
+        for remote in self.Remotes:
+            remote.send(("step", None))
+        self.Waiting = True
+
+    def step_wait(self):
+        '''
+        Waits for the step started by step_async and returns (observations, rewards, dones, infos) like VecSurvivalBox.step.
+        The arrays are views of the shared memory and are overwritten in place on the next step.
+        '''
+        self.Waiting = False
+        infos = []
+        WorkerEvents = []
+        WorkerRows   = []
+        for (start, stop), (worker_infos, worker_events, worker_rows) in zip(self.Slices, self.receive_all()):
+            infos += worker_infos
+            # the workers count their envs from 0
+            worker_events["env"] += start
+            WorkerEvents.append(worker_events)
+            WorkerRows.append(worker_rows)
+        self.Events = np.concatenate(WorkerEvents)
+        if self.StatisticsExporter is not None:
+            self.export_statistics(WorkerRows)
+        return self.Observations, self.Rewards, self.Dones, infos
+
+    def get_events(self):
+        '''
+        Returns the game events of all worlds in the last step like VecSurvivalBox.get_events.
+        '''
+        return self.Events
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        '''
+        Stops the workers and releases the shared memory.
+        '''
+        for remote in self.Remotes:
+            try:
+                if self.Waiting:
+                    remote.recv()
+                remote.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.Processes:
+            process.join()
+
+        self.Remotes   = []
+        self.Processes = []
+        self.Waiting   = False
+
+        # drop our views before releasing the shared memory
+        self.Observations = self.Rewards = self.Dones = self.Actions = None
+        for memory in self.Memory:
+            memory.close()
+            memory.unlink()
+        self.Memory = []
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,85 @@
+'''
+The game rules live in core.CoreWorld. The golden trajectories in tests/data were recorded with the pygame rules of the
+game objects before they moved to the core (benchmarks/golden_trajectories.py record, seeded random actions with NPCs,
+turn actions and resets, one file with new maps), replaying them checks that the core still plays the same game.
+
+A SandBoxWorld steps a CoreWorld and its sprites only mirror it: played with the same seed and actions, a standalone
+CoreWorld has to give the same positions, energies, scores, rewards, events, statistics and terrain after every step.
+'''
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from survivalbox import core, replay
+from survivalbox.vec_env import VecSurvivalBox
+
+SIZE   = 32
+AGENTS = 3
+STEPS  = 600
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def compare(sandbox, world):
+    objects = sandbox.get_game_objects()
+
+    assert np.array_equal(np.array([game_object.Pos for game_object in objects]), world.Pos)
+    assert [game_object.ID for game_object in sandbox.game_objects_group.sprites()] == world.ID[world.Living].tolist()
+    assert [agent.ID for agent in sandbox.survivor_group.sprites()] == world.ID[world.Survivors].tolist()
+
+    agents = objects[:AGENTS]
+    assert [agent.Energy for agent in agents] == world.Energy[:AGENTS].tolist()
+    assert [agent.Score  for agent in agents] == world.Score[:AGENTS].tolist()
+
+    assert [game_object.Statistics for game_object in objects] == world.Statistics
+
+    terrain = np.array([[tile.TileType for tile in column] for column in sandbox.TileMap])
+    assert np.array_equal(terrain, world.Terrain)
+
+
+@pytest.mark.parametrize("golden", ["golden_fixed_map.sbtraj", "golden_new_maps.sbtraj"])
+def test_golden_trajectory(golden):
+    divergence, steps, _ = replay.replay(os.path.join(DATA, golden))
+    assert divergence is None
+    assert steps == len(replay.load(os.path.join(DATA, golden))[1])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_sandbox_mirrors_core(seed):
+    envs = VecSurvivalBox(num_envs=1, grid_width=SIZE, grid_height=SIZE, tile_size=1, num_agents=AGENTS, agent_life=60,
+                          num_sheep=4, num_wolf=2, num_fire=1, turn_actions=True, seeds=[seed])
+    world = core.CoreWorld.generate(SIZE, SIZE, 0.5, envs.rewards, AGENTS, 60, 4, 2, 1, rng=np.random.RandomState(seed))
+    sandbox = envs.Worlds[0]
+
+    # VecSurvivalBox.reset() resets the initialised world once more
+    envs.reset()
+    world.reset()
+    compare(sandbox, world)
+
+    rng = np.random.RandomState(seed)
+    resets = 0
+    for step in range(STEPS):
+        actions = rng.randint(0, envs.NUM_ACTIONS, (1, AGENTS))
+        _, rewards, dones, _ = envs.step(actions)
+        world.step(actions[0])
+
+        # the vectorized env resets a finished world right away, the events are the ones of the last step
+        vec_events, core_events = envs.get_events(), world.get_events()
+        assert len(vec_events) == len(core_events)
+        for name in core_events.dtype.names:
+            assert np.array_equal(vec_events[name], core_events[name]), name
+        assert np.array_equal(rewards[0], world.get_rewards())
+        assert dones[0] == world.game_over()
+        if world.game_over():
+            world.reset()
+            resets += 1
+
+        compare(sandbox, world)
+
+    envs.close()
+    assert resets > 0
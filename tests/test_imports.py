@@ -0,0 +1,26 @@
+'''
+Every submodule of survivalbox has to be importable on its own, in a fresh interpreter: the lazy package
+__init__ no longer imports environment first, so import cycles between the modules show up here.
+'''
+import os
+import sys
+import pkgutil
+import importlib.util
+import subprocess
+
+import pytest
+
+import survivalbox
+
+MODULES = sorted(module.name for module in pkgutil.iter_modules(survivalbox.__path__))
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_in_fresh_process(module):
+    # the PyGame wrapper needs the PyGame-Learning-Environment
+    if module == "survivalbox" and importlib.util.find_spec("ple") is None:
+        pytest.skip("ple is not installed")
+
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-c", "import survivalbox.{}".format(module)], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr